@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Cold import time of libclient entry points, each measured in fresh
+interpreters. Fails (exit status 1) if a lazy entry point loads a heavy
+dependency, if a client import loads the modules of optional features or
+if 'import libclient' takes more than max_ms.
+
+Usage: python benchmarks/bench_import.py [repeat] [max_ms]
+"""
+import os
+import sys
+import json
+import subprocess
+
+# modules of optional client features, loaded on first use
+OPTIONAL = ('libclient.lbrest.policy', 'libclient.lbrest.singleflight',
+            'libclient.lbrest.schema', 'libclient.lbrest.metrics',
+            'concurrent.futures')
+
+# (statement, modules it must not load)
+TARGETS = [
+    ('import libclient', ('requests', 'urllib3', 'libclient.lbrest.core')),
+    ('import libclient.lbrest', ('requests', 'urllib3')),
+    ('from libclient import Search', ('requests', 'urllib3')),
+    ('from libclient import Base', ('requests', 'urllib3')),
+    ('from libclient import DocumentREST', OPTIONAL),
+    ('from libclient.lbrest import DocumentREST', OPTIONAL),
+]
+
+PROBE = '''
+import sys, time, json
+start = time.perf_counter()
+exec(%r)
+elapsed = time.perf_counter() - start
+print(json.dumps([elapsed, [m for m in %r if m in sys.modules]]))
+'''
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(statement, forbidden, repeat):
+    timings = []
+    loaded = []
+    for _ in range(repeat):
+        output = subprocess.check_output(
+            [sys.executable, '-c', PROBE % (statement, forbidden)], cwd=ROOT)
+        elapsed, loaded = json.loads(output)
+        timings.append(elapsed)
+    timings.sort()
+    return timings[len(timings) // 2], loaded
+
+
+def main(repeat=5, max_ms=20.0):
+    failed = False
+    for statement, forbidden in TARGETS:
+        median, loaded = measure(statement, forbidden, repeat)
+        print('%-44s %7.1f ms%s' % (
+            statement, median * 1000,
+            '  LOADED %s' % ', '.join(loaded) if loaded else ''))
+        failed = failed or bool(loaded)
+        if statement == 'import libclient' and median * 1000 > max_ms:
+            print('import libclient exceeds %.1f ms' % max_ms)
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    max_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    sys.exit(main(repeat, max_ms))
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark of object2json/json2object per JSON backend on typical LB
+documents.
+
+Usage: python benchmarks/bench_json.py [number_of_documents]
+"""
+import sys
+import time
+import datetime
+
+from libclient import utils
+from libclient.utils import object2json
+from libclient.utils import json2object
+
+
+def make_document(i):
+    return {
+        'txt_title': u'Sehnsucht %d ação' % i,
+        'dt_release': datetime.datetime(1997, 8, 22, 10, 0, 0),
+        'date_recorded': datetime.date(1997, 3, 1),
+        'gp_artists': [{'bool_is_band': True, 'txt_artist_name': 'Rammstein'}],
+        'gp_tracks': [{
+            'txt_track_title': 'Track %d' % n,
+            'int_track_number': n,
+            'time_track_len': datetime.time(0, 4, n),
+            'dec_rating': n / 3.0
+        } for n in range(12)],
+        '_metadata': {'id_doc': i, 'dt_doc': '22/08/1997 10:00:00'}
+    }
+
+
+def bench(func, values, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        for value in values:
+            func(value)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(count=2000):
+    documents = [make_document(i) for i in range(count)]
+    page = {'results': documents, 'result_count': count,
+            'limit': count, 'offset': 0}
+
+    print('%d documents, backends available: %s' %
+          (count, ', '.join(utils.JSON_BACKENDS)))
+    timings = {}
+    for backend in utils.JSON_BACKENDS:
+        utils.set_json_backend(backend)
+        encoded = [object2json(d) for d in documents]
+        raw_page = object2json(page).encode('utf-8')
+        timings[backend] = (
+            bench(object2json, documents),
+            bench(json2object, encoded),
+            bench(json2object, [raw_page])
+        )
+        print('%-7s object2json %7.1f ms  json2object %7.1f ms  '
+              'page decode %7.1f ms' % ((backend,) +
+              tuple(t * 1000 for t in timings[backend])))
+
+    if 'orjson' in timings:
+        print('speedup  object2json %5.1fx  json2object %5.1fx  '
+              'page decode %5.1fx' % tuple(
+                  j / o for j, o in zip(timings['json'], timings['orjson'])))
+
+    utils.set_json_backend(utils.JSON_BACKENDS[0])
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
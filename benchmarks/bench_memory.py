@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Per-object memory footprint of the lbtypes, slotted (current) versus the
+same attributes held in a per-instance __dict__ (the previous layout).
+Attribute values are shared between objects, so only the objects
+themselves are measured.
+
+Usage: python benchmarks/bench_memory.py [number_of_objects]
+"""
+import sys
+import tracemalloc
+
+from libclient.lbtypes.base import Field
+from libclient.lbtypes.base import Group
+from libclient.lbtypes.base import GroupMetadata
+from libclient.lbtypes.base import BaseMetadata
+from libclient.lbtypes.base import Base
+from libclient.lbtypes.file import File
+from libclient.lbsearch.search import LBFile
+
+SAMPLES = [
+    Field('txt_title', 'Text', multivalued=True),
+    GroupMetadata('gp_tracks'),
+    Group(name='gp_tracks'),
+    BaseMetadata('music'),
+    Base(name='music'),
+    File(id_file='f', filename='a.txt', filesize=3, content=b'abc'),
+    LBFile(id_file='f', filename='a.txt', filesize=3),
+]
+
+
+def attributes(obj):
+    """ Returns the (slot name, value) pairs set on 'obj'.
+    """
+    names = []
+    for klass in reversed(type(obj).__mro__):
+        names.extend(klass.__dict__.get('__slots__', ()))
+    return [(name, getattr(obj, name)) for name in names
+            if hasattr(obj, name)]
+
+
+def make_dict_class(cls):
+    """ Returns a class without __slots__, like lbtypes used to be.
+    """
+    return type(cls.__name__ + 'Dict', (object,), {})
+
+
+def footprint(factory, number):
+    """ Returns the bytes allocated per object built by 'factory'.
+    """
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for _ in range(number)]
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    # the list holding them is not part of the objects
+    size -= sys.getsizeof(objects)
+    return size / float(number)
+
+
+def main(number=10000):
+    print('%-16s %10s %10s %8s' % ('type', '__dict__', 'slots', 'saved'))
+    for sample in SAMPLES:
+        cls = type(sample)
+        items = attributes(sample)
+        dict_cls = make_dict_class(cls)
+
+        def slotted():
+            obj = object.__new__(cls)
+            for name, value in items:
+                object.__setattr__(obj, name, value)
+            return obj
+
+        def with_dict():
+            obj = dict_cls()
+            for name, value in items:
+                setattr(obj, name, value)
+            return obj
+
+        before = footprint(with_dict, number)
+        after = footprint(slotted, number)
+        print('%-16s %8.0f B %8.0f B %7.0f%%' % (
+            cls.__name__, before, after, 100 * (1 - after / before)))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
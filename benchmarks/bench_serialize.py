@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Serialization of a large base: Base.from_dict, get_dict, and get_json on
+a fresh base, on an unchanged base (cached) and after changing one field,
+next to the baseline (json.dumps with JSONEncoder calling get_dict on
+every object, as get_json did before) and the memory a base holds before
+and after being serialized.
+
+Usage: python benchmarks/bench_serialize.py [groups] [fields_per_group]
+"""
+import sys
+import time
+import json
+import tracemalloc
+
+from libclient.lbtypes import JSONEncoder
+from libclient.lbtypes.base import Base
+from libclient.lbtypes.base import Field
+from libclient.lbtypes.base import Group
+
+
+def make_base(groups, fields):
+    base = Base(name='big', description='benchmark base')
+    for g in range(groups):
+        group = Group(name='gp_%d' % g, multivalued=g % 2 == 0)
+        for f in range(fields):
+            group.add_field(Field('txt_%d_%d' % (g, f), 'Text',
+                                  description=u'campo %d ação' % f))
+        base.add_field(group)
+    return base.get_dict()
+
+
+def bench(func, repeat=10):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_fresh(base_dict, method, repeat=10):
+    """ Best time of 'method' on a base just built by from_dict.
+    """
+    best = None
+    for _ in range(repeat):
+        base = Base.from_dict(base_dict)
+        start = time.perf_counter()
+        method(base)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def retained(base_dict, method=None):
+    """
+    Bytes allocated by Base.from_dict and still alive after 'method' was
+    called on the base.
+    """
+    tracemalloc.start()
+    base = Base.from_dict(base_dict)
+    if method is not None:
+        method(base)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del base
+    return size
+
+
+def report(label, seconds):
+    print('%-40s %9.2f ms' % (label, seconds * 1000))
+
+
+def main(groups=50, fields=100):
+    base_dict = make_base(groups, fields)
+    print('base with %d groups of %d fields' % (groups, fields))
+
+    base = Base.from_dict(base_dict)
+    assert base.get_json() == json.dumps(base, cls=JSONEncoder)
+
+    report('from_dict', bench(lambda: Base.from_dict(base_dict)))
+    report('get_dict', bench(base.get_dict))
+    report('get_json (fresh base)', bench_fresh(base_dict, Base.get_json))
+    report('get_json (unchanged)', bench(base.get_json))
+
+    field = base.content[groups // 2].content[fields // 2]
+
+    def change_and_serialize():
+        field.description = field.description + 'x'
+        return base.get_json()
+
+    report('get_json (one field changed)', bench(change_and_serialize))
+    assert base.get_json() == json.dumps(base, cls=JSONEncoder)
+    report('json.dumps(cls=JSONEncoder) (baseline)',
+           bench(lambda: json.dumps(base, cls=JSONEncoder)))
+
+    print('%-40s %9.2f MB' % ('memory after from_dict',
+                              retained(base_dict) / 1e6))
+    print('%-40s %9.2f MB' % ('memory after get_dict + get_json',
+                              retained(base_dict, lambda base: (
+                                  base.get_dict(), base.get_json())) / 1e6))
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
@@ -1 +1,30 @@
 # libclient package
+"""
+Python client library for LightBase. Public names are imported on first
+access, so a job only loads the modules (and dependencies) it uses.
+"""
+import importlib
+
+# @property _LAZY: public name -> module defining it
+_LAZY = {
+    'BaseREST': 'libclient.lbrest.base',
+    'DocumentREST': 'libclient.lbrest.document',
+    'FileREST': 'libclient.lbrest.file',
+    'Search': 'libclient.lbsearch.search',
+    'Base': 'libclient.lbtypes.base',
+}
+
+__all__ = ['BaseREST', 'DocumentREST', 'FileREST', 'Search', 'Base']
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name))
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -1,6 +1,29 @@
-from libclient.lbrest.core import LBRest
-from libclient.lbrest.base import BaseREST
-from libclient.lbrest.document import DocumentREST
-from libclient.lbrest.file import FileREST
+# -*- coding: utf-8 -*-
+"""
+REST clients of LightBase. Client classes are imported on first access, so
+importing the package does not load requests.
+"""
+import importlib
+
+# @property _LAZY: public name -> module defining it
+_LAZY = {
+    'LBRest': 'libclient.lbrest.core',
+    'BaseREST': 'libclient.lbrest.base',
+    'DocumentREST': 'libclient.lbrest.document',
+    'FileREST': 'libclient.lbrest.file',
+}
 
 __all__ = ['BaseREST', 'DocumentREST', 'FileREST']
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name))
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -0,0 +1,581 @@
+# -*- coding: utf-8 -*-
+"""
+Asyncio versions of BaseREST, DocumentREST and FileREST.
+
+Methods keep the names and argument validation of the blocking clients but
+are coroutines running on the event loop. Requires aiohttp
+(pip install libclient[async]).
+"""
+from six import string_types as PYSTR
+from requests.exceptions import HTTPError
+
+try:
+    import aiohttp
+except ImportError: # pragma: no cover
+    aiohttp = None
+
+from .core import _RestPaths
+from .core import DEFAULT_TIMEOUT
+from .core import _check_timeout
+from .session import CookieState
+from ..utils import json2object
+from ..utils import object2json
+from ..lbtypes.base import Base
+from ..lbtypes.file import File
+from ..lbsearch.search import Search
+from ..lbsearch.search import FileCollection
+
+
+class AsyncLBRest(_RestPaths):
+    """
+    Lightbase Rest communication over asyncio.
+    """
+
+    def __init__(self, rest_url, response_object=False, session=None,
+                 max_connections=100, max_connections_per_host=0,
+                 cookies=None, timeout=DEFAULT_TIMEOUT):
+        """
+        @param rest_url (string): url address of LBGenerator's REST
+        @param response_object (boolean, optional, default=False): if true,
+            calls to methods will return aiohttp's response objects.
+        @param session (aiohttp.ClientSession, optional, default=None):
+            session to share between clients; if None a session is created
+            on first use and closed by close().
+        @param max_connections (int, optional, default=100): max number of
+            concurrent connections (and so requests in flight).
+        @param max_connections_per_host (int, optional, default=0): max
+            concurrent connections to the same host, 0 means no limit.
+        @param cookies (dict or CookieState, optional, default=None): see
+            LBRest.
+        @param timeout (aiohttp.ClientTimeout, float or tuple, optional,
+            default=DEFAULT_TIMEOUT): seconds to wait for a connection and
+            for each read of the response, as a number, a (connect, read)
+            tuple or an aiohttp.ClientTimeout; None waits forever. A
+            'timeout' passed to send_request overrides it. Requests that
+            time out raise asyncio.TimeoutError.
+        """
+        if aiohttp is None:
+            raise ImportError('AsyncLBRest requires aiohttp: '
+                              'pip install libclient[async]')
+        self.rest_url = rest_url
+        self.response_object = response_object
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self._session = session
+        self._owns_session = session is None
+
+        # @property timeout: default request timeout (aiohttp.ClientTimeout)
+        self.timeout = _client_timeout(timeout)
+
+        # @property cookie_state: this client's thread-safe cookies
+        if not isinstance(cookies, CookieState):
+            cookies = CookieState(cookies)
+        self.cookie_state = cookies
+
+    @property
+    def session(self):
+        """ @property session getter: the aiohttp.ClientSession in use
+        """
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host)
+            # Cookies belong to the client's CookieState
+            self._session = aiohttp.ClientSession(
+                connector=connector, cookie_jar=aiohttp.DummyCookieJar())
+            self._owns_session = True
+        return self._session
+
+    async def close(self):
+        """ Closes the session if it was created by this client.
+        """
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def send_request(self, method, url_path=[ ], **kwargs):
+        """
+        @param method:
+        @param path:
+        @param raw (boolean, optional, default=False): if true, returns the
+            body bytes undecoded.
+        @param timeout (aiohttp.ClientTimeout, float or tuple, optional):
+            overrides the client's timeout for this call.
+        Tries to return response text, raise HTTPError if the request fails.
+        With response_object, the aiohttp response is returned unread: the
+        caller reads its body and must release it (e.g. 'async with').
+        """
+        full_url = self.to_url(self.rest_url, *url_path)
+
+        response_object = kwargs.pop('response_object', None) or False
+        raw = kwargs.pop('raw', None) or False
+        if 'timeout' in kwargs:
+            kwargs['timeout'] = _client_timeout(kwargs['timeout'])
+        else:
+            kwargs['timeout'] = self.timeout
+
+        params = kwargs.pop('params', None)
+        if params is not None:
+            # requests drops None values, aiohttp refuses them
+            kwargs['params'] = dict((k, v) for k, v in params.items()
+                                    if v is not None)
+
+        response = await self.session.request(method, full_url,
+                                              cookies=self.cookies, **kwargs)
+
+        if response.cookies:
+            self.cookie_state.update(dict(
+                (name, morsel.value)
+                for name, morsel in response.cookies.items()))
+
+        if self.response_object or response_object:
+            # Return response object for application level error handling
+            return response
+
+        try:
+            body = await response.read()
+        finally:
+            response.release()
+
+        if response.status >= 400:
+            # Something got wrong, raise error
+            raise HTTPError(body.decode(response.charset or 'utf-8',
+                                        'replace'))
+
+        if raw:
+            return body
+
+        return body.decode(response.charset or 'utf-8')
+
+
+def _client_timeout(timeout):
+    """
+    Returns 'timeout' (aiohttp.ClientTimeout, None, seconds or a (connect,
+    read) tuple, as for LBRest) as an aiohttp.ClientTimeout.
+    """
+    if isinstance(timeout, aiohttp.ClientTimeout):
+        return timeout
+    timeout = _check_timeout(timeout)
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+    else:
+        connect = read = timeout
+    return aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+
+
+class AsyncBaseREST(AsyncLBRest):
+    """
+    Asyncio version of BaseREST.
+    """
+
+    async def create(self, base):
+        """
+        @param base (dict or lbtypes.Base): a dict with the base's data or
+            a lbtype.Base instance
+        """
+        if isinstance(base, dict):
+            base_json = object2json(base)
+        elif isinstance(base, Base):
+            base_json = base.get_json()
+        else:
+            raise TypeError('Wrong parameter: base must be a lbtypes.Base or a dict')
+
+        response = await self.send_request(self.httppost,
+                                           data={self.base_param: base_json})
+
+        return int(response)
+
+    async def get(self, basename, as_dict=False):
+        """
+        Retrieves the base with name 'basename'
+
+        @param basename (string): the base's name
+        @param as_dict (boolean, optional, default=False): if False,
+            returns an lbtype.Base instance; if True, returns a dict
+            with base's metadata
+        """
+        if not isinstance(basename, PYSTR):
+            raise TypeError('basename must be a string.')
+
+        response = await self.send_request(self.httpget, url_path=[basename])
+
+        dict_base = json2object(response)
+
+        if as_dict:
+            return dict_base
+
+        return Base.from_dict(dict_base)
+
+    async def get_by_id(self, id_base, as_dict=False):
+        """
+        Retrieves the base with id 'id_base'
+
+        @param id_base (int): the base's id
+        @param as_dict (boolean, optional, default=False): if False,
+            returns an lbtype.Base instance; if True, returns a dict
+            with base's metadata
+        """
+        if not isinstance(id_base, int):
+            raise TypeError('id_base must be an int')
+
+        search_obj = Search(literal='id_base = %d' % id_base)
+        response = await self.send_request(
+            self.httpget, params={self.search_param: search_obj.as_json()})
+
+        dict_base = json2object(response)
+
+        if as_dict:
+            return dict_base
+
+        return Base.from_dict(dict_base)
+
+    async def get_path(self, basename, path=''):
+        """
+        Retrieves metadata for the fields pointed by 'path'.
+
+        @param basename (string): the base's name
+        @param path (string, optional, default=''): path of attributes
+            to be retrieved with path segments separated by slash '/'
+        """
+        path_list = [basename] + path.split('/')
+
+        response = await self.send_request(self.httpget, url_path=path_list)
+
+        return json2object(response)
+
+    async def search(self, search_obj=None):
+        """
+        Retrieves a collection of bases that match search_obj's
+        attributes or all bases if search_obj is None.
+
+        @param search_obj (lbsearch.Search, optional, default=None'):
+        """
+        search_obj = search_obj or Search()
+
+        if not isinstance(search_obj, Search):
+            raise TypeError('search_obj must be a Search object.')
+
+        response = await self.send_request(self.httpget,
+            params={self.search_param: search_obj.as_json()})
+
+        return json2object(response)
+
+    async def update(self, base):
+        """
+        Updates base's metadata.
+
+        @param base (lbtypes.Base): a lbtype.Base instance
+        """
+        if isinstance(base, dict):
+            base_json = object2json(base)
+        elif isinstance(base, Base):
+            base_json = base.get_json()
+        else:
+            raise TypeError('Wrong parameter: base must be a lbtypes.Base or a dict')
+
+        return await self.send_request(self.httpput,
+                                       url_path=[base.metadata.name],
+                                       data={self.base_param: base_json})
+
+    async def delete(self, base):
+        """
+        Deletes base.
+
+        @param base (string or lbtypes.Base): the base's name or the base
+        """
+        if isinstance(base, Base):
+            basename = base.metadata.name
+        elif isinstance(base, PYSTR):
+            basename = base
+        else:
+            raise TypeError('basename must be a string.')
+
+        return await self.send_request(self.httpdelete, url_path=[basename])
+
+
+class AsyncDocumentREST(AsyncLBRest):
+    """
+    Asyncio version of DocumentREST.
+    """
+
+    def __init__(self, rest_url, base, response_object=False, **kwargs):
+        """
+        @param rest_url (string): Lighbase's REST API URL.
+        @param base (string or Base): the base's name or a Base object
+        @param kwargs: connection options (see AsyncLBRest)
+        """
+        super(AsyncDocumentREST, self).__init__(rest_url, response_object,
+                                                **kwargs)
+        if isinstance(base, Base) or isinstance(base, PYSTR):
+            self.base = base
+        else:
+            raise TypeError("Wrong parameter: not a base or string, but {}".format(type(base)))
+
+    async def create(self, document):
+        """
+        Creates new document.
+
+        @param document (dict): the document being created.
+        """
+        if not isinstance(document, dict):
+            raise TypeError('Wrong parameter: document must be a dictionary')
+
+        response = await self.send_request(self.httppost,
+            url_path=[self.basename, self.doc_prefix],
+            data={self.doc_param: object2json(document)})
+        return int(response)
+
+    async def get(self, id):
+        """
+        Retrieves document by id.
+
+        @param id (int): the document's id.
+        """
+        path_list = self.resource_path(self.doc_prefix, id)
+
+        response = await self.send_request(self.httpget, url_path=path_list)
+
+        return json2object(response)
+
+    async def get_path(self, id, path):
+        """
+        Retrieves given path on document.
+
+        @param id (int): The document identify.
+        @param path (string or list): path on document to be retrieved.
+        """
+        path_list = self.resource_path(self.doc_prefix, id, path)
+
+        response = await self.send_request(self.httpget, url_path=path_list)
+
+        return json2object(response)
+
+    async def search(self, search_obj=None):
+        """
+        Retrieves collection of documents according to search object or
+            all documents if search_obj=None.
+
+        @param search_obj (Search): a Search object with the search attributes.
+        """
+        search_obj = search_obj or Search()
+
+        if not isinstance(search_obj, Search):
+            raise TypeError('search_obj must be a Search object.')
+
+        response = await self.send_request(self.httpget,
+            url_path=[self.basename, self.doc_prefix],
+            params={self.search_param: search_obj.as_json()})
+
+        return json2object(response)
+
+    async def update(self, id, document):
+        """
+        Updates document by id.
+
+        @param id (int): the document identify.
+        @param document (dict): updated Document.
+        """
+        return await self.send_request(self.httpput,
+            url_path=[self.basename, self.doc_prefix, str(id)],
+            data={self.doc_param: object2json(document)})
+
+    async def create_path(self, id, path, value):
+        """
+        Creates given path on document.
+
+        @param id (int): the document identify.
+        @param path (string or list): path on document to the field that
+            will be created.
+        @param value: the value to create on path.
+        """
+        path_list = self.resource_path(self.doc_prefix, id, path)
+
+        if isinstance(value, list) or isinstance(value, dict):
+            value = object2json(value)
+
+        return await self.send_request(self.httppost, url_path=path_list,
+                                       data={self.doc_param: value})
+
+    async def update_path(self, id, path, value):
+        """
+        Updates given path on document.
+
+        @param id (int): the document identify.
+        @param path (string or list): path on document to be updated.
+        @param value (any): the value to update on path.
+        """
+        path_list = self.resource_path(self.doc_prefix, id, path)
+
+        return await self.send_request(self.httpput, url_path=path_list,
+                                       data={self.doc_param: object2json(value)})
+
+    async def update_collection(self, path, value=None, search_obj=None):
+        """
+        Updates collection of documents according to search object.
+        See DocumentREST.update_collection for the parameters.
+        """
+        search_obj = search_obj or Search()
+
+        if not isinstance(search_obj, Search):
+            raise TypeError('search_obj must be a Search object.')
+
+        if isinstance(path, PYSTR):
+            path_param = [{'path': path, 'mode': 'update', 'args': value}]
+        elif isinstance(path, list):
+            if len(path) > 0 and not isinstance(path[0], dict):
+                raise TypeError('Wrong parameter: path list must contain dictionaries')
+            path_param = path
+        else:
+            raise TypeError('Wrong parameter: path must be a list or string')
+
+        response = await self.send_request(self.httpput,
+            url_path=(self.basename, self.doc_prefix),
+            params={self.search_param: search_obj.as_json(),
+                    self.path_param: object2json(path_param)})
+
+        return json2object(response)
+
+    async def delete(self, id):
+        """
+        Deletes document by id.
+
+        @param id (int): the document identify.
+        """
+        return await self.send_request(self.httpdelete,
+            url_path=[self.basename, self.doc_prefix, str(id)])
+
+    async def delete_path(self, id, path):
+        """
+        Deletes fields given by the path on document.
+
+        @param id(int): the document identify.
+        @param path (string or list): path of the fields that will be deleted.
+        """
+        path_list = self.resource_path(self.doc_prefix, id, path)
+
+        return await self.send_request(self.httpdelete, url_path=path_list)
+
+    async def delete_collection(self, path=None, search_obj=None):
+        """
+        Deletes collection of documents (or paths on them) according to
+        search object. See DocumentREST.delete_collection.
+        """
+        if path is not None and not isinstance(path, (PYSTR, list)):
+            raise TypeError('Wrong parameter: ' +
+                            'path (optional) must be str or list of dict')
+
+        search_obj = search_obj or Search()
+
+        if not isinstance(search_obj, Search):
+            raise TypeError('Wrong parameter: search_obj must be a Search')
+
+        path_param = object2json(path) if path is not None else None
+        method = self.httpdelete\
+            if path is None or isinstance(path, PYSTR) \
+            else self.httpput
+
+        response = await self.send_request(method,
+            url_path=(self.basename, self.doc_prefix),
+            params={self.search_param: search_obj.as_json(),
+                    self.path_param: path_param})
+
+        return json2object(response)
+
+
+class AsyncFileREST(AsyncLBRest):
+    """
+    Asyncio version of FileREST.
+    """
+
+    def __init__(self, rest_url, base, response_object=False, **kwargs):
+        """
+        @param rest_url: the REST URL.
+        @param base (string or Base): the base's name or a Base object
+        @param kwargs: connection options (see AsyncLBRest)
+        """
+        super(AsyncFileREST, self).__init__(rest_url, response_object,
+                                            **kwargs)
+        if isinstance(base, Base) or isinstance(base, PYSTR):
+            self.base = base
+        else:
+            raise TypeError("Wrong parameter: not a base or string, but {}".format(type(base)))
+
+    async def create(self, file):
+        """
+        Creates file.
+
+        @param file (File or tuple): File object or tuple containg filename
+            (string) and file contents (bytes).
+        """
+        if isinstance(file, File):
+            file_param = (file.filename, file.content)
+        elif isinstance(file, tuple):
+            file_param = file
+        else:
+            raise TypeError('Wrong parameter: files must be a 2-valued tuple containg: file name and file content')
+
+        form = aiohttp.FormData()
+        form.add_field(self.file_param, file_param[1], filename=file_param[0])
+
+        response = await self.send_request(self.httppost,
+            url_path=[self.basename, self.file_prefix], data=form)
+        return json2object(response)
+
+    async def get(self, id):
+        """
+        Retrieves file by id, returns file's headers.
+
+        @param id (int): the file identify.
+        """
+        response = await self.send_request(self.httpget,
+            url_path=[self.basename, self.file_prefix, str(id)])
+        return File.from_dict(json2object(response))
+
+    async def get_content(self, id):
+        """
+        Retrieves file's binary by id.
+
+        @param id (int): the file identify.
+        """
+        return await self.send_request(self.httpget,
+            url_path=[self.basename, self.file_prefix, str(id), 'download'],
+            raw=True)
+
+    async def get_collection(self, search_obj=None):
+        """
+        Retrieves collection of "file text" according to search object.
+
+        @param search_obj (Search, optional, default=None): a Search object.
+        """
+        if search_obj is not None:
+            msg = 'search_obj must be a Search object.'
+            assert isinstance(search_obj, Search), msg
+        else:
+            search_obj = Search()
+        response = await self.send_request(self.httpget,
+            url_path=[self.basename, self.file_prefix],
+            params={self.search_param: search_obj.as_json()})
+        return FileCollection(**json2object(response))
+
+    async def get_path(self, id, path):
+        """
+        Retrieves a file attribute by id. See FileREST.get_path.
+        """
+        return await self.send_request(self.httpget,
+            url_path=[self.basename, self.file_prefix, str(id), path])
+
+    async def download(self, id):
+        """ Alias to @method get
+        """
+        return await self.get(id)
+
+    async def upload(self, files):
+        """ Alias to @method create
+        """
+        return await self.create(files)
@@ -2,10 +2,10 @@
 from six import string_types as PYSTR
 
 from .core import LBRest
-from ..utils import json2object
 from ..utils import object2json
 from ..lbtypes.base import Base
 from ..lbsearch.search import Search
+from ..lbsearch.search import ResultStream
 
 
 class BaseREST(LBRest):
@@ -13,11 +13,14 @@ class BaseREST(LBRest):
     Contains methods for handling Lightbase Bases via Lightbase's REST API.
     """
 
-    def __init__(self, rest_url, response_object=False):
+    def __init__(self, rest_url, response_object=False, **kwargs):
         """
         @param rest_url (string): url address of LBGenerator's REST
+        @param kwargs: connection pool options (see LBRest); with a
+            'schema_cache', get() returns cached bases and update() and
+            delete() invalidate them.
         """
-        super(BaseREST, self).__init__(rest_url, response_object)
+        super(BaseREST, self).__init__(rest_url, response_object, **kwargs)
 
     def create(self, base):
         """
@@ -31,7 +34,9 @@ class BaseREST(LBRest):
         else:
             raise TypeError('Wrong parameter: base must be a lbtypes.Base or a dict')
 
-        response = self.send_request(self.httppost, data={self.base_param: base_json})
+        response = self.send_request(self.httppost, data={self.base_param: base_json},
+                                     operation=self._op('create'))
+        self._invalidate_schema(_base_name(base))
 
         return int(response)
 
@@ -43,14 +48,20 @@ class BaseREST(LBRest):
         @param as_dict (boolean, optional, default=False): if False,
             returns an lbtype.Base instance; if True, returns a dict
             with base's metadata
+        With a schema cache the Base is shared with other callers and must
+        not be modified.
         """
         if not isinstance(basename, PYSTR):
             raise TypeError('basename must be a string.')
 
-        response = self.send_request(self.httpget,
-                                     url_path=[basename])
+        if self.schema_cache is not None:
+            from .schema import fetch_base
+            base = fetch_base(self, basename, self._op('get'))
+            return base.get_dict() if as_dict else base
 
-        dict_base = json2object(response)
+        dict_base = self.send_request(self.httpget,
+                                      url_path=[basename], decode=True,
+                                      operation=self._op('get'))
 
         if as_dict:
             return dict_base
@@ -71,10 +82,9 @@ class BaseREST(LBRest):
 
         literal = 'id_base = %d' % id_base
         search_obj = Search(literal=literal)
-        response = self.send_request(
-            self.httpget, params={self.search_param: search_obj.as_json()})
-
-        dict_base = json2object(response)
+        dict_base = self.send_request(
+            self.httpget, params={self.search_param: search_obj.as_json()},
+            decode=True, operation=self._op('get_by_id'))
 
         if as_dict:
             return dict_base
@@ -94,27 +104,39 @@ class BaseREST(LBRest):
         for p in path.split('/'):
             path_list.append(p)
 
-        response = self.send_request(self.httpget, url_path=path_list)
+        response = self.send_request(self.httpget, url_path=path_list,
+                                     decode=True,
+                                     operation=self._op('get_path'))
 
-        return json2object(response)
+        return response
 
     # TODO: return as_dict parameter
-    def search(self, search_obj=None):
+    def search(self, search_obj=None, stream=False):
         """
         Retrieves a collection of bases that match search_obj's 
         attributes or all bases if search_obj is None.
 
         @param search_obj (lbsearch.Search, optional, default=None'):
+        @param stream (boolean, optional, default=False): if true, returns a
+            ResultStream (libclient.lbsearch.search.ResultStream) that yields
+            each base as soon as it is parsed, instead of the decoded dict.
         """
         search_obj = search_obj or Search()
 
         if search_obj is not None and not isinstance(search_obj, Search):
             raise TypeError('search_obj must be a Search object.')
 
+        if stream:
+            return ResultStream(self.send_stream(self.httpget,
+                array_keys=('results',),
+                params={self.search_param: search_obj.as_json()},
+                operation=self._op('search')))
+
         response = self.send_request(self.httpget,
-            params={self.search_param: search_obj.as_json()})
+            params={self.search_param: search_obj.as_json()}, decode=True,
+            operation=self._op('search'))
 
-        return json2object(response)
+        return response
 
     # TODO TODO TODO!!!
     def update(self, base):
@@ -131,8 +153,13 @@ class BaseREST(LBRest):
         else:
             raise TypeError('Wrong parameter: base must be a lbtypes.Base or a dict')
 
-        return self.send_request(self.httpput, url_path=[base.metadata.name],
-                                 data={self.base_param: base_json})
+        basename = _base_name(base)
+        try:
+            return self.send_request(self.httpput, url_path=[basename],
+                                     data={self.base_param: base_json},
+                                     operation=self._op('update'))
+        finally:
+            self._invalidate_schema(basename)
 
     def delete(self, base):
         """
@@ -147,8 +174,18 @@ class BaseREST(LBRest):
         else:
             raise TypeError('basename must be a string.')
         
-        return self.send_request(self.httpdelete,
-                                 url_path=[basename])
+        try:
+            return self.send_request(self.httpdelete,
+                                     url_path=[basename],
+                                     operation=self._op('delete'))
+        finally:
+            self._invalidate_schema(basename)
+
+    def _invalidate_schema(self, basename):
+        """ Drops 'basename' from the schema cache, if any.
+        """
+        if self.schema_cache is not None:
+            self.schema_cache.invalidate(self.rest_url, basename)
 
     def create_txt_idx(self, base):
         """
@@ -277,4 +314,13 @@ class BaseREST(LBRest):
                     "url_idx":str_idx_exp_url,
                     "actv_idx": True
                 }
-                return self.send_request(self.httppost, url_path=['_txt_idx'],data={self.txt_idx_param: object2json(txt_idx)})
\ No newline at end of file
+                return self.send_request(self.httppost, url_path=['_txt_idx'],data={self.txt_idx_param: object2json(txt_idx)},
+                                         operation=self._op('create_txt_idx'))
+
+
+def _base_name(base):
+    """ Returns the name of 'base' (lbtypes.Base or dict).
+    """
+    if isinstance(base, Base):
+        return base.metadata.name
+    return base['metadata']['name']
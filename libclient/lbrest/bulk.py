@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+import time
+import itertools
+import threading
+import collections
+
+from .deadline import current_deadline
+from .deadline import propagate
+
+
+class BulkResult(object):
+    """
+    Outcome of a bulk operation.
+    """
+
+    def __init__(self):
+        # @property results: one result per input item, in input order,
+        # None for items that failed
+        self.results = []
+
+        # @property errors: dict mapping failed item index to its exception
+        self.errors = {}
+
+        # @property elapsed: wall time of the whole operation, in seconds
+        self.elapsed = 0.0
+
+        # @property expired: True if the deadline was spent during the
+        # operation; items not read by then are not in results
+        self.expired = False
+
+    @property
+    def count(self):
+        """ @property count: number of processed items
+        """
+        return len(self.results)
+
+    @property
+    def failed(self):
+        """ @property failed: number of failed items
+        """
+        return len(self.errors)
+
+    @property
+    def succeeded(self):
+        """ @property succeeded: number of successful items
+        """
+        return self.count - self.failed
+
+    @property
+    def rate(self):
+        """ @property rate: processed items per second
+        """
+        if not self.elapsed:
+            return 0.0
+        return self.count / self.elapsed
+
+    def stats(self):
+        """ Returns throughput stats as a dict.
+        """
+        return {
+            'count': self.count,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'elapsed': self.elapsed,
+            'rate': self.rate
+        }
+
+
+class UploadResult(BulkResult):
+    """
+    Outcome of a bulk upload, with the amount of data sent.
+    """
+
+    def __init__(self):
+        super(UploadResult, self).__init__()
+
+        # @property bytes: total size of the successfully uploaded files
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def add_bytes(self, size):
+        """ Adds 'size' to the uploaded bytes; safe to call from workers.
+        """
+        with self._lock:
+            self.bytes += size
+
+    @property
+    def bytes_per_sec(self):
+        """ @property bytes_per_sec: aggregate upload throughput
+        """
+        if not self.elapsed:
+            return 0.0
+        return self.bytes / self.elapsed
+
+    def stats(self):
+        """ Returns throughput stats as a dict.
+        """
+        stats = super(UploadResult, self).stats()
+        stats['bytes'] = self.bytes
+        stats['bytes_per_sec'] = self.bytes_per_sec
+        return stats
+
+
+def chunks(iterable, chunk_size):
+    """
+    Generates lists of up to 'chunk_size' items read lazily from 'iterable'.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_bulk(func, iterable, concurrency=4, chunk_size=100, result=None):
+    """
+    Calls 'func' on every item of 'iterable' over a bounded thread pool,
+    starting the next item as soon as a worker is free.
+
+    @param func (callable): function called with one item.
+    @param iterable (iterable): items, read as workers free up so
+        generators are never fully loaded in memory.
+    @param concurrency (int, optional, default=4): number of worker threads,
+        i.e. max number of items in flight.
+    @param chunk_size (int, optional, default=100): max number of items
+        read from 'iterable' and held in memory at a time, finished ones
+        included until every item before them is done.
+    @param result (BulkResult, optional, default=None): result to fill.
+
+    Errors raised by 'func' are stored in BulkResult.errors without
+    aborting the remaining items. Under a deadline (see deadline.Deadline)
+    items run under it and no more items are read once it is spent.
+    """
+    if not isinstance(concurrency, int) or concurrency < 1:
+        raise ValueError('concurrency must be a positive int')
+
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise ValueError('chunk_size must be a positive int')
+
+    result = result or BulkResult()
+    start = time.perf_counter()
+    deadline = current_deadline()
+    func = propagate(func)
+    items = iter(iterable)
+    exhausted = False
+
+    # futures in input order whose results are not collected yet
+    window = collections.deque()
+    running = set()
+
+    from concurrent.futures import ThreadPoolExecutor
+    from concurrent.futures import FIRST_COMPLETED
+    from concurrent.futures import wait
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while True:
+            while window and window[0].done():
+                try:
+                    value = window.popleft().result()
+                except Exception as e:
+                    result.errors[len(result.results)] = e
+                    value = None
+                result.results.append(value)
+
+            while not exhausted and len(running) < concurrency and \
+                    len(window) < chunk_size:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if deadline is not None and deadline.expired:
+                    result.expired = exhausted = True
+                    break
+                future = executor.submit(func, item)
+                window.append(future)
+                running.add(future)
+
+            if not running:
+                break
+            running = wait(running, return_when=FIRST_COMPLETED).not_done
+
+    result.elapsed = time.perf_counter() - start
+    return result
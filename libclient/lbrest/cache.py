@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+import time
+import threading
+from collections import OrderedDict
+
+from .session import register_after_fork
+
+
+class DocumentCache(object):
+    """
+    Thread-safe LRU cache with per-entry TTL for document responses.
+
+    Entries are stored by key (rest_url, basename, id, path, identity);
+    path is None for whole documents and identity tells apart clients with
+    different credentials (see libclient.lbrest.schema.client_identity).
+    Values are the raw responses so every hit decodes a fresh object that
+    callers may change freely.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        """
+        @param maxsize (int, optional, default=1024): max number of entries;
+            least recently used entries are evicted first.
+        @param ttl (int or float, optional, default=60): seconds an entry
+            stays valid, None for no expiration.
+        """
+        if not isinstance(maxsize, int) or maxsize < 1:
+            raise ValueError('maxsize must be a positive int')
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._doc_keys = {}
+        self._lock = threading.Lock()
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        register_after_fork(self)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        """
+        @property version: changes on every invalidation. Read it before
+            a request and pass it to set() so a response that raced with a
+            write is never cached.
+        """
+        return self._version
+
+    def get(self, key):
+        """
+        Returns the cached value for 'key' or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires = entry
+            if expires is not None and expires <= time.monotonic():
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, version=None):
+        """
+        Stores 'value' for 'key', evicting the least recently used entries.
+
+        @param version (int, optional, default=None): version read before
+            the request; the value is dropped if it changed since.
+        """
+        expires = None
+        if self.ttl is not None:
+            expires = time.monotonic() + self.ttl
+
+        with self._lock:
+            if version is not None and version != self._version:
+                return
+
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            self._doc_keys.setdefault(key[:3], set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key):
+        """ Removes 'key'; caller must hold the lock.
+        """
+        del self._entries[key]
+        doc_keys = self._doc_keys.get(key[:3])
+        if doc_keys is not None:
+            doc_keys.discard(key)
+            if not doc_keys:
+                del self._doc_keys[key[:3]]
+
+    def invalidate(self, rest_url, basename, id=None):
+        """
+        Drops every entry of document 'id', or of the whole base if id is
+        None, for every identity.
+        """
+        with self._lock:
+            self._version += 1
+            if id is None:
+                doc_keys = [k for k in self._doc_keys
+                            if k[0] == rest_url and k[1] == basename]
+            else:
+                doc_keys = [(rest_url, basename, id)]
+
+            for doc_key in doc_keys:
+                for key in list(self._doc_keys.get(doc_key, ())):
+                    self._drop(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        """ Drops every entry.
+        """
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            self._doc_keys.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """ Returns cache counters as a dict.
+        """
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations
+        }
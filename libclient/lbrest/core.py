@@ -1,14 +1,28 @@
 # -*- coding: utf-8 -*-
-import requests
+import time
+
 from six import string_types as PYSTR
 from requests.exceptions import HTTPError
+from requests.exceptions import ConnectionError
+from requests.exceptions import Timeout
+
+from ..utils import json2object
+from .session import LBSession
+from .session import get_shared_session
+from .session import pop_connect_time
+from .session import CookieState
+from .deadline import DeadlineExceeded
+from .deadline import current_deadline
 
-SESSION_COOKIES = None
+# @property DEFAULT_TIMEOUT: (connect, read) timeout of every request, in
+# seconds
+DEFAULT_TIMEOUT = (10, 120)
 
-class LBRest(object):
+class _RestPaths(object):
 
     """
-    Lightbase Rest communication
+    Resource names, url building and cookies shared by LBRest and
+    AsyncLBRest (libclient.lbrest.aio).
     """
 
     # @httpverb properties:
@@ -41,9 +55,8 @@ class LBRest(object):
     # @property path_param:
     path_param = 'path'
 
-    def __init__(self, rest_url, response_object=False):
-        self.rest_url = rest_url
-        self.response_object = response_object
+    # @property id_field: document id column
+    id_field = 'id_doc'
 
     # delete path - to_url(self, *args)
     def to_url(self, *args):
@@ -52,37 +65,305 @@ class LBRest(object):
         args = [arg for arg in args if arg is not None]
         return '/'.join(args)
 
+    def resource_path(self, prefix, id, path=None):
+        """
+        Builds url_path for a resource (document or file) of the base,
+        optionally followed by a path inside it.
+
+        @param prefix (string): resource prefix (doc_prefix or file_prefix).
+        @param id (int): the resource's id.
+        @param path (string or list, optional, default=None): if string
+            segments must be separated by '/', if list each element is a
+            string containing a segment of the path.
+        """
+        if not isinstance(id, int):
+            raise TypeError('Wrong parameter: id must be an int')
+
+        path_list = [self.basename, prefix, str(id)]
+        if path is None:
+            return path_list
+
+        if isinstance(path, PYSTR):
+            for p in path.split('/'):
+                path_list.append(p)
+        elif isinstance(path, list):
+            path_list += path
+        else:
+            raise TypeError('Wrong parameter: path must be a list or string')
+
+        return path_list
+
     @property
     def cookies(self):
+        """ @property cookies getter: copy of this client's cookies (dict)
         """
-        """
-        session_cookies = getattr(self, '_cookies', None)
-        if not session_cookies:
-            self._cookies = SESSION_COOKIES
-        return self._cookies
+        return self.cookie_state.get()
 
     @cookies.setter
     def cookies(self, value):
+        """ @property cookies setter: replaces this client's cookies
+        """
+        self.cookie_state.set(value)
+
+    @property
+    def base(self):
+        """ @property base getter
+        """
+        return self._base
+
+    @base.setter
+    def base(self, value):
+        from .base import Base
+        """ @property base setter
+        """
+        if isinstance(value, PYSTR):
+            self.basename = value
+        elif isinstance(value, Base):
+            self.basename = value.metadata.name
+        else:
+            raise TypeError('base must be a lbtypes.Base or string.')
+        self._base = value
+
+
+class LBRest(_RestPaths):
+
+    """
+    Lightbase Rest communication
+    """
+
+    # @property hook_events: events accepted by register_hook
+    hook_events = ('pre_request', 'post_request')
+
+    def __init__(self, rest_url, response_object=False, session=None,
+                 shared_session=False,
+                 pool_connections=None, pool_maxsize=None, pool_block=None,
+                 retry=None, circuit_breaker=None, timeout=DEFAULT_TIMEOUT,
+                 hooks=None, coalesce=False, cookies=None, schema_cache=None):
+        """
+        @param rest_url (string): url address of LBGenerator's REST
+        @param response_object (boolean, optional, default=False): if true,
+            calls to methods will return python's response objects.
+        @param session (LBSession, optional, default=None): connection pool
+            to use; overrides 'shared_session' and the pool parameters.
+        @param shared_session (boolean, optional, default=False): if true,
+            reuses the connection pool of every other client created with
+            shared_session=True for the same 'rest_url'; the pool parameters
+            given must then match the shared pool's, or ValueError is raised.
+        @param pool_connections (int, optional, default=None): number of host
+            pools to cache; None keeps LBSession's default (or, with
+            shared_session, the shared pool's setting).
+        @param pool_maxsize (int, optional, default=None): max connections
+            kept per host; None works as for pool_connections.
+        @param pool_block (boolean, optional, default=None): wait for a free
+            connection instead of opening extra ones when the pool is full;
+            None works as for pool_connections.
+        @param retry (RetryPolicy, optional, default=None): retries failed
+            requests; None disables retries.
+        @param circuit_breaker (CircuitBreaker or boolean, optional,
+            default=None): fails fast while the server is unhealthy; True
+            uses the breaker shared by every client of 'rest_url'.
+        @param timeout (float or tuple, optional, default=DEFAULT_TIMEOUT):
+            seconds to wait for a connection and for each read of the
+            response, as a number or a (connect, read) tuple; None waits
+            forever. A 'timeout' passed to send_request overrides it.
+        @param hooks (dict, optional, default=None): request hooks by event,
+            see @method register_hook.
+        @param coalesce (boolean or SingleFlight, optional, default=False):
+            if true, concurrent identical GETs (same url and parameters)
+            share one request; each caller still decodes its own result.
+            A SingleFlight shares requests between clients, which must then
+            use the same credentials.
+        @param cookies (dict or CookieState, optional, default=None): auth
+            cookies of this client; a CookieState may be shared by clients
+            that act as the same identity.
+        @param schema_cache (SchemaCache or boolean, optional, default=None):
+            cache of base schemas (libclient.lbrest.schema.SchemaCache); True
+            uses the cache shared by every client of the process. Clients
+            share cached schemas only if they have the same cookies.
+        """
+        self.rest_url = rest_url
+        self.response_object = response_object
+
+        # Only the pool parameters given are passed, so a client using the
+        # defaults accepts any shared pool.
+        pool_args = dict((name, value) for name, value in (
+            ('pool_connections', pool_connections),
+            ('pool_maxsize', pool_maxsize),
+            ('pool_block', pool_block)) if value is not None)
+        if session is None:
+            if shared_session:
+                session = get_shared_session(rest_url, **pool_args)
+            else:
+                session = LBSession(**pool_args)
+        elif not isinstance(session, LBSession):
+            raise TypeError('session must be a LBSession.')
+
+        # @property session: pooled keep-alive HTTP session
+        self.session = session
+
+        # Optional features import their module on first use only
+        if retry is not None:
+            from .policy import RetryPolicy
+            if not isinstance(retry, RetryPolicy):
+                raise TypeError('retry must be a RetryPolicy.')
+
+        # @property retry: retry policy, None if disabled
+        self.retry = retry
+
+        if circuit_breaker is True:
+            from .policy import get_circuit_breaker
+            circuit_breaker = get_circuit_breaker(rest_url)
+        elif circuit_breaker is False:
+            circuit_breaker = None
+        elif circuit_breaker is not None:
+            from .policy import CircuitBreaker
+            if not isinstance(circuit_breaker, CircuitBreaker):
+                raise TypeError('circuit_breaker must be a CircuitBreaker.')
+
+        # @property circuit_breaker: endpoint circuit breaker, None if disabled
+        self.circuit_breaker = circuit_breaker
+
+        # @property timeout: default request timeout
+        self.timeout = _check_timeout(timeout)
+
+        if coalesce is False:
+            coalesce = None
+        elif coalesce is not None:
+            from .singleflight import SingleFlight
+            if coalesce is True:
+                coalesce = SingleFlight()
+            elif not isinstance(coalesce, SingleFlight):
+                raise TypeError('coalesce must be a boolean or a SingleFlight.')
+
+        # @property single_flight: GET coalescing, None if disabled
+        self.single_flight = coalesce
+
+        if not isinstance(cookies, CookieState):
+            cookies = CookieState(cookies)
+
+        # @property cookie_state: this client's thread-safe cookies
+        self.cookie_state = cookies
+
+        if schema_cache is True:
+            from .schema import get_schema_cache
+            schema_cache = get_schema_cache()
+        elif schema_cache is False:
+            schema_cache = None
+        elif schema_cache is not None:
+            from .schema import SchemaCache
+            if not isinstance(schema_cache, SchemaCache):
+                raise TypeError(
+                    'schema_cache must be a boolean or a SchemaCache.')
+
+        # @property schema_cache: base schema cache, None if disabled
+        self.schema_cache = schema_cache
+
+        # @property hooks: callables run around every send_request call
+        self.hooks = dict((event, []) for event in self.hook_events)
+        for event, event_hooks in (hooks or {}).items():
+            if callable(event_hooks):
+                event_hooks = [event_hooks]
+            for hook in event_hooks:
+                self.register_hook(event, hook)
+
+    def register_hook(self, event, hook):
+        """
+        Registers a callable run around every send_request call.
+
+        @param event (string): 'pre_request', run before the request is
+            sent, or 'post_request', run after the call ends, on errors too.
+        @param hook (callable): called with a RequestInfo
+            (libclient.lbrest.metrics.RequestInfo) describing the call:
+            verb, operation, base name, sizes, status and timings.
         """
+        if event not in self.hook_events:
+            raise ValueError('event must be one of %s' % (self.hook_events,))
+        if not callable(hook):
+            raise TypeError('hook must be callable')
+        self.hooks[event].append(hook)
+
+    def unregister_hook(self, event, hook):
+        """
+        Removes a hook registered with @method register_hook.
         """
-        self._cookies = value
-        globals()['SESSION_COOKIES'] = value
+        self.hooks[event].remove(hook)
 
     # delete path - send_request(self, method, url_path=[ ], **kwargs)
     def send_request(self, method, url_path=[ ], **kwargs):
         """
         @param method:
         @param path:
+        @param raw (boolean, optional, default=False): if true, returns the
+            body bytes undecoded, ready for json2object, which skips the
+            charset detection requests runs for response.text.
+        @param decode (boolean or callable, optional, default=None): if
+            true, returns the JSON body decoded by json2object; a callable
+            is called with the body bytes instead.
+        @param timeout (float or tuple, optional): overrides the client's
+            timeout for this call.
+        @param operation (string, optional): name of the operation reported
+            to hooks; client methods pass their own (see @method _op),
+            by default '<client class>.send_request'.
         Tries to return json response, raise RequestError if exception occurs.
         """
-        # First get request method
-        request_method = getattr(requests, method.lower())
-        # Make http request
+        # Make http request through the pooled session
         full_url = self.to_url(self.rest_url, *url_path)
 
         response_object = kwargs.pop('response_object', None) or False
+        raw = kwargs.pop('raw', None) or False
+        decode = kwargs.pop('decode', None)
+        operation = kwargs.pop('operation', None)
+
+        if not (self.hooks['pre_request'] or self.hooks['post_request']):
+            return self._handle(method, full_url, response_object, raw,
+                                decode, None, kwargs)
 
-        response = request_method(full_url, cookies=self.cookies, **kwargs)
+        from .metrics import RequestInfo
+        info = RequestInfo(method, operation or self._op('send_request'),
+                           getattr(self, 'basename', None), full_url)
+        for hook in self.hooks['pre_request']:
+            hook(info)
+
+        start = time.perf_counter()
+        try:
+            return self._handle(method, full_url, response_object, raw,
+                                decode, info, kwargs)
+        except Exception as e:
+            info.error = e
+            raise
+        finally:
+            info.timings['total'] = time.perf_counter() - start
+            for hook in self.hooks['post_request']:
+                hook(info)
+
+    def _handle(self, method, full_url, response_object, raw, decode, info,
+                kwargs):
+        """
+        Sends the request and checks and decodes its response (see
+        @method send_request), recording it in 'info' if not None.
+        """
+        key = None
+        if self.single_flight is not None and method == self.httpget and \
+                not (self.response_object or response_object):
+            key = _coalesce_key(full_url, kwargs)
+
+        if key is None:
+            response = self._perform(method, full_url, info, **kwargs)
+        else:
+            deadline = current_deadline()
+            try:
+                response, shared = self.single_flight.do(
+                    key,
+                    lambda: self._perform(method, full_url, info, **kwargs),
+                    deadline.remaining() if deadline is not None else None)
+            except Timeout:
+                if deadline is not None:
+                    deadline.check()
+                raise
+            if shared and info is not None:
+                info.coalesced = True
+                info.status = response.status_code
+                info.response_bytes = len(response.content)
 
         if self.response_object or response_object:
             # Return response object for application level error handling
@@ -96,23 +377,258 @@ class LBRest(object):
             raise HTTPError(response.text)
         else:
             # Everything is alright, return response
+            if decode:
+                body = response.content
+                start = time.perf_counter()
+                if decode is True:
+                    value = json2object(body)
+                else:
+                    value = decode(body)
+                if info is not None:
+                    info.timings['decode'] = time.perf_counter() - start
+                return value
+            if raw:
+                return response.content
             return response.text
 
-    @property
-    def base(self):
-        """ @property base getter
+    def _op(self, name):
         """
-        return self._base
+        Returns the operation reported to hooks for the client method
+        'name', e.g. 'DocumentREST.get'.
+        """
+        return '%s.%s' % (type(self).__name__, name)
 
-    @base.setter
-    def base(self, value):
-        from .base import Base
-        """ @property base setter
+    def _perform(self, method, full_url, info=None, **kwargs):
         """
-        if isinstance(value, PYSTR):
-            self.basename = value
-        elif isinstance(value, Base):
-            self.basename = value.metadata.name
-        else:
-            raise TypeError('base must be a lbtypes.Base or string.')
-        self._base = value
+        Sends the request through the circuit breaker, retrying it as the
+        retry policy allows. Bodies read from a file object are sent once
+        since they cannot be replayed. Timeouts are capped by the current
+        deadline (see deadline.Deadline). Attempts, sizes and timings of
+        the last attempt are recorded in 'info' if not None.
+        """
+        retry = self.retry
+        breaker = self.circuit_breaker
+        if hasattr(kwargs.get('data'), 'read'):
+            retry = None
+
+        deadline = current_deadline()
+        timeout = _check_timeout(kwargs.pop('timeout', self.timeout))
+
+        attempt = 0
+        while True:
+            if deadline is not None:
+                kwargs['timeout'] = deadline.limit(timeout)
+            else:
+                kwargs['timeout'] = timeout
+
+            if breaker is not None:
+                breaker.before_request()
+
+            if info is not None:
+                info.attempts += 1
+                pop_connect_time()
+                start = time.perf_counter()
+
+            try:
+                response = self.session.request(method, full_url,
+                                                cookies=self.cookies, **kwargs)
+            except (ConnectionError, Timeout) as e:
+                if breaker is not None:
+                    breaker.record_failure()
+                if deadline is not None and isinstance(e, Timeout):
+                    deadline.check()
+                if retry is None or \
+                        not retry.should_retry(method, attempt, error=e):
+                    raise
+                _sleep(retry.backoff(attempt), deadline)
+                attempt += 1
+                continue
+            except Exception:
+                # e.g. ChunkedEncodingError or TooManyRedirects: no usable
+                # response, and a half-open trial must not stay pending
+                if breaker is not None:
+                    breaker.record_failure()
+                raise
+            except BaseException:
+                if breaker is not None:
+                    breaker.release_trial()
+                raise
+
+            if breaker is not None:
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+
+            if response.cookies:
+                self.cookie_state.update(response.cookies)
+
+            if info is not None:
+                _record(info, response, time.perf_counter() - start,
+                        kwargs.get('stream'))
+
+            if retry is None or not retry.should_retry(
+                    method, attempt, status=response.status_code):
+                return response
+
+            delay = retry.backoff(attempt, _retry_after(response))
+            response.close()
+            _sleep(delay, deadline)
+            attempt += 1
+
+    def warmup(self, connections=None):
+        """
+        Opens keep-alive connections to the REST server ahead of the first
+        requests, e.g. in a worker process right after the fork. Returns
+        the number of connections opened.
+
+        @param connections (int, optional, default=None): connections to
+            hold open, at most the session's pool_maxsize (the default).
+        """
+        return self.session.warmup(self.rest_url, connections, self.timeout)
+
+    def stats(self):
+        """
+        Returns retry, circuit breaker, coalescing and schema cache counters
+        as a dict.
+        """
+        stats = {}
+        if self.retry is not None:
+            stats['retry'] = self.retry.stats()
+        if self.circuit_breaker is not None:
+            stats['circuit_breaker'] = self.circuit_breaker.stats()
+        if self.single_flight is not None:
+            stats['coalescing'] = self.single_flight.stats()
+        if self.schema_cache is not None:
+            stats['schema_cache'] = self.schema_cache.stats()
+        return stats
+
+    def send_stream(self, method, url_path=[ ], array_keys=(),
+                    chunk_size=65536, **kwargs):
+        """
+        Generates the (key, value) members of a JSON object response while
+        it is downloaded; members named in 'array_keys' yield one
+        (key, element) pair per element (see utils.JSONStreamParser).
+        The request is sent on the first iteration.
+        """
+        response = self.send_request(method, url_path, stream=True,
+                                     response_object=True, **kwargs)
+        try:
+            if not response.ok:
+                raise HTTPError(response.text)
+
+            chunks = response.iter_content(chunk_size=chunk_size)
+            deadline = current_deadline()
+            if deadline is not None:
+                chunks = _checked(chunks, deadline)
+            from ..utils import JSONStreamParser
+            for member in JSONStreamParser(chunks, array_keys):
+                yield member
+        finally:
+            response.close()
+
+
+
+def _retry_after(response):
+    """
+    Returns the seconds in the response's Retry-After header, None if it
+    is missing or an HTTP date.
+    """
+    value = response.headers.get('Retry-After')
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _coalesce_key(full_url, kwargs):
+    """
+    Returns the key identifying a GET among concurrent ones, None if it
+    must not be shared: streamed, or with options other than its query
+    parameters and timeout.
+    """
+    if any(name not in ('params', 'timeout') for name in kwargs):
+        return None
+
+    params = kwargs.get('params')
+    if isinstance(params, dict):
+        params = tuple(sorted(params.items()))
+    elif isinstance(params, list):
+        params = tuple(params)
+
+    key = (full_url, params)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _record(info, response, seconds, stream):
+    """
+    Records status, sizes and timings of a request that took 'seconds'.
+    response.elapsed runs from sending the request to parsing the headers,
+    so it holds the connect and server wait times; the body of a streamed
+    response is read after the call.
+    """
+    connect = pop_connect_time()
+    elapsed = response.elapsed.total_seconds()
+    info.status = response.status_code
+    info.timings['connect'] = connect
+    info.timings['wait'] = max(0.0, elapsed - connect)
+    info.request_bytes = _body_size(response.request.body)
+    if stream:
+        length = response.headers.get('Content-Length')
+        info.response_bytes = int(length) if length is not None else None
+    else:
+        info.timings['download'] = max(0.0, seconds - elapsed)
+        info.response_bytes = len(response.content)
+
+
+def _body_size(body):
+    """
+    Returns the size of a prepared request body, None if unknown.
+    """
+    if body is None:
+        return 0
+    if isinstance(body, (bytes, PYSTR)):
+        return len(body)
+    return getattr(body, 'len', None)
+
+
+def _check_timeout(timeout):
+    """
+    Validates a requests timeout: None, seconds or a (connect, read) tuple.
+    """
+    values = timeout if isinstance(timeout, tuple) else (timeout,)
+    if isinstance(timeout, tuple) and len(timeout) != 2:
+        raise TypeError('timeout tuple must be (connect, read)')
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise TypeError('timeout must be a number, a (connect, read) '
+                            'tuple or None')
+        if value <= 0:
+            raise ValueError('timeout must be positive')
+    return timeout
+
+
+def _sleep(delay, deadline):
+    """
+    Waits 'delay' seconds before a retry, raising DeadlineExceeded instead
+    if the deadline would be spent by then.
+    """
+    if deadline is not None and delay >= deadline.remaining():
+        raise DeadlineExceeded(
+            'Deadline of %s seconds exceeded' % deadline.seconds)
+    time.sleep(delay)
+
+
+def _checked(chunks, deadline):
+    """
+    Generates 'chunks' until the deadline is spent.
+    """
+    for chunk in chunks:
+        deadline.check()
+        yield chunk
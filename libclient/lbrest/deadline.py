@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import time
+import threading
+
+from requests.exceptions import Timeout
+
+_local = threading.local()
+
+
+class DeadlineExceeded(Timeout):
+    """
+    Raised when the time budget of a Deadline is spent.
+    """
+
+
+class Deadline(object):
+    """
+    Time budget shared by every request sent while it is active.
+
+    Used as a context manager, it bounds the timeout of each request sent
+    by the current thread and by the worker threads of multi-request
+    operations (iter_search, scan, create_many, get_many, upload_many).
+    Requests not yet sent when the budget is spent raise DeadlineExceeded.
+    Nested deadlines never extend an outer one.
+
+        with Deadline(5):
+            docs = list(rest.iter_search(search))
+    """
+
+    def __init__(self, seconds):
+        """
+        @param seconds (int or float): time budget, counted from creation.
+        """
+        if isinstance(seconds, bool) or not isinstance(seconds, (int, float)):
+            raise TypeError('Wrong parameter: seconds must be a number')
+        if seconds < 0:
+            raise ValueError('seconds must not be negative')
+
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self):
+        """ Returns the seconds left, 0 once expired.
+        """
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self):
+        """ @property expired: True once the budget is spent
+        """
+        return time.monotonic() >= self.expires
+
+    def check(self):
+        """ Raises DeadlineExceeded if the budget is spent.
+        """
+        if self.expired:
+            raise DeadlineExceeded(
+                'Deadline of %s seconds exceeded' % self.seconds)
+
+    def limit(self, timeout):
+        """
+        Returns 'timeout' (None, seconds or a (connect, read) tuple) capped
+        by the remaining budget; raises DeadlineExceeded if it is spent.
+        """
+        self.check()
+        remaining = self.remaining()
+        if isinstance(timeout, tuple):
+            return tuple(remaining if t is None else min(t, remaining)
+                         for t in timeout)
+        if timeout is None:
+            return remaining
+        return min(timeout, remaining)
+
+    def __enter__(self):
+        _stack().append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _stack().remove(self)
+
+
+def _stack():
+    """ Returns the deadlines active in the current thread.
+    """
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def current_deadline():
+    """
+    Returns the earliest Deadline active in the current thread, None if
+    there is none.
+    """
+    stack = _stack()
+    if not stack:
+        return None
+    return min(stack, key=lambda deadline: deadline.expires)
+
+
+def propagate(func, deadline=None):
+    """
+    Returns 'func' wrapped to run under 'deadline', by default the current
+    thread's deadline, for calls made from worker threads.
+    """
+    if deadline is None:
+        deadline = current_deadline()
+    if deadline is None:
+        return func
+
+    def wrapper(*args, **kwargs):
+        with deadline:
+            return func(*args, **kwargs)
+    return wrapper
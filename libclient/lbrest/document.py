@@ -1,14 +1,25 @@
 # -*- coding: utf-8 -*-
+import copy
+
 from six import string_types as PYSTR
 
 from .core import LBRest
+from .paging import prefetch
+from .bulk import run_bulk
+from .bulk import chunks
+from .cache import DocumentCache
+from .deadline import current_deadline
+from .deadline import DeadlineExceeded
 from ..lbtypes.base import Base
+from ..lbtypes.validator import DocumentValidator
 
 from ..utils import json2object
 from ..utils import object2json
 
 from ..lbsearch.search import Search
+from ..lbsearch.search import OrderBy
 from ..lbsearch.search import Collection
+from ..lbsearch.search import ResultStream
 
 
 class DocumentREST(LBRest):
@@ -16,7 +27,8 @@ class DocumentREST(LBRest):
     Contains methods for handling Lightbase Documents via Lightbase's REST API.
     """
 
-    def __init__(self, rest_url, base, response_object=False):
+    def __init__(self, rest_url, base, response_object=False, cache=None,
+                 validate=False, **kwargs):
         """
         Class constructor.
 
@@ -24,13 +36,70 @@ class DocumentREST(LBRest):
         @param base (string or Base): the base's name or a Base object (libclient.lbtypes.base.Base)
         @param response_object (boolean, optional, default=False: if true, 
             calls to methods will return python's response objects (for debugging).
+        @param cache (DocumentCache, optional, default=None): cache for get
+            and get_path responses (libclient.lbrest.cache.DocumentCache),
+            may be shared between clients: entries are kept per identity
+            (see libclient.lbrest.schema.client_identity), so clients with
+            different credentials never see each other's documents. Writes
+            through this client invalidate the affected entries, for every
+            identity, even if the request fails.
+        @param validate (boolean, optional, default=False): if true, create
+            and update check documents against the base's schema (see
+            get_base) and raise ValidationError
+            (libclient.lbtypes.validator.ValidationError) with every problem
+            found instead of sending invalid documents.
+        @param kwargs: connection pool options (see LBRest)
         """
-        super(DocumentREST, self).__init__(rest_url, response_object)
+        super(DocumentREST, self).__init__(rest_url, response_object, **kwargs)
         if isinstance(base, Base) or isinstance(base, PYSTR):
             self.base = base
         else:
             raise TypeError("Wrong parameter: not a base or string, but {}".format(type(base)))
 
+        if cache is not None and not isinstance(cache, DocumentCache):
+            raise TypeError('Wrong parameter: cache must be a DocumentCache')
+
+        # @property cache: document cache, None if disabled
+        self.cache = cache
+
+        # @property validate: whether documents are validated before writes
+        self.validate = validate
+        self._schema = None
+
+    def stats(self):
+        """
+        Returns retry, circuit breaker and cache counters as a dict.
+        """
+        stats = super(DocumentREST, self).stats()
+        if self.cache is not None:
+            stats['cache'] = self.cache.stats()
+        return stats
+
+    def get_base(self):
+        """
+        Returns the Base (libclient.lbtypes.base.Base) of this client: the
+        one given to the constructor, else the base named by it, resolved
+        through the client's schema cache (without a request while the
+        entry is fresh) or fetched when there is no cache.
+        """
+        if isinstance(self.base, Base):
+            return self.base
+        from .schema import fetch_base
+        return fetch_base(self, self.basename, self._op('get_base'))
+
+    def _validate(self, document):
+        """
+        Raises ValidationError if validation is enabled and 'document' does
+        not match the schema. Without a schema cache the base named by the
+        client is fetched once.
+        """
+        if not self.validate:
+            return
+        base = self._schema
+        if base is None or self.schema_cache is not None:
+            base = self._schema = self.get_base()
+        DocumentValidator.for_base(base).validate(document)
+
     def create(self, document):
         """
         Creates new document.
@@ -39,26 +108,103 @@ class DocumentREST(LBRest):
         """
         if not isinstance(document, dict):
             raise TypeError('Wrong parameter: document must be a dictionary')
+        self._validate(document)
 
         response = self.send_request(self.httppost,
                                      url_path=[self.basename,
                                                self.doc_prefix],
-                                     data={self.doc_param: object2json(document)})
+                                     data={self.doc_param: object2json(document)},
+                                     operation=self._op('create'))
         return int(response)
 
+    def create_many(self, documents, concurrency=4, chunk_size=100):
+        """
+        Creates many documents concurrently.
+
+        @param documents (iterable): dicts to create; any iterable or
+            generator, read as workers free up.
+        @param concurrency (int, optional, default=4): max number of
+            concurrent requests; keep it within the client's pool_maxsize
+            so every worker reuses a pooled connection.
+        @param chunk_size (int, optional, default=100): documents held in
+            memory at a time.
+
+        Returns a BulkResult (libclient.lbrest.bulk.BulkResult) whose
+        results are the new ids in input order (None where creation failed,
+        with the exception in BulkResult.errors) and whose stats() give the
+        throughput. With validate=True, invalid documents fail with their
+        ValidationError without being sent.
+        """
+        return run_bulk(self.create, documents, concurrency, chunk_size)
+
     def get(self, id):
         """
         Retrieves document by id.
 
         @param id (int): the document's id.
         """
-        if not isinstance(id, int):
-            raise TypeError('Wrong parameter: id must be an int')
-        
-        response = self.send_request(self.httpget,
-                                     url_path=[self.basename, self.doc_prefix, str(id)])
+        path_list = self.resource_path(self.doc_prefix, id)
+
+        return self._cached_get(id, path_list, self._op('get'))
 
-        return json2object(response)
+    def get_many(self, ids, batch_size=100, concurrency=4):
+        """
+        Retrieves many documents by id with one search per batch of ids.
+
+        @param ids (list of int): the documents' ids.
+        @param batch_size (int, optional, default=100): ids per request.
+        @param concurrency (int, optional, default=4): max number of
+            concurrent requests.
+
+        Returns a list with the documents in the order of 'ids', with None
+        where no document has the requested id. Ids repeated in 'ids' are
+        fetched once, and every repetition gets its own copy. Raises
+        DeadlineExceeded if a deadline (see deadline.Deadline) is spent
+        before every id was fetched.
+        """
+        ids = list(ids)
+        for id in ids:
+            if not isinstance(id, int):
+                raise TypeError('Wrong parameter: ids must be ints')
+
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError('batch_size must be a positive int')
+
+        unique_ids = list(dict.fromkeys(ids))
+        result = run_bulk(self._get_batch, chunks(unique_ids, batch_size),
+                          concurrency)
+        if result.errors:
+            raise result.errors[min(result.errors)]
+        if result.expired:
+            # batches never sent must not read as missing documents
+            raise DeadlineExceeded('Deadline exceeded before every id was '
+                                   'fetched')
+
+        documents = {}
+        for batch in result.results:
+            documents.update(batch)
+
+        returned = set()
+        result = []
+        for id in ids:
+            document = documents.get(id)
+            if document is not None:
+                if id in returned:
+                    document = copy.deepcopy(document)
+                returned.add(id)
+            result.append(document)
+        return result
+
+    def _get_batch(self, ids):
+        """
+        Retrieves the documents with the given ids as a dict by id.
+        """
+        literal = '%s in (%s)' % (self.id_field,
+                                  ', '.join(str(id) for id in ids))
+        search_obj = Search(literal=literal, limit=len(ids))
+        results = self.search(search_obj)['results']
+        return dict((self._document_id(document), document)
+                    for document in results)
 
     def get_path(self, id, path):
         """
@@ -69,39 +215,199 @@ class DocumentREST(LBRest):
             if string segments must be separated by '/',
             if list each element is a string containing a segment of the path.
         """
-        if not isinstance(id, int):
-            raise TypeError('Wrong parameter: id must be an int')
+        path_list = self.resource_path(self.doc_prefix, id, path)
 
-        path_list = [self.basename, self.doc_prefix, str(id)]
-        if isinstance(path, PYSTR):
-            for p in path.split('/'):
-                path_list.append(p)
-        elif isinstance(path, list):
-            path_list += path
-        else:
-            raise TypeError('Wrong parameter: path must be a list or string')
+        return self._cached_get(id, path_list, self._op('get_path'))
+
+    def _cached_get(self, id, path_list, operation):
+        """
+        GETs path_list of document 'id', through the cache if enabled,
+        reporting 'operation' to hooks.
+        """
+        if self.cache is None or self.response_object:
+            return self.send_request(self.httpget, url_path=path_list,
+                                     decode=True, operation=operation)
+
+        from .schema import client_identity
+        key = (self.rest_url, self.basename, id, tuple(path_list[3:]) or None,
+               client_identity(self))
+        response = self.cache.get(key)
+        if response is not None:
+            return json2object(response)
+
+        version = self.cache.version
+
+        def store(body):
+            self.cache.set(key, body, version)
+            return json2object(body)
 
-        response = self.send_request(self.httpget, url_path=path_list)
-        return json2object(response)
+        return self.send_request(self.httpget, url_path=path_list,
+                                 decode=store, operation=operation)
 
-    def search(self, search_obj=None):
+    def _invalidate(self, id=None):
+        """
+        Drops cached entries of document 'id', or of the whole base.
+        """
+        if self.cache is not None:
+            self.cache.invalidate(self.rest_url, self.basename, id)
+
+    def search(self, search_obj=None, stream=False):
         """
         Retrieves collection of documents according to search object or
             all documents if search_obj=None.
 
         @param search_obj (Search): a Search object (libclient.lbsearch.search.Search) 
             with the search attributes.
+        @param stream (boolean, optional, default=False): if true, returns a
+            ResultStream (libclient.lbsearch.search.ResultStream) that parses
+            the response incrementally and yields each document as soon as
+            it is complete, instead of the decoded dict.
         """
         search_obj = search_obj or Search()
         
         if not isinstance(search_obj, Search):
             raise TypeError('search_obj must be a Search object.')
 
+        if stream:
+            return ResultStream(self.send_stream(self.httpget,
+                url_path=[self.basename, self.doc_prefix],
+                array_keys=('results',),
+                params={self.search_param: search_obj.as_json()},
+                operation=self._op('search')))
+
         response = self.send_request(self.httpget,
                                      url_path=[self.basename, self.doc_prefix],
-                                     params={self.search_param: search_obj.as_json()})
+                                     params={self.search_param: search_obj.as_json()},
+                                     decode=True, operation=self._op('search'))
+
+        return response
 
-        return json2object(response)
+    def iter_search(self, search_obj=None, page_size=100, max_pages=2):
+        """
+        Iterates over every document matching search object, fetching pages
+            of 'page_size' documents in the background while the current
+            one is consumed.
+
+        @param search_obj (Search, optional, default=None): a Search object
+            (libclient.lbsearch.search.Search) with the search attributes;
+            its offset is where the iteration starts, its limit is ignored.
+        @param page_size (int, optional, default=100): documents per request.
+        @param max_pages (int, optional, default=2): max number of fetched
+            pages held in memory ahead of the consumer.
+        """
+        search_obj = search_obj or Search()
+
+        if not isinstance(search_obj, Search):
+            raise TypeError('search_obj must be a Search object.')
+
+        if not isinstance(page_size, int) or page_size < 1:
+            raise ValueError('page_size must be a positive int')
+
+        # Not a generator itself, so the pages are fetched under the
+        # caller's deadline even if the iteration starts later
+        pages = self._search_pages(search_obj, page_size)
+        return self._iter_documents(
+            prefetch(pages, max_pages, current_deadline()))
+
+    def _iter_documents(self, pages):
+        """
+        Generates the documents of each page of 'pages'.
+        """
+        for page in pages:
+            for document in page:
+                yield document
+
+    def _search_pages(self, search_obj, page_size):
+        """
+        Generates the 'results' list of each page of search_obj.
+        """
+        page_search = copy.copy(search_obj)
+        page_search.limit = page_size
+        offset = search_obj.offset
+
+        while True:
+            page_search.offset = offset
+            response = self.search(page_search)
+            results = response['results']
+            if results:
+                yield results
+
+            offset += len(results)
+            if len(results) < page_size or offset >= response['result_count']:
+                return
+
+    def scan(self, search_obj=None, page_size=100, max_pages=2):
+        """
+        Iterates over every document matching search object using keyset
+            pagination: each page asks for 'id_doc > last seen id' ordered by
+            id_doc instead of skipping rows with an offset, so every page
+            costs the same however deep the scan is.
+
+        @param search_obj (Search, optional, default=None): a Search object
+            (libclient.lbsearch.search.Search); its literal and select are
+            kept, its order_by, limit and offset are ignored.
+        @param page_size (int, optional, default=100): documents per request.
+        @param max_pages (int, optional, default=2): max number of fetched
+            pages held in memory ahead of the consumer.
+        """
+        search_obj = search_obj or Search()
+
+        if not isinstance(search_obj, Search):
+            raise TypeError('search_obj must be a Search object.')
+
+        if not isinstance(page_size, int) or page_size < 1:
+            raise ValueError('page_size must be a positive int')
+
+        # Not a generator itself, see iter_search
+        pages = self._keyset_pages(search_obj, page_size)
+        return self._iter_documents(
+            prefetch(pages, max_pages, current_deadline()))
+
+    def _keyset_pages(self, search_obj, page_size):
+        """
+        Generates the 'results' list of each keyset page of search_obj.
+        """
+        select = list(search_obj.select)
+        strip_id = '*' not in select and self.id_field not in select
+        if strip_id:
+            select.append(self.id_field)
+
+        literal = search_obj.literal.strip()
+        page_search = Search(select=select,
+                             order_by=OrderBy(asc=[self.id_field]),
+                             limit=page_size)
+        last_id = None
+
+        while True:
+            conditions = []
+            if literal:
+                conditions.append('(%s)' % literal)
+            if last_id is not None:
+                conditions.append('%s > %d' % (self.id_field, last_id))
+            page_search.literal = ' and '.join(conditions)
+
+            results = self.search(page_search)['results']
+            if not results:
+                return
+
+            last_id = self._document_id(results[-1])
+            if strip_id:
+                for document in results:
+                    document.pop(self.id_field, None)
+            yield results
+
+            if len(results) < page_size:
+                return
+
+    def _document_id(self, document):
+        """
+        Returns id_doc of a document returned by search.
+        """
+        metadata = document.get('_metadata') or {}
+        id = metadata.get(self.id_field, document.get(self.id_field))
+        if id is None:
+            raise ValueError('search results must include %s' % self.id_field)
+        return int(id)
 
     def update(self, id, document):
         """
@@ -110,9 +416,14 @@ class DocumentREST(LBRest):
         @param id (int): the document identify.
         @param document (dict): updated Document.
         """
-        return self.send_request(self.httpput,
-                                 url_path=[self.basename, self.doc_prefix, str(id)],
-                                 data={self.doc_param: object2json(document)})
+        self._validate(document)
+        try:
+            return self.send_request(self.httpput,
+                                     url_path=[self.basename, self.doc_prefix, str(id)],
+                                     data={self.doc_param: object2json(document)},
+                                     operation=self._op('update'))
+        finally:
+            self._invalidate(id)
 
     def create_path(self, id, path, value):
         """
@@ -124,24 +435,18 @@ class DocumentREST(LBRest):
             if list each element is a string containing a segment
         @param value: the value to create on path.
         """
-        if not isinstance(id, int):
-            raise TypeError('Wrong parameter: id must be an int')
-
-        path_list = [self.basename, self.doc_prefix, str(id)]
-        if isinstance(path, PYSTR):
-            for p in path.split('/'):
-                path_list.append(p)
-        elif isinstance(path, list):
-            path_list += path
-        else:
-            raise TypeError('Wrong parameter: path must be a list or string')
+        path_list = self.resource_path(self.doc_prefix, id, path)
 
         if isinstance(value, list) or isinstance(value, dict):
             value = object2json(value)
 
-        return self.send_request(self.httppost,
-                                 url_path=path_list,
-                                 data={self.doc_param: value})
+        try:
+            return self.send_request(self.httppost,
+                                     url_path=path_list,
+                                     data={self.doc_param: value},
+                                     operation=self._op('create_path'))
+        finally:
+            self._invalidate(id)
 
     def update_path(self, id, path, value):
         """
@@ -152,21 +457,15 @@ class DocumentREST(LBRest):
             if list each element is a string containing a segment
         @param value (any): the value to update on path.
         """
-        if not isinstance(id, int):
-            raise TypeError('Wrong parameter: id must be an int')
+        path_list = self.resource_path(self.doc_prefix, id, path)
 
-        path_list = [self.basename, self.doc_prefix, str(id)]
-        if isinstance(path, PYSTR):
-            for p in path.split('/'):
-                path_list.append(p)
-        elif isinstance(path, list):
-            path_list += path
-        else:
-            raise TypeError('Wrong parameter: path must be a list or string')
-
-        return self.send_request(self.httpput,
-                                 url_path=path_list,
-                                 data={self.doc_param: object2json(value)})
+        try:
+            return self.send_request(self.httpput,
+                                     url_path=path_list,
+                                     data={self.doc_param: object2json(value)},
+                                     operation=self._op('update_path'))
+        finally:
+            self._invalidate(id)
 
     def update_collection(self, path, value=None, search_obj=None):
         """
@@ -185,10 +484,10 @@ class DocumentREST(LBRest):
             (libclient.lbsearch.search.Search) that will determine which documents
             will be updated
         """
-        if search_obj is not None and not isinstance(search_obj, Search):
+        search_obj = search_obj or Search()
+
+        if not isinstance(search_obj, Search):
             raise TypeError('search_obj must be a Search object.')
-        else:
-            search_obj = Search()
 
         path_param = []
         if isinstance(path, PYSTR):
@@ -199,19 +498,22 @@ class DocumentREST(LBRest):
             }
             path_param.append(path_dict)
         elif isinstance(path, list):
-            if len(path) > 0 and not isinstace(path[0], dict):
+            if len(path) > 0 and not isinstance(path[0], dict):
                 raise TypeError('Wrong parameter: path list must contain dictionaries')
 
             path_param = path
         else:
             raise TypeError('Wrong parameter: path must be a list or string')
 
-        response = self.send_request(self.httpput,
+        try:
+            return self.send_request(self.httpput,
                                      url_path=(self.basename, self.doc_prefix),
                                      params={self.search_param: search_obj.as_json(),
-                                             self.path_param: object2json(path_param)})
-
-        return json2object(response)
+                                             self.path_param: object2json(path_param)},
+                                     decode=True,
+                                     operation=self._op('update_collection'))
+        finally:
+            self._invalidate()
 
     def delete(self, id):
         """
@@ -219,10 +521,14 @@ class DocumentREST(LBRest):
 
         @param id (int): the document identify.
         """
-        return self.send_request(self.httpdelete,
-                                 url_path=[self.basename,
-                                           self.doc_prefix,
-                                           str(id)])
+        try:
+            return self.send_request(self.httpdelete,
+                                     url_path=[self.basename,
+                                               self.doc_prefix,
+                                               str(id)],
+                                     operation=self._op('delete'))
+        finally:
+            self._invalidate(id)
 
     def delete_path(self, id, path):
         """
@@ -234,19 +540,13 @@ class DocumentREST(LBRest):
             if list each element is a string containing a segment
         """
 
-        if not isinstance(id, int):
-            raise TypeError('Wrong parameter: id must be an int')
-
-        path_list = [self.basename, self.doc_prefix, str(id)]
-        if isinstance(path, PYSTR):
-            for p in path.split('/'):
-                path_list.append(p)
-        elif isinstance(path, list):
-            path_list += path
-        else:
-            raise TypeError('Wrong parameter: path must be a list or string')
+        path_list = self.resource_path(self.doc_prefix, id, path)
 
-        return self.send_request(self.httpdelete, url_path=path_list)
+        try:
+            return self.send_request(self.httpdelete, url_path=path_list,
+                                     operation=self._op('delete_path'))
+        finally:
+            self._invalidate(id)
 
     def delete_collection(self, path=None, search_obj=None):
         if path is not None and not isinstance(path, (PYSTR, list)):
@@ -263,9 +563,12 @@ class DocumentREST(LBRest):
             if path is None or isinstance(path, PYSTR) \
             else self.httpput
 
-        response = self.send_request(method,
+        try:
+            return self.send_request(method,
                                      url_path=(self.basename, self.doc_prefix),
                                      params={self.search_param: search_obj.as_json(),
-                                             self.path_param: path_param})
-
-        return json2object(response)
+                                             self.path_param: path_param},
+                                     decode=True,
+                                     operation=self._op('delete_collection'))
+        finally:
+            self._invalidate()
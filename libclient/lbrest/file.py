@@ -2,14 +2,19 @@
 import os
 import uuid
 
+from six import string_types as PYSTR
+from requests.exceptions import HTTPError
+
 from .core import LBRest
+from .multipart import MultipartStream
+from .bulk import run_bulk
+from .bulk import UploadResult
 from ..lbtypes.base import Base
 from ..lbtypes.file import File
 
 from ..lbsearch.search import Search
 from ..lbsearch.search import FileCollection
 
-from ..utils import json2object
 
 class FileREST(LBRest):
 
@@ -17,14 +22,15 @@ class FileREST(LBRest):
     Contains methods for handling LightBase files via via Lightbase's REST API.
     """
 
-    def __init__(self, rest_url, base, response_object=False):
+    def __init__(self, rest_url, base, response_object=False, **kwargs):
         """
         Class constructor.
 
         @param rest_url: the REST URL.
         @param base (string or Base): the base's name or a Base object (libclient.lbtypes.base.Base)
+        @param kwargs: connection pool options (see LBRest)
         """
-        super(FileREST, self).__init__(rest_url, response_object)
+        super(FileREST, self).__init__(rest_url, response_object, **kwargs)
         if isinstance(base, Base) or isinstance(base, PYSTR):
             self.base = base
         else:
@@ -35,20 +41,45 @@ class FileREST(LBRest):
         """
         Creates file.
 
-        @param file (tuple): containg filename (string) and file contents (bytes).
+        @param file (File or tuple): File object (libclient.lbtypes.file.File)
+            or tuple containg filename (string) and file contents (bytes or
+            binary file object).
             Ex: ('name.txt', b'\123\334_file_contents_\334\123')
+            Files opened with File.open and tuples holding a file object are
+            streamed from disk in chunks instead of being loaded in memory.
         """
         if isinstance(file, File):
+            if not file.in_memory and file.source is not None:
+                return self._create_stream(file)
             file_param = (file.filename, file.content)
         elif isinstance(file, tuple):
+            if len(file) == 2 and hasattr(file[1], 'read'):
+                stream_file = File.open(file[1])
+                stream_file.filename = file[0]
+                return self._create_stream(stream_file)
             file_param = file
         else:
             raise TypeError('Wrong parameter: files must be a 2-valued tuple containg: file name and file content')
 
         response = self.send_request(self.httppost,
             url_path=[self.basename, self.file_prefix],
-            files={self.file_param : file_param})
-        return json2object(response)
+            files={self.file_param : file_param}, decode=True,
+            operation=self._op('create'))
+        return response
+
+    def _create_stream(self, file):
+        """
+        Creates file sending a multipart body read from file's source in
+        chunks.
+        """
+        with file.open_source() as fileobj:
+            body = MultipartStream(self.file_param, file.filename, fileobj,
+                                   size=file.filesize, mimetype=file.mimetype)
+            response = self.send_request(self.httppost,
+                url_path=[self.basename, self.file_prefix],
+                data=body, headers={'Content-Type': body.content_type},
+                decode=True, operation=self._op('create'))
+        return response
 
 
     def get(self, id):
@@ -57,9 +88,9 @@ class FileREST(LBRest):
 
         @param id (int): the file identify.
         """
-        response = self.send_request(self.httpget,
-            url_path=[self.basename, self.file_prefix, str(id)])
-        response_dict = json2object(response)
+        response_dict = self.send_request(self.httpget,
+            url_path=[self.basename, self.file_prefix, str(id)], decode=True,
+            operation=self._op('get'))
         file = File.from_dict(response_dict)
         return file
 
@@ -71,9 +102,76 @@ class FileREST(LBRest):
         """
         response = self.send_request(self.httpget,
             url_path=[self.basename, self.file_prefix, str(id), 'download'],
-            stream=True, response_object=True)
+            stream=True, response_object=True,
+            operation=self._op('get_content'))
         return response.content
 
+    def iter_content(self, id, chunk_size=65536, progress=None):
+        """
+        Retrieves file's binary by id as an iterator of chunks, so memory
+            use stays constant whatever the file size.
+
+        @param id (int): the file identify.
+        @param chunk_size (int, optional, default=65536): max bytes per chunk.
+        @param progress (callable, optional, default=None): called after each
+            chunk as progress(bytes_done, bytes_total); bytes_total is None
+            if the server does not send Content-Length.
+        """
+        response = self.send_request(self.httpget,
+            url_path=[self.basename, self.file_prefix, str(id), 'download'],
+            stream=True, response_object=True,
+            operation=self._op('iter_content'))
+
+        try:
+            if not response.ok:
+                raise HTTPError(response.text)
+
+            total = response.headers.get('Content-Length')
+            total = int(total) if total is not None else None
+            done = 0
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                done += len(chunk)
+                if progress is not None:
+                    progress(done, total)
+                yield chunk
+        finally:
+            response.close()
+
+    def download_to(self, id, dest, chunk_size=65536, progress=None):
+        """
+        Writes file's binary to 'dest' chunk by chunk, so memory use stays
+            constant whatever the file size. Returns the number of bytes
+            written.
+
+        @param id (int): the file identify.
+        @param dest (string or file object): path of the file to write or a
+            binary file object opened for writing. A path is only replaced
+            once the whole file was downloaded: on error it is left as it was.
+        @param chunk_size (int, optional, default=65536): max bytes per chunk.
+        @param progress (callable, optional, default=None): see iter_content.
+        """
+        if isinstance(dest, PYSTR):
+            # Download next to 'dest', so the rename stays on its filesystem
+            part = '%s.%s.part' % (dest, uuid.uuid4().hex)
+            try:
+                with open(part, 'wb') as f:
+                    written = self.download_to(id, f, chunk_size, progress)
+                os.replace(part, dest)
+            except BaseException:
+                if os.path.exists(part):
+                    os.remove(part)
+                raise
+            return written
+
+        if getattr(dest, 'write', None) is None:
+            raise TypeError('Wrong parameter: dest must be a path or a file object')
+
+        written = 0
+        for chunk in self.iter_content(id, chunk_size, progress):
+            dest.write(chunk)
+            written += len(chunk)
+        return written
+
     def get_collection(self, search_obj=None):
         """
         Retrieves collection of "file text" according to search object.
@@ -88,8 +186,9 @@ class FileREST(LBRest):
             search_obj = Search()
         response = self.send_request(self.httpget,
             url_path=[self.basename, self.file_prefix],
-            params={self.search_param: search_obj.as_json()})
-        return FileCollection(**json2object(response))
+            params={self.search_param: search_obj.as_json()}, decode=True,
+            operation=self._op('get_collection'))
+        return FileCollection(**response)
 
     def get_path(self, id, path):
         """
@@ -106,7 +205,8 @@ class FileREST(LBRest):
             -dt_ext_text
         """
         return self.send_request(self.httpget,
-            url_path=[self.basename, self.file_prefix, str(id), path])
+            url_path=[self.basename, self.file_prefix, str(id), path],
+            operation=self._op('get_path'))
 
     def _get_file_headers(self, response):
         cd = response.headers['Content-Disposition']
@@ -127,6 +227,36 @@ class FileREST(LBRest):
         """
         return self.create(files)
 
+    def upload_many(self, files, concurrency=4, chunk_size=100):
+        """
+        Uploads many files concurrently, streaming each one from disk.
+
+        @param files (iterable): file paths (string), File objects or tuples
+            accepted by @method create.
+        @param concurrency (int, optional, default=4): max number of
+            concurrent uploads; keep it within the client's pool_maxsize.
+        @param chunk_size (int, optional, default=100): max number of files
+            read from 'files' and not yet collected at a time.
+
+        Returns an UploadResult (libclient.lbrest.bulk.UploadResult) whose
+        results are the created files' ids in input order (None where the
+        upload failed, with the exception in UploadResult.errors) and whose
+        stats() include the aggregate bytes per second.
+        """
+        result = UploadResult()
+
+        def upload_one(file):
+            if isinstance(file, PYSTR):
+                file = File.open(file)
+
+            response = self.create(file)
+
+            size = file.filesize if isinstance(file, File) else None
+            result.add_bytes(size or response.get('filesize') or 0)
+            return response['id_file']
+
+        return run_bulk(upload_one, files, concurrency, chunk_size, result)
+
     # TODO
     def update(self):
         """
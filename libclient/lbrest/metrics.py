@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+import threading
+from collections import deque
+
+from .session import register_after_fork
+
+# @property TIMINGS: request phases timed by LBRest.send_request
+TIMINGS = ('connect', 'wait', 'download', 'decode', 'total')
+
+
+class RequestInfo(object):
+    """
+    Describes one LBRest.send_request call; passed to request hooks.
+
+    Pre-request hooks see the request attributes only; post-request hooks
+    also get the outcome. Sizes and timings are None when unknown (e.g.
+    the body of a streamed response is read after the call returns).
+    """
+
+    def __init__(self, method, operation, basename, url):
+        # @property method: HTTP verb
+        self.method = method
+
+        # @property operation: logical operation, e.g. 'DocumentREST.get'
+        self.operation = operation
+
+        # @property basename: name of the base, None for base listing calls
+        self.basename = basename
+
+        # @property url: requested url, without query parameters
+        self.url = url
+
+        # @property request_bytes: size of the request body
+        self.request_bytes = None
+
+        # @property response_bytes: size of the response body
+        self.response_bytes = None
+
+        # @property status: HTTP status, None if no response was received
+        self.status = None
+
+        # @property attempts: number of requests sent, retries included
+        self.attempts = 0
+
+        # @property coalesced: True if the response was shared from an
+        # identical request in flight (see LBRest 'coalesce')
+        self.coalesced = False
+
+        # @property error: exception raised by the call, if any
+        self.error = None
+
+        # @property timings: seconds spent per phase (see TIMINGS): opening
+        # connections, waiting for the response headers, downloading the
+        # body, decoding the JSON and the whole call
+        self.timings = dict.fromkeys(TIMINGS)
+
+    def as_dict(self):
+        """ Returns the request description as a dict.
+        """
+        return {
+            'method': self.method,
+            'operation': self.operation,
+            'basename': self.basename,
+            'url': self.url,
+            'request_bytes': self.request_bytes,
+            'response_bytes': self.response_bytes,
+            'status': self.status,
+            'attempts': self.attempts,
+            'coalesced': self.coalesced,
+            'error': repr(self.error) if self.error is not None else None,
+            'timings': dict(self.timings)
+        }
+
+
+class Histogram(object):
+    """
+    Distribution of the last 'maxlen' samples, with totals over all of them.
+    """
+
+    def __init__(self, maxlen=2048):
+        self._samples = deque(maxlen=maxlen)
+        self.count = 0
+        self.total = 0.0
+        self.max = None
+
+    def add(self, value):
+        """ Records one sample.
+        """
+        self._samples.append(value)
+        self.count += 1
+        self.total += value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, percent):
+        """
+        Returns the 'percent' percentile (0-100) of the kept samples, None
+        if there are none.
+        """
+        return _rank(sorted(self._samples), percent)
+
+    def dump(self):
+        """ Returns count, mean, max, p50, p95 and p99 as a dict.
+        """
+        samples = sorted(self._samples)
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'max': self.max,
+            'p50': _rank(samples, 50),
+            'p95': _rank(samples, 95),
+            'p99': _rank(samples, 99)
+        }
+
+
+def _rank(samples, percent):
+    """ Returns the 'percent' percentile of sorted 'samples'.
+    """
+    if not samples:
+        return None
+    return samples[int(round(percent / 100.0 * (len(samples) - 1)))]
+
+
+class MetricsCollector(object):
+    """
+    In-memory request metrics grouped by operation.
+
+    Register it as a post-request hook of one or more clients:
+
+        metrics = MetricsCollector()
+        rest.register_hook('post_request', metrics)
+        ...
+        metrics.dump()['DocumentREST.get']['timings']['total']['p99']
+    """
+
+    def __init__(self, maxlen=2048):
+        """
+        @param maxlen (int, optional, default=2048): samples kept per
+            histogram to compute percentiles.
+        """
+        self.maxlen = maxlen
+        self._operations = {}
+        self._lock = threading.Lock()
+        register_after_fork(self)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    def __call__(self, info):
+        """ Records a finished request (RequestInfo).
+        """
+        with self._lock:
+            stats = self._operations.get(info.operation)
+            if stats is None:
+                stats = self._operations[info.operation] = {
+                    'count': 0,
+                    'errors': 0,
+                    'coalesced': 0,
+                    'status': {},
+                    'timings': dict((name, Histogram(self.maxlen))
+                                    for name in TIMINGS),
+                    'request_bytes': Histogram(self.maxlen),
+                    'response_bytes': Histogram(self.maxlen)
+                }
+
+            stats['count'] += 1
+            if info.error is not None:
+                stats['errors'] += 1
+            if info.coalesced:
+                stats['coalesced'] += 1
+            if info.status is not None:
+                stats['status'][info.status] = \
+                    stats['status'].get(info.status, 0) + 1
+            for name, value in info.timings.items():
+                if value is not None:
+                    stats['timings'][name].add(value)
+            if info.request_bytes is not None:
+                stats['request_bytes'].add(info.request_bytes)
+            if info.response_bytes is not None:
+                stats['response_bytes'].add(info.response_bytes)
+
+    def dump(self):
+        """
+        Returns the metrics as a dict keyed by operation; each histogram is
+        dumped as count, mean, max, p50, p95 and p99 (timings in seconds).
+        """
+        with self._lock:
+            return dict((operation, {
+                'count': stats['count'],
+                'errors': stats['errors'],
+                'coalesced': stats['coalesced'],
+                'status': dict(stats['status']),
+                'timings': dict((name, histogram.dump())
+                                for name, histogram
+                                in stats['timings'].items()),
+                'request_bytes': stats['request_bytes'].dump(),
+                'response_bytes': stats['response_bytes'].dump()
+            }) for operation, stats in self._operations.items())
+
+    def reset(self):
+        """ Drops every recorded metric.
+        """
+        with self._lock:
+            self._operations.clear()
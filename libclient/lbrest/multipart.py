@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+from urllib3.fields import RequestField
+from urllib3.filepost import choose_boundary
+
+
+class MultipartStream(object):
+    """
+    File-like multipart/form-data body with a single file field, read from
+    its source in chunks instead of being built in memory.
+
+    Pass it as 'data' with its content_type header; requests then sends it
+    with a Content-Length (or chunked if the file size is unknown) reading
+    one block at a time.
+    """
+
+    def __init__(self, name, filename, fileobj, size=None, mimetype=None):
+        """
+        @param name (string): form field name.
+        @param filename (string): file name sent to the server.
+        @param fileobj (file object): binary file object positioned at the
+            start of the data.
+        @param size (int, optional, default=None): number of bytes that will
+            be read from fileobj; None if unknown.
+        @param mimetype (string, optional, default=None): file's content type.
+        """
+        self.boundary = choose_boundary()
+        self.content_type = 'multipart/form-data; boundary=%s' % self.boundary
+
+        field = RequestField(name, None, filename=filename)
+        field.make_multipart(content_type=mimetype)
+        self._head = ('--%s\r\n' % self.boundary).encode('latin-1') + \
+            field.render_headers().encode('utf-8')
+        self._tail = ('\r\n--%s--\r\n' % self.boundary).encode('latin-1')
+        self._fileobj = fileobj
+        self._size = size
+        self._parts = [self._head, None, self._tail]
+        self._bytes_read = 0
+
+    @property
+    def len(self):
+        """ @property len: total body size, None if unknown
+        """
+        if self._size is None:
+            return None
+        return len(self._head) + self._size + len(self._tail)
+
+    @property
+    def bytes_read(self):
+        """ @property bytes_read: bytes of the body read so far
+        """
+        return self._bytes_read
+
+    def read(self, size=-1):
+        """
+        Reads up to 'size' bytes of the body (all of it if size < 0).
+        """
+        if size is None or size < 0:
+            return b''.join(iter(lambda: self.read(65536), b''))
+
+        while self._parts:
+            part = self._parts[0]
+            if part is None:
+                data = self._fileobj.read(size)
+                if data:
+                    break
+                self._parts.pop(0)
+                continue
+
+            data = part[:size]
+            if len(part) > size:
+                self._parts[0] = part[size:]
+            else:
+                self._parts.pop(0)
+            break
+        else:
+            data = b''
+
+        self._bytes_read += len(data)
+        return data
+
+    def __iter__(self):
+        return iter(lambda: self.read(65536), b'')
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import threading
+
+from six.moves import queue
+
+from .deadline import propagate
+
+# @property _DONE: marks the end of the page stream
+_DONE = object()
+
+
+def prefetch(pages, max_pages=2, deadline=None):
+    """
+    Iterates over 'pages' while a background thread fetches the next ones.
+
+    @param pages (iterable): page iterator, usually a generator sending one
+        request per page. It is consumed by the background thread.
+    @param max_pages (int, optional, default=2): max number of fetched pages
+        waiting to be consumed; bounds memory use.
+    @param deadline (Deadline, optional, default=None): deadline the pages
+        are fetched under; by default the consumer's deadline (see
+        deadline.Deadline) when the iteration starts.
+
+    Exceptions raised while fetching are re-raised to the consumer. Closing
+    the returned generator stops the background thread.
+    """
+    # Not a generator itself, so bad arguments fail at call time
+    if not isinstance(max_pages, int) or max_pages < 1:
+        raise ValueError('max_pages must be greater than 0')
+
+    return _prefetch(pages, max_pages, deadline)
+
+
+def _prefetch(pages, max_pages, deadline):
+    """
+    The generator returned by prefetch.
+    """
+    page_queue = queue.Queue(maxsize=max_pages)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                page_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def producer():
+        try:
+            for page in pages:
+                if not put((page, None)):
+                    return
+        except Exception as e:
+            put((_DONE, e))
+        else:
+            put((_DONE, None))
+
+    thread = threading.Thread(target=propagate(producer, deadline))
+    thread.daemon = True
+    thread.start()
+
+    try:
+        while True:
+            page, error = page_queue.get()
+            if page is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield page
+    finally:
+        stop.set()
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import random
+import threading
+
+from requests.exceptions import RequestException
+
+from .session import register_after_fork
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitOpenError(RequestException):
+    """
+    Raised instead of sending a request while the endpoint's circuit
+    breaker is open.
+    """
+
+
+class RetryPolicy(object):
+    """
+    Retries failed requests with exponential backoff and full jitter.
+    """
+
+    def __init__(self, max_retries=3, backoff_factor=0.1, max_backoff=10.0,
+                 jitter=True, methods=('GET', 'PUT', 'DELETE'),
+                 statuses=(502, 503, 504), connection_errors=True):
+        """
+        @param max_retries (int, optional, default=3): retries after the
+            first attempt.
+        @param backoff_factor (float, optional, default=0.1): wait before
+            retry n is up to backoff_factor * 2 ** n seconds.
+        @param max_backoff (float, optional, default=10.0): max wait between
+            attempts, in seconds.
+        @param jitter (boolean, optional, default=True): wait a random time
+            between 0 and the backoff so clients do not retry in lockstep.
+        @param methods (tuple, optional): HTTP verbs that are retried; by
+            default only the idempotent ones.
+        @param statuses (tuple, optional): response statuses that are retried.
+        @param connection_errors (boolean, optional, default=True): retry
+            connection errors and timeouts.
+        """
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.methods = tuple(m.upper() for m in methods)
+        self.statuses = tuple(statuses)
+        self.connection_errors = connection_errors
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.exhausted = 0
+        register_after_fork(self)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    def should_retry(self, method, attempt, status=None, error=None):
+        """
+        Tells whether attempt number 'attempt' (0 for the first one) of
+        'method', which failed with 'status' or 'error', may be retried.
+        """
+        if method.upper() not in self.methods:
+            return False
+
+        if error is not None:
+            retryable = self.connection_errors
+        else:
+            retryable = status in self.statuses
+
+        if not retryable:
+            return False
+
+        with self._lock:
+            if attempt >= self.max_retries:
+                self.exhausted += 1
+                return False
+            self.retries += 1
+        return True
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Returns seconds to wait before retrying after attempt 'attempt';
+        a server's Retry-After (seconds) is honored up to max_backoff.
+        """
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        if retry_after is not None:
+            delay = max(delay, min(self.max_backoff, retry_after))
+        return delay
+
+    def stats(self):
+        """ Returns retry counters as a dict.
+        """
+        return {'retries': self.retries, 'exhausted': self.exhausted}
+
+
+class CircuitBreaker(object):
+    """
+    Fails fast while an endpoint is unhealthy.
+
+    After 'failure_threshold' consecutive failures (connection errors,
+    timeouts, other request errors or 5xx responses) the breaker opens and requests raise
+    CircuitOpenError without being sent. After 'recovery_timeout' seconds
+    one trial request is let through (half-open): success closes the
+    breaker, failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    _COUNTERS = {
+        OPEN: 'opened',
+        HALF_OPEN: 'half_opened',
+        CLOSED: 'closed'
+    }
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30.0):
+        """
+        @param failure_threshold (int, optional, default=5): consecutive
+            failures that open the breaker.
+        @param recovery_timeout (float, optional, default=30.0): seconds the
+            breaker stays open before a trial request.
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+        self.counters = {
+            'opened': 0,
+            'half_opened': 0,
+            'closed': 0,
+            'rejected': 0
+        }
+        register_after_fork(self)
+
+    def _after_fork(self):
+        # a trial request in flight in the parent never ends in the child
+        self._lock = threading.Lock()
+        self._trial = False
+
+    def before_request(self):
+        """
+        Raises CircuitOpenError if the request must not be sent.
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    self.counters['rejected'] += 1
+                    raise CircuitOpenError('Circuit breaker is open')
+                self._set_state(self.HALF_OPEN)
+
+            if self.state == self.HALF_OPEN:
+                if self._trial:
+                    self.counters['rejected'] += 1
+                    raise CircuitOpenError('Circuit breaker is half-open')
+                self._trial = True
+
+    def record_success(self):
+        """ Records a request the endpoint handled.
+        """
+        with self._lock:
+            self.failures = 0
+            self._trial = False
+            if self.state != self.CLOSED:
+                self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        """ Records a request the endpoint failed to handle.
+        """
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            if self.state == self.HALF_OPEN or \
+                    self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self._set_state(self.OPEN)
+                self._opened_at = time.monotonic()
+
+    def release_trial(self):
+        """
+        Lets another trial request through after one that ended with no
+        outcome to record (e.g. interrupted by KeyboardInterrupt).
+        """
+        with self._lock:
+            self._trial = False
+
+    def _set_state(self, state):
+        """ Changes state and counts the change; caller holds the lock.
+        """
+        self.state = state
+        self.counters[self._COUNTERS[state]] += 1
+
+    def stats(self):
+        """ Returns breaker state and counters as a dict.
+        """
+        stats = dict(self.counters)
+        stats['state'] = self.state
+        stats['failures'] = self.failures
+        return stats
+
+
+def get_circuit_breaker(rest_url, **kwargs):
+    """
+    Returns the process-wide CircuitBreaker for 'rest_url', creating it
+    with 'kwargs' (see CircuitBreaker) on first use.
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(rest_url)
+        if breaker is None:
+            breaker = CircuitBreaker(**kwargs)
+            _breakers[rest_url] = breaker
+        return breaker
+
+
+def _after_fork_in_child():
+    """ Replaces the lock a parent thread may have held while forking.
+    """
+    global _breakers_lock
+    _breakers_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
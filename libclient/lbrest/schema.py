@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import hashlib
+import threading
+
+from requests.exceptions import HTTPError
+
+from .session import register_after_fork
+from ..utils import json2object
+from ..lbtypes.base import Base
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+class _Entry(object):
+    __slots__ = ('base', 'etag', 'expires')
+
+    def __init__(self, base, etag, expires):
+        self.base = base
+        self.etag = etag
+        self.expires = expires
+
+
+class SchemaCache(object):
+    """
+    Thread-safe cache of base schemas (lbtypes.Base) keyed by
+    (rest_url, basename, identity), with a per-entry TTL. The identity
+    (see client_identity) keeps clients with different credentials from
+    sharing schemas and ETags.
+
+    A fresh entry is returned without a request; an expired one is
+    revalidated with its ETag (If-None-Match), so an unchanged schema is
+    neither downloaded nor parsed again. Cached Base objects are shared by
+    every caller and must not be modified; copy them first (copy.deepcopy).
+    """
+
+    def __init__(self, ttl=300):
+        """
+        @param ttl (int or float, optional, default=300): seconds an entry
+            is used without revalidation, None for no expiration.
+        """
+        if ttl is not None and ttl < 0:
+            raise ValueError('ttl must be a non-negative number or None')
+
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.invalidations = 0
+        register_after_fork(self)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        """
+        @property version: changes on every invalidation. Read it before
+            a request and pass it to set() so a schema that raced with a
+            write is never cached.
+        """
+        return self._version
+
+    def _expires(self):
+        if self.ttl is None:
+            return None
+        return time.monotonic() + self.ttl
+
+    def get(self, rest_url, basename, identity=None):
+        """
+        Returns the cached Base if its entry is fresh, else None.
+
+        @param identity (string, optional, default=None): identity of the
+            client (see client_identity), None for anonymous clients.
+        """
+        with self._lock:
+            entry = self._entries.get((rest_url, basename, identity))
+            if entry is not None and (entry.expires is None or
+                                      entry.expires > time.monotonic()):
+                self.hits += 1
+                return entry.base
+            self.misses += 1
+            return None
+
+    def get_stale(self, rest_url, basename, identity=None):
+        """
+        Returns (base, etag) of the entry, fresh or expired, for
+        revalidation; (None, None) if there is none.
+        """
+        with self._lock:
+            entry = self._entries.get((rest_url, basename, identity))
+            if entry is None:
+                return None, None
+            return entry.base, entry.etag
+
+    def set(self, rest_url, basename, base, etag=None, version=None,
+            identity=None):
+        """
+        Stores 'base', valid for ttl seconds.
+
+        @param etag (string, optional, default=None): the response's ETag,
+            used to revalidate the entry once it expires.
+        @param version (int, optional, default=None): version read before
+            the request; the base is dropped if it changed since.
+        @param identity (string, optional, default=None): identity of the
+            client that fetched the base (see client_identity).
+        """
+        with self._lock:
+            if version is not None and version != self._version:
+                return
+            self._entries[(rest_url, basename, identity)] = \
+                _Entry(base, etag, self._expires())
+
+    def refresh(self, rest_url, basename, identity=None):
+        """
+        Marks the entry fresh for another ttl seconds, after the server
+        answered its revalidation with 304 Not Modified.
+        """
+        with self._lock:
+            entry = self._entries.get((rest_url, basename, identity))
+            if entry is not None:
+                entry.expires = self._expires()
+                self.revalidations += 1
+
+    def invalidate(self, rest_url, basename=None):
+        """
+        Drops the entries of 'basename' for every identity, or every entry
+        of 'rest_url' if basename is None.
+        """
+        with self._lock:
+            self._version += 1
+            keys = [key for key in self._entries if key[0] == rest_url and
+                    (basename is None or key[1] == basename)]
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        """ Drops every entry.
+        """
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """ Returns cache counters as a dict.
+        """
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidations': self.revalidations,
+            'invalidations': self.invalidations
+        }
+
+
+def get_schema_cache():
+    """
+    Returns the process-wide SchemaCache, creating it on first use.
+    """
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = SchemaCache()
+        return _shared_cache
+
+
+def client_identity(client):
+    """
+    Returns the identity of 'client' (LBRest) in a SchemaCache or a
+    DocumentCache: a digest of its auth cookies, None if it has none.
+    """
+    cookies = client.cookies
+    if not cookies:
+        return None
+    return hashlib.sha256(
+        repr(sorted(cookies.items())).encode('utf-8')).hexdigest()
+
+
+def fetch_base(client, basename, operation=None):
+    """
+    Returns the Base named 'basename', through the schema cache of
+    'client' (LBRest) if it has one: a fresh entry is returned without a
+    request and an expired one is revalidated with If-None-Match.
+    'operation' is reported to the client's hooks (see
+    LBRest.send_request).
+    """
+    cache = client.schema_cache
+    url_path = [basename]
+    if cache is None:
+        return Base.from_dict(client.send_request(
+            client.httpget, url_path=url_path, decode=True,
+            operation=operation))
+
+    identity = client_identity(client)
+    base = cache.get(client.rest_url, basename, identity)
+    if base is not None:
+        return base
+
+    version = cache.version
+    base, etag = cache.get_stale(client.rest_url, basename, identity)
+    headers = None
+    if base is not None and etag is not None:
+        headers = {'If-None-Match': etag}
+
+    response = client.send_request(client.httpget, url_path=url_path,
+                                   response_object=True, headers=headers,
+                                   operation=operation)
+    if response.status_code == 304 and base is not None:
+        cache.refresh(client.rest_url, basename, identity)
+        return base
+    if not response.ok:
+        raise HTTPError(response.text)
+
+    base = Base.from_dict(json2object(response.content))
+    cache.set(client.rest_url, basename, base,
+              response.headers.get('ETag'), version, identity)
+    return base
+
+
+def _after_fork_in_child():
+    """ Replaces the lock a parent thread may have held while forking.
+    """
+    global _shared_lock
+    _shared_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
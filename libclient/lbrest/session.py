@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import weakref
+import threading
+
+from six import string_types as PYSTR
+from six.moves.http_cookiejar import DefaultCookiePolicy
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
+from urllib3.connection import HTTPConnection
+from urllib3.connection import HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool
+from urllib3.connectionpool import HTTPSConnectionPool
+
+# @property DEFAULT_POOL_CONNECTIONS: number of per-host pools kept alive
+DEFAULT_POOL_CONNECTIONS = 10
+
+# @property DEFAULT_POOL_MAXSIZE: max connections kept alive per host
+DEFAULT_POOL_MAXSIZE = 10
+
+_shared_sessions = {}
+_shared_lock = threading.Lock()
+
+# @property _connect_timer: seconds spent opening connections and number of
+# connections opened, per thread
+_connect_timer = threading.local()
+
+# @property _fork_safe: live objects reset in forked children (see
+# register_after_fork)
+_fork_safe = weakref.WeakSet()
+
+
+def register_after_fork(obj):
+    """
+    Makes forked children call obj._after_fork(), which replaces the locks
+    a parent thread may have held while forking and drops the calls the
+    parent had in flight: their threads do not exist in the child.
+    """
+    _fork_safe.add(obj)
+
+
+class CookieState(object):
+    """
+    Thread-safe cookies of one LB identity.
+
+    Every LBRest client has its own; pass the same CookieState to several
+    clients to make them act as one identity. Cookies set by the server
+    are stored in the CookieState of the client that got them, never in
+    the connection pool, so clients sharing an LBSession stay isolated.
+    A forked child keeps the cookies and gets fresh locks.
+    """
+
+    def __init__(self, cookies=None):
+        """
+        @param cookies (dict or CookieJar, optional, default=None): initial
+            cookies.
+        """
+        self._lock = threading.Lock()
+        self._cookies = {}
+        self.set(cookies)
+        register_after_fork(self)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    def get(self):
+        """
+        Returns a copy of the cookies as a dict, None if there are none.
+        """
+        with self._lock:
+            return dict(self._cookies) or None
+
+    def set(self, cookies):
+        """ Replaces every cookie with 'cookies' (dict, CookieJar or None).
+        """
+        cookies = _cookie_dict(cookies)
+        with self._lock:
+            self._cookies = cookies
+
+    def update(self, cookies):
+        """ Adds or replaces 'cookies' (dict, CookieJar or None).
+        """
+        cookies = _cookie_dict(cookies)
+        if cookies:
+            with self._lock:
+                self._cookies.update(cookies)
+
+    def clear(self):
+        """ Drops every cookie.
+        """
+        with self._lock:
+            self._cookies = {}
+
+
+def _cookie_dict(cookies):
+    """ Returns 'cookies' (dict, CookieJar or None) as a new dict.
+    """
+    if cookies is None:
+        return {}
+    if isinstance(cookies, dict):
+        return dict(cookies)
+    if hasattr(cookies, '__iter__') and not isinstance(cookies, PYSTR):
+        return requests.utils.dict_from_cookiejar(cookies)
+    raise TypeError('cookies must be a dict or a CookieJar')
+
+
+class _NoCookiesPolicy(DefaultCookiePolicy):
+    """ Cookie policy that refuses to store any cookie.
+    """
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+def pop_connect_time():
+    """
+    Returns the seconds the current thread spent opening connections
+    (TCP and TLS handshakes) since the last call, and resets the count.
+    """
+    seconds = getattr(_connect_timer, 'seconds', 0.0)
+    _connect_timer.seconds = 0.0
+    return seconds
+
+
+def _add_connect_time(start):
+    _connect_timer.seconds = getattr(_connect_timer, 'seconds', 0.0) + \
+        time.perf_counter() - start
+    _connect_timer.count = getattr(_connect_timer, 'count', 0) + 1
+
+
+class _TimedHTTPConnection(HTTPConnection):
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super(_TimedHTTPConnection, self).connect()
+        finally:
+            _add_connect_time(start)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super(_TimedHTTPSConnection, self).connect()
+        finally:
+            _add_connect_time(start)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose connections record their connect time (see
+    pop_connect_time).
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super(_TimedAdapter, self).init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _TimedHTTPConnectionPool,
+            'https': _TimedHTTPSConnectionPool
+        }
+
+
+class LBSession(object):
+    """
+    Persistent HTTP session with a keep-alive connection pool.
+
+    One LBSession may be used by any number of LBRest clients; connections
+    are reused between calls instead of being opened for every request.
+    It keeps no cookies: each client's identity lives in its CookieState.
+
+    Fork-safe: a forked child (pre-fork servers, multiprocessing) never
+    uses the connections inherited from its parent; the pool is rebuilt
+    on first use in the child, and may be filled with @method warmup.
+    """
+
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize=DEFAULT_POOL_MAXSIZE, pool_block=False):
+        """
+        @param pool_connections (int, optional): number of host pools to cache.
+        @param pool_maxsize (int, optional): max connections kept per host.
+        @param pool_block (boolean, optional, default=False): if True, callers
+            wait for a free connection instead of opening extra ones when
+            all 'pool_maxsize' connections are busy.
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._http = self._build_http()
+        register_after_fork(self)
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    @property
+    def http(self):
+        """
+        @property http: the pooled requests.Session, rebuilt on first use
+            in a forked child.
+        """
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    # Drop the parent's connections without closing them:
+                    # the parent is still using them
+                    self._http = self._build_http()
+                    self._pid = os.getpid()
+        return self._http
+
+    def _build_http(self):
+        """ Creates the requests.Session with pooled adapters mounted.
+        """
+        http = requests.Session()
+        # Cookies belong to each client's CookieState, not to the pool
+        http.cookies = RequestsCookieJar(policy=_NoCookiesPolicy())
+        adapter = _TimedAdapter(pool_connections=self.pool_connections,
+                                pool_maxsize=self.pool_maxsize,
+                                pool_block=self.pool_block)
+        http.mount('http://', adapter)
+        http.mount('https://', adapter)
+        return http
+
+    def request(self, method, url, **kwargs):
+        """ Sends request through the pooled session.
+        """
+        return self.http.request(method, url, **kwargs)
+
+    def warmup(self, url, connections=None, timeout=None):
+        """
+        Opens keep-alive connections to the host of 'url' in parallel, so
+        the first requests do not pay the connection and TLS handshakes
+        (e.g. in a worker right after the fork). Returns the number of
+        connections opened.
+
+        Sends one HEAD request to 'url' per connection, through the same
+        pool later requests use; each holds its connection until all have
+        one, so idle connections are counted once and the missing ones are
+        opened.
+
+        @param url (string): url to send the HEAD requests to.
+        @param connections (int, optional, default=None): connections the
+            pool should hold, at most pool_maxsize (the default).
+        @param timeout (float or tuple, optional, default=None): timeout of
+            each request, see LBRest.
+        """
+        if connections is None:
+            connections = self.pool_maxsize
+        if not isinstance(connections, int) or connections < 0:
+            raise ValueError('connections must be a non-negative int')
+        connections = min(connections, self.pool_maxsize)
+        if connections == 0:
+            return 0
+
+        http = self.http
+        barrier = threading.Barrier(connections)
+
+        def open_connection():
+            opened = getattr(_connect_timer, 'count', 0)
+            try:
+                response = http.request('HEAD', url, stream=True,
+                                        timeout=timeout,
+                                        allow_redirects=False)
+            except BaseException:
+                barrier.abort()
+                raise
+            try:
+                barrier.wait()
+            except threading.BrokenBarrierError:
+                # another request failed: its error is raised below
+                pass
+            finally:
+                # a HEAD response has no body: the connection is reusable
+                response.raw.release_conn()
+            return getattr(_connect_timer, 'count', 0) - opened
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            futures = [executor.submit(open_connection)
+                       for _ in range(connections)]
+        return sum(future.result() for future in futures)
+
+    def close(self):
+        """ Closes every pooled connection.
+        """
+        self.http.close()
+
+
+def get_shared_session(rest_url, **kwargs):
+    """
+    Returns the process-wide LBSession for 'rest_url', creating it with
+    'kwargs' (see LBSession) on first use. Raises ValueError if 'kwargs'
+    differ from the settings the existing session was created with.
+
+    @param rest_url (string): url address of LBGenerator's REST
+    """
+    with _shared_lock:
+        session = _shared_sessions.get(rest_url)
+        if session is None:
+            session = LBSession(**kwargs)
+            _shared_sessions[rest_url] = session
+        else:
+            conflicts = ['%s=%r (shared session has %r)' % (
+                name, value, getattr(session, name))
+                for name, value in sorted(kwargs.items())
+                if getattr(session, name) != value]
+            if conflicts:
+                raise ValueError('Shared session of %s was created with '
+                                 'other settings: %s' % (
+                                     rest_url, ', '.join(conflicts)))
+        return session
+
+
+def close_shared_sessions():
+    """ Closes and forgets every shared LBSession.
+    """
+    with _shared_lock:
+        for session in _shared_sessions.values():
+            session.close()
+        _shared_sessions.clear()
+
+
+def _after_fork_in_child():
+    """
+    Replaces locks a parent thread may have held while forking, and resets
+    every object registered with register_after_fork.
+    """
+    global _shared_lock
+    _shared_lock = threading.Lock()
+    for obj in list(_fork_safe):
+        obj._after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import threading
+
+from requests.exceptions import Timeout
+
+from .session import register_after_fork
+
+
+class _Call(object):
+    """ A call in flight and its outcome.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Runs at most one call per key at a time; callers arriving while it is
+    in flight wait for it and share its result (or exception) instead of
+    running their own.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+        # @property calls: calls that ran
+        self.calls = 0
+
+        # @property coalesced: calls that shared the result of another
+        self.coalesced = 0
+
+        register_after_fork(self)
+
+    def _after_fork(self):
+        # calls in flight in the parent never finish in a forked child
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, timeout=None):
+        """
+        Returns (result, shared): the result of 'func()', called unless a
+        call with the same 'key' is in flight, and whether that result was
+        shared from another caller's call.
+
+        @param timeout (float, optional, default=None): max seconds to wait
+            for a call in flight; Timeout is raised when it is spent.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+
+        if leader:
+            try:
+                call.result = func()
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result, False
+
+        if not call.done.wait(timeout):
+            raise Timeout('Timed out waiting for an identical request')
+        if call.error is not None:
+            raise call.error
+        return call.result, True
+
+    def stats(self):
+        """ Returns call counters as a dict.
+        """
+        return {
+            'calls': self.calls,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._calls)
+        }
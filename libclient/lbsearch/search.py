@@ -243,6 +243,9 @@ class Search(JSONable):
 
 
 class LBFile(object):
+        __slots__ = ('id_file', 'id_doc', 'filename', 'filesize', 'mimetype',
+                     'filetext', 'dt_ext_text', 'download')
+
         def __init__(self, id_file=None, id_doc=None, filename=None, filesize=None, \
                 mimetype=None, filetext=None, dt_ext_text=None, download=None):
             self.id_file = id_file
@@ -303,6 +306,43 @@ class Collection(object):
         self.offset = offset
 
 
+class ResultStream(object):
+    """
+    Search results parsed incrementally from the response body: iterating
+    yields each result as soon as it has been read, so only one result is
+    held in memory at a time. result_count, limit and offset are None until
+    the parser has reached them; they are all set once iteration ends.
+    """
+
+    def __init__(self, members):
+        """
+        @param members (iterator): (key, value) pairs of the response, one
+            ('results', result) pair per result.
+        """
+        # @property result_count:
+        self.result_count = None
+
+        # @property limit:
+        self.limit = None
+
+        # @property offset:
+        self.offset = None
+
+        self._members = members
+
+    def __iter__(self):
+        for key, value in self._members:
+            if key == 'results':
+                yield value
+            else:
+                setattr(self, key, value)
+
+    def close(self):
+        """ Stops parsing and releases the connection.
+        """
+        self._members.close()
+
+
 class JSONEncoder(json.JSONEncoder):
     def default(self, obj):
         as_dict = getattr(obj, 'as_dict', None)
@@ -1,35 +1,226 @@
 import json
+from operator import attrgetter
+from operator import methodcaller
+
+# @property _layouts: class -> (names of the slots get_dict serializes,
+# callable returning their values followed by '_extra' and, for classes
+# with a __dict__, the __dict__)
+_layouts = {}
+
+# @property _MISSING: value of a slot that is not set
+_MISSING = object()
+
+
+def _layout(cls):
+    """
+    Returns the layout of 'cls' (see _layouts). Slot names are those of
+    'cls' and its bases, base classes first, each class in the order of
+    its __slots__.
+    """
+    layout = _layouts.get(cls)
+    if layout is None:
+        names = []
+        for klass in reversed(cls.__mro__):
+            slots = klass.__dict__.get('__slots__', ())
+            if isinstance(slots, str):
+                slots = (slots,)
+            names.extend(name for name in slots
+                         if not name.startswith('_') and name not in names)
+        names = tuple(names)
+        state = names + ('_extra',)
+        if getattr(cls, '__dictoffset__', 0):
+            state += ('__dict__',)
+        layout = _layouts[cls] = (names, attrgetter(*state))
+    return layout
+
 
 class TypeBase(object):
     """
-    Base class for all lbtypes
+    Base class for all lbtypes.
+
+    Subclasses keep their attributes in __slots__, so a base with thousands
+    of fields holds no per-object __dict__. Keys LB sends that a class does
+    not know are kept by from_dict in '_extra' and read as attributes.
+
+    get_json caches its result per object. Assigning an attribute marks the
+    object and the objects holding it (through '_parent') dirty; a dirty
+    object is encoded again from the cached JSON of the objects it holds,
+    so only changed subtrees are. Changes made in place to a list or dict
+    attribute are not seen: call mark_dirty after them.
     """
-    def get_dict(self):
+    __slots__ = ('_extra', '_parent', '_json')
+
+    def __new__(cls, *args, **kwargs):
+        self = super(TypeBase, cls).__new__(cls)
+        _setattr(self, '_extra', None)
+        _setattr(self, '_parent', None)
+        _setattr(self, '_json', None)
+        return self
+
+    def __setattr__(self, name, value):
+        _setattr(self, name, value)
+        if name[0] != '_' and (self._json is not None or
+                               self._parent is not None):
+            self.mark_dirty()
+
+    def __getattr__(self, name):
+        # Only called when the regular lookup fails
+        if name != '_extra':
+            try:
+                return self._extra[name]
+            except (AttributeError, KeyError, TypeError):
+                pass
+        raise AttributeError('%r object has no attribute %r' % (
+            type(self).__name__, name))
+
+    def _set(self, name, value):
         """
-        Returns object as a dict that follows LB's REST format.
+        Sets attribute 'name', keeping it in '_extra' if the class has no
+        slot for it.
+        """
+        try:
+            _setattr(self, name, value)
+        except AttributeError:
+            extra = getattr(self, '_extra', None)
+            if extra is None:
+                extra = self._extra = {}
+            extra[name] = value
+        if self._json is not None or self._parent is not None:
+            self.mark_dirty()
+
+    def mark_dirty(self):
+        """
+        Drops the JSON cached by get_json for this object and for the
+        objects holding it. Needed only after changing a list or dict
+        attribute in place (e.g. field.indices.append('Unico') or
+        group.content.pop()): assignments mark the object dirty.
+        """
+        node = self
+        while node is not None:
+            if node._json:
+                _setattr(node, '_json', _DIRTY)
+            node = node._parent
+
+    def _attributes(self):
+        """
+        Returns (name, value) pairs of the object: its slots in declaration
+        order, then the keys kept in '_extra' (and in __dict__, for
+        subclasses that do not declare __slots__).
+        """
+        names, getter = _layout(type(self))
+        try:
+            state = getter(self)
+        except AttributeError:
+            # some slot is not set
+            state = tuple([getattr(self, name, _MISSING) for name in names]) + \
+                (getattr(self, '_extra', None),
+                 getattr(self, '__dict__', None))
+        items = [(name, value) for name, value in zip(names, state)
+                 if value is not _MISSING]
+        for d in state[len(names):]:
+            if d:
+                items.extend(d.items())
+        return items
+
+    def _serialize(self, convert):
+        """
+        Returns object as a dict that follows LB's REST format, with every
+        lbtype it holds (directly or in a list) replaced by convert(value).
         Some subclasses override this method.
         """
+        names, getter = _layouts.get(type(self)) or _layout(type(self))
+        try:
+            state = getter(self)
+        except AttributeError:
+            state = None
+        if state is not None and state[-1] is None and \
+                len(state) == len(names) + 1:
+            # every slot is set and there is no extra key: the common case
+            items = zip(names, state)
+        else:
+            items = self._attributes()
+
         d = dict()
 
-        for key, value in self.__dict__.items():
-            if isinstance(value, TypeBase):
-                value = value.get_dict()
-            elif isinstance(value, list):
-                value_list = []
-                for elem in value:
-                    if isinstance(elem, TypeBase):
-                        elem = elem.get_dict()
-                    value_list.append(elem)
-                value = value_list
+        for key, value in items:
+            if isinstance(value, _NESTED):
+                if isinstance(value, list):
+                    value = [convert(elem) if isinstance(elem, TypeBase)
+                             else elem for elem in value]
+                else:
+                    value = convert(value)
             d[key] = value
 
         return d
 
+    def get_dict(self):
+        """
+        Returns object as a dict that follows LB's REST format.
+        """
+        return self._serialize(_get_dict)
+
     def get_json(self):
         """
         Returns JSON representation of the object that follows LB's REST format.
+        Unchanged objects return their cached JSON (see TypeBase).
+        """
+        return self._get_json()[0]
+
+    def _get_json(self):
+        """
+        Returns (json, cached): the JSON of the object and whether it was
+        cached, which it is only if every change to its output marks it
+        dirty.
         """
-        return json.dumps(self, cls=JSONEncoder)
+        json = self._json
+        if json:
+            return json, True
+        if type(self).get_dict is not TypeBase.get_dict:
+            # overridden by a subclass: its output is not known to depend
+            # only on the attributes
+            return _encoder.encode(self.get_dict()), False
+
+        if json is None:
+            # never encoded: the whole subtree is encoded in one call, and
+            # the objects it holds will be encoded apart once changed
+            tracked = [True]
+            d = _tracked_dict(self, tracked)
+            cacheable = tracked[0]
+            raw = None
+        else:
+            children = []
+
+            def convert(child):
+                children.append(child)
+                return child
+
+            d = self._serialize(convert)
+            cacheable = True
+            raw = {}
+            for child in children:
+                child_json, cached = child._get_json()
+                if child._parent is None:
+                    _setattr(child, '_parent', self)
+                elif child._parent is not self:
+                    # held by another object too, which is the one it
+                    # marks dirty
+                    cached = False
+                cacheable = cacheable and cached
+                raw[id(child)] = child_json
+
+        if raw:
+            json = _encode(d, raw)
+            cacheable = cacheable and None not in raw
+        else:
+            try:
+                json = _plain_encoder.encode(d)
+            except TypeError:
+                # an lbtype nested in a dict: its changes are not seen
+                json = _encoder.encode(d)
+                cacheable = False
+        if cacheable:
+            _setattr(self, '_json', json)
+        return json, cacheable
 
     @classmethod
     def from_dict(cls, args):
@@ -40,6 +231,36 @@ class TypeBase(object):
         raise NotImplementedError()
 
 
+# @property _NESTED: values _serialize converts
+_NESTED = (TypeBase, list)
+
+# @property _DIRTY: '_json' of an object changed since it was encoded
+_DIRTY = ''
+
+_setattr = object.__setattr__
+_get_dict = methodcaller('get_dict')
+
+
+def _tracked_dict(obj, tracked):
+    """
+    Returns obj.get_dict(), making every lbtype in it held by the object
+    whose dict holds it (see TypeBase). Sets tracked[0] to False if some
+    of them cannot mark 'obj' dirty.
+    """
+    def convert(child):
+        parent = child._parent
+        if parent is None:
+            _setattr(child, '_parent', obj)
+        elif parent is not obj:
+            tracked[0] = False
+        if type(child).get_dict is not TypeBase.get_dict:
+            tracked[0] = False
+            return child.get_dict()
+        return _tracked_dict(child, tracked)
+
+    return obj._serialize(convert)
+
+
 class JSONEncoder(json.JSONEncoder):
     def default(self, obj):
         get_dict = getattr(obj, 'get_dict', None)
@@ -48,3 +269,43 @@ class JSONEncoder(json.JSONEncoder):
             return get_dict()
 
         return JSONEncoder.default(self, obj)
+
+
+_encoder = JSONEncoder()
+
+
+# @property _plain_encoder: encodes as _encoder, failing on lbtypes
+_plain_encoder = json.JSONEncoder()
+
+
+def _encode(value, raw):
+    """
+    Returns 'value' as JSON, as json.dumps(value, cls=JSONEncoder) would,
+    with the JSON in 'raw' (id of an lbtype -> JSON) put in place of the
+    lbtypes _serialize left in its dicts and lists. Adds the key None to
+    'raw' if it encoded any other lbtype.
+    """
+    if isinstance(value, TypeBase):
+        json = raw.get(id(value))
+        if json is not None:
+            return json
+    elif isinstance(value, dict):
+        return '{' + ', '.join('%s: %s' % (_encode_key(key), _encode(item, raw))
+                               for key, item in value.items()) + '}'
+    elif isinstance(value, list):
+        return '[' + ', '.join([_encode(item, raw) for item in value]) + ']'
+    try:
+        return _plain_encoder.encode(value)
+    except TypeError:
+        # an lbtype _serialize did not convert: its changes are not seen
+        raw[None] = None
+        return _encoder.encode(value)
+
+
+def _encode_key(key):
+    """ Returns dict key 'key' as JSON, converted as json.dumps does.
+    """
+    if isinstance(key, str):
+        return _plain_encoder.encode(key)
+    # '{"1": null}' -> '"1"'
+    return _encoder.encode({key: None})[1:-7]
@@ -5,6 +5,9 @@ class Field(TypeBase):
     """
     Represents a field and its metadata in a base
     """
+    __slots__ = ('name', 'datatype', 'alias', 'description', 'required',
+                 'multivalued', 'indices')
+
     def __init__(self, name, datatype, alias='', description='',
                  required=False, multivalued=False, indices=None):
         """
@@ -25,11 +28,11 @@ class Field(TypeBase):
         else:
             self.indices = indices
 
-    def get_dict(self):
+    def _serialize(self, convert):
         """
         Returns field as a dict that follows LB's REST format.
         """
-        return {'field': super(Field, self).get_dict()}
+        return {'field': super(Field, self)._serialize(convert)}
 
     @classmethod
     def from_dict(cls, args):
@@ -42,13 +45,17 @@ class Field(TypeBase):
         field = cls(args['name'], args['datatype'])
 
         for key, value in args.items():
-            setattr(field, key, value)
+            field._set(key, value)
+
+        return field
 
 
 class GroupMetadata(TypeBase):
     """
     Represents a Group's metadata
     """
+    __slots__ = ('name', 'alias', 'description', 'multivalued')
+
     def __init__(self, name, alias='', description='', multivalued=False):
         if name is None:
             raise TypeError('Wrong parameter: name must be a string')
@@ -69,7 +76,7 @@ class GroupMetadata(TypeBase):
         metadata = GroupMetadata(args.get('name', None))
 
         for k, v in args.items():
-            setattr(metadata, k, v)
+            metadata._set(k, v)
 
         return metadata
 
@@ -78,6 +85,8 @@ class Group(TypeBase):
     """
     Represents a Group in a base
     """
+    __slots__ = ('metadata', 'content')
+
     def __init__(self, metadata=None, content=None, **kwargs):
         """
         Must provide either a GroupMetadata object or named parameters containing
@@ -97,6 +106,8 @@ class Group(TypeBase):
                 'or args must be provided')
         
         self.content = content or []
+        self._parent = None
+        _adopt(self, self.content)
 
     def add_field(self, field):
         """
@@ -109,12 +120,23 @@ class Group(TypeBase):
             raise TypeError('Wrong parameter: field must be a Field or Group')
 
         self.content.append(field)
+        _adopt(self, (field,))
+        self.invalidate_index()
+        self.mark_dirty()
+
+    def invalidate_index(self):
+        """
+        Drops the path index and validator of the Base holding this group.
+        Needed only after changing the schema by other means than add_field.
+        """
+        if self._parent is not None:
+            self._parent.invalidate_index()
 
-    def get_dict(self):
+    def _serialize(self, convert):
         """
         Returns group as a dict that follows LB's REST format.
         """
-        return {'group': super(Group, self).get_dict()}
+        return {'group': super(Group, self)._serialize(convert)}
 
     @classmethod
     def from_dict(cls, args):
@@ -128,15 +150,12 @@ class Group(TypeBase):
 
         for key, value in args.items():
             if not key == 'content' and not key == 'metadata':
-                setattr(group, key, value)
+                group._set(key, value)
 
         group.metadata = GroupMetadata.from_dict(args['metadata'])
 
         for c in args['content']:
-            for key, value in c.items():
-                if key == 'field':
-                    obj = Field.from_dict(value)
-
+            obj = _structure_from_dict(c)
             if obj is not None:
                 group.add_field(obj)
 
@@ -147,6 +166,9 @@ class BaseMetadata(TypeBase):
     """
     Represents a Base's metadata
     """
+    __slots__ = ('name', 'description', 'password', 'color', 'idx_exp',
+                 'idx_exp_url', 'idx_exp_time', 'file_ext', 'file_ext_time')
+
     def __init__(self, name, description='', password='', color='',
         idx_exp=False, idx_exp_url='', idx_exp_time='0', file_ext=False,
         file_ext_time='0'):
@@ -175,12 +197,14 @@ class BaseMetadata(TypeBase):
         metadata = BaseMetadata(args['name'])
 
         for k, v in args.items():
-            setattr(metadata, k, v)
+            metadata._set(k, v)
 
         return metadata
 
 
 class Base(TypeBase):
+    __slots__ = ('metadata', 'content', '_index', '_validator')
+
     def __init__(self, metadata=None, content=None, **kwargs):
         """
         Must provide either a BaseMetadata object or named parameters containing
@@ -201,6 +225,9 @@ class Base(TypeBase):
                 'or args must be provided')
 
         self.content = content or []
+        self._index = None
+        self._validator = None
+        _adopt(self, self.content)
 
     def add_field(self, field):
         """
@@ -213,6 +240,48 @@ class Base(TypeBase):
             raise TypeError('Wrong parameter: not a Field or Group')
 
         self.content.append(field)
+        _adopt(self, (field,))
+        self.invalidate_index()
+        self.mark_dirty()
+
+    @property
+    def index(self):
+        """
+        @property index: dict mapping the slash path of every field and group
+            (e.g. 'gp_tracks/int_track_number') to its SchemaPath, in schema
+            order. Compiled on first use and kept until the schema changes
+            through add_field (see invalidate_index).
+        """
+        index = self._index
+        if index is None:
+            index = self._index = _compile_index(self.content)
+        return index
+
+    def get_path(self, path):
+        """
+        Returns the SchemaPath of 'path', None if the base has no such field
+        or group. Positions in document paths ('gp_tracks/0/txt_title' or
+        'gp_tracks/*/txt_title') are ignored.
+
+        @param path (string): slash separated path.
+        """
+        index = self.index
+        schema_path = index.get(path)
+        if schema_path is None and '/' in path:
+            path = '/'.join(step for step in path.split('/')
+                            if step not in ('', '*', '-') and not step.isdigit())
+            schema_path = index.get(path)
+        return schema_path
+
+    def invalidate_index(self):
+        """
+        Drops the path index and the document validator compiled from the
+        schema, rebuilt on next use. Needed only after changing the schema
+        by other means than add_field (e.g. editing 'content' or a field's
+        attributes in place).
+        """
+        self._index = None
+        self._validator = None
 
     @classmethod
     def from_dict(cls, args):
@@ -222,24 +291,108 @@ class Base(TypeBase):
         if not isinstance(args, dict):
             raise TypeError('Wrong parameter: not a dictionary')
 
+        # Keys besides 'metadata' and 'content' are dropped: a base
+        # serializes only those two
         base = cls(name=args['metadata']['name'])
-
-        for key, value in args.items():
-            if not key == 'content' and not 'metadata':
-                setattr(base, key, value)
-
         base.metadata = BaseMetadata.from_dict(args['metadata'])
 
         for c in args['content']:
-            for key, value in c.items():
-                if key == 'field':
-                    obj = Field.from_dict(value)
-                elif key == 'group':
-                    obj = Group.from_dict(value)
-
-                if obj is not None:
-                    base.add_field(obj)
+            obj = _structure_from_dict(c)
+            if obj is not None:
+                base.add_field(obj)
 
+        base._index = _compile_index(base.content)
         return base
 
 
+class SchemaPath(object):
+    """
+    Compiled metadata of one field or group of a Base (see Base.index).
+    """
+    __slots__ = ('path', 'structure', 'datatype', 'multivalued', 'indices',
+                 'multivalued_ancestors')
+
+    def __init__(self, path, structure, multivalued_ancestors=()):
+        """
+        @param path (string): slash separated path of the structure.
+        @param structure (Field or Group): the field or group.
+        @param multivalued_ancestors (tuple, optional, default=()): paths of
+            the multivalued groups holding the structure, outermost first.
+        """
+        is_group = isinstance(structure, Group)
+
+        # @property path: e.g. 'gp_tracks/int_track_number'
+        self.path = path
+
+        # @property structure: the Field or Group
+        self.structure = structure
+
+        # @property datatype: LB datatype, None for groups
+        self.datatype = None if is_group else structure.datatype
+
+        # @property multivalued: whether the structure itself is a list
+        self.multivalued = structure.metadata.multivalued if is_group \
+            else structure.multivalued
+
+        # @property indices: index kinds of the field, () for groups
+        self.indices = () if is_group else tuple(structure.indices or ())
+
+        # @property multivalued_ancestors: paths of the multivalued groups
+        # holding the structure, outermost first
+        self.multivalued_ancestors = multivalued_ancestors
+
+    @property
+    def is_group(self):
+        """ @property is_group: True for groups
+        """
+        return self.datatype is None
+
+    @property
+    def in_multivalued(self):
+        """
+        @property in_multivalued: True if a multivalued group holds the
+            structure, i.e. documents have one value per group item.
+        """
+        return bool(self.multivalued_ancestors)
+
+    def __repr__(self):
+        return '<SchemaPath %s>' % self.path
+
+
+def _compile_index(content, prefix='', ancestors=(), index=None):
+    """
+    Returns the path index (see Base.index) of the structures in 'content'.
+    """
+    if index is None:
+        index = {}
+    for structure in content:
+        if isinstance(structure, Group):
+            path = prefix + structure.metadata.name
+            index[path] = SchemaPath(path, structure, ancestors)
+            _compile_index(structure.content, path + '/',
+                ancestors + (path,) if structure.metadata.multivalued
+                else ancestors, index)
+        elif isinstance(structure, Field):
+            path = prefix + structure.name
+            index[path] = SchemaPath(path, structure, ancestors)
+    return index
+
+
+def _adopt(parent, content):
+    """ Makes 'parent' the parent of the fields and groups in 'content'.
+    """
+    for structure in content:
+        if isinstance(structure, TypeBase):
+            structure._parent = parent
+
+
+def _structure_from_dict(structure):
+    """
+    Returns the Field or Group of a content item ({'field': {...}} or
+    {'group': {...}}), None for anything else.
+    """
+    if 'field' in structure:
+        return Field.from_dict(structure['field'])
+    if 'group' in structure:
+        return Group.from_dict(structure['group'])
+    return None
@@ -1,8 +1,22 @@
+import os
+
+from six import string_types as PYSTR
+
 from ..lbtypes import TypeBase
 
 class File(TypeBase):
+    __slots__ = ('id_file', 'id_doc', 'filename', 'filesize', 'mimetype',
+                 'filetext', 'dt_ext_text', 'download', '_content', 'source', '_offset')
+
     def __init__(self, id_file=None, id_doc=None, filename=None, filesize=None, \
-            mimetype=None, filetext=None, dt_ext_text=None, download=None, content=None):
+            mimetype=None, filetext=None, dt_ext_text=None, download=None, content=None,
+            source=None):
+        """
+        @param content (bytes, optional): file contents held in memory.
+        @param source (string or file object, optional): path or binary file
+            object the contents are read from on demand, instead of 'content';
+            a file object is read from its current position.
+        """
         self.id_file = id_file
         self.id_doc = id_doc
         self.filename = filename
@@ -12,24 +26,78 @@ class File(TypeBase):
         self.dt_ext_text = dt_ext_text
         self.download = download
         self.content = content
+        self.source = source
+        # where the contents of a file object source start
+        self._offset = _position(source)
 
+    @property
+    def content(self):
+        """
+        @property content getter: file contents; read from source on each
+        access when the file was opened lazily.
+        """
+        if self._content is None and self.source is not None:
+            with self.open_source() as f:
+                return f.read()
+        return self._content
 
-    @classmethod
-    def open(cls, file_path):
-        if not isinstance(file_path, PYSTR):
-            raise TypeError('Wrong parameter: file_path must be a string')
+    @content.setter
+    def content(self, value):
+        """ @property content setter
+        """
+        self._content = value
+
+    @property
+    def in_memory(self):
+        """ @property in_memory: True if contents are held in 'content'
+        """
+        return self._content is not None
+
+    def open_source(self):
+        """
+        Returns a binary file object positioned at the start of the contents,
+        to be used as a context manager. A path is opened and closed on exit;
+        a file object is moved back to its position when the File was
+        created and left open.
+        """
+        if self.source is None:
+            raise ValueError('File has no source')
+
+        if isinstance(self.source, PYSTR):
+            return open(self.source, 'rb')
+
+        if self._offset is not None:
+            self.source.seek(self._offset)
+        return _Unclosable(self.source)
 
-        filename = file_path.split('/')[-1]
+    def _serialize(self, convert):
+        """
+        Returns file as a dict that follows LB's REST format.
+        """
+        d = super(File, self)._serialize(convert)
+        d.pop('source', None)
+        d['content'] = self._content
+        return d
 
-        f = open(file_path, 'rb')
-        import os
-        size = os.fstat(f.fileno()).st_size
-        content = f.read()
-        f.close()
+    @classmethod
+    def open(cls, file_path):
+        """
+        Creates a File that reads its contents from 'file_path' (a path or
+        a binary file object) on demand instead of loading it in memory.
+        """
+        if isinstance(file_path, PYSTR):
+            filename = file_path.split('/')[-1]
+            size = os.stat(file_path).st_size
+        elif hasattr(file_path, 'read'):
+            name = getattr(file_path, 'name', None)
+            filename = os.path.basename(name) if isinstance(name, PYSTR) else None
+            size = _file_size(file_path)
+        else:
+            raise TypeError('Wrong parameter: file_path must be a string or a file object')
 
-        file = cls(filename=filename, filesize=size, content=content)
+        file = cls(filename=filename, filesize=size, source=file_path)
         return file
-        
+
 
     @classmethod
     def from_dict(cls, args):
@@ -41,4 +109,54 @@ class File(TypeBase):
 
         file = cls(**args)
 
-        return file
\ No newline at end of file
+        return file
+
+
+def _position(source):
+    """
+    Returns the position of 'source' if it is a seekable file object, else
+    None.
+    """
+    if source is None or isinstance(source, PYSTR):
+        return None
+    try:
+        if hasattr(source, 'seekable') and not source.seekable():
+            return None
+        return source.tell()
+    except (AttributeError, OSError, IOError, ValueError):
+        return None
+
+
+def _file_size(fileobj):
+    """
+    Returns the number of bytes left in 'fileobj', None if unknown.
+    """
+    try:
+        return os.fstat(fileobj.fileno()).st_size - fileobj.tell()
+    except (AttributeError, OSError, IOError, ValueError):
+        pass
+    try:
+        position = fileobj.tell()
+        fileobj.seek(0, os.SEEK_END)
+        size = fileobj.tell() - position
+        fileobj.seek(position)
+        return size
+    except (AttributeError, OSError, IOError, ValueError):
+        return None
+
+
+class _Unclosable(object):
+    """
+    Context manager over a caller-owned file object that leaves it open.
+    """
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+
+    def read(self, size=-1):
+        return self.fileobj.read(size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+import datetime
+
+from six import string_types as PYSTR
+
+from .base import Group
+
+
+class ValidationError(ValueError):
+    """
+    Raised when a document does not match its base's schema. 'errors' has
+    every problem found, as (path, message) tuples.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        shown = '; '.join('%s: %s' % error for error in errors[:5])
+        if len(errors) > 5:
+            shown += '; ...'
+        super(ValidationError, self).__init__(
+            '%d validation error%s: %s' % (
+                len(errors), '' if len(errors) == 1 else 's', shown))
+
+
+def _is_string(value):
+    return isinstance(value, PYSTR)
+
+
+def _is_bool(value):
+    return isinstance(value, bool)
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _format_check(cls, fmt):
+    """
+    Returns a check accepting instances of 'cls' and strings in format
+    'fmt', as written by utils.DocumentJSONEncoder.
+    """
+    def check(value):
+        if isinstance(value, PYSTR):
+            try:
+                datetime.datetime.strptime(value, fmt)
+            except ValueError:
+                return False
+            return True
+        return isinstance(value, cls)
+    return check
+
+
+_check_date = _format_check(datetime.date, '%d/%m/%Y')
+
+
+def _is_date(value):
+    # datetimes are dates too, but LB's Date fields take no time
+    return not isinstance(value, datetime.datetime) and _check_date(value)
+
+
+def _is_file(value):
+    return isinstance(value, dict) or hasattr(value, 'get_dict')
+
+
+# @property CHECKS: datatype -> check of a single value; datatypes not
+# listed here accept any value
+CHECKS = {
+    'Text': _is_string,
+    'TextArea': _is_string,
+    'Textarea': _is_string,
+    'Password': _is_string,
+    'Html': _is_string,
+    'Email': _is_string,
+    'Url': _is_string,
+    'Integer': _is_int,
+    'SelfEnumerated': _is_int,
+    'Decimal': _is_number,
+    'Money': _is_number,
+    'Boolean': _is_bool,
+    'Date': _is_date,
+    'DateTime': _format_check(datetime.datetime, '%d/%m/%Y %H:%M:%S'),
+    'Time': _format_check(datetime.time, '%H:%M:%S'),
+    'File': _is_file,
+    'Image': _is_file,
+    'Sound': _is_file,
+    'Video': _is_file,
+    'Document': _is_file,
+}
+
+
+class _Rule(object):
+    """ Compiled checks of one field or group.
+    """
+    __slots__ = ('name', 'datatype', 'required', 'multivalued', 'check',
+                 'rules', 'required_names')
+
+    def __init__(self, structure):
+        if isinstance(structure, Group):
+            self.name = structure.metadata.name
+            self.datatype = None
+            self.required = False
+            self.multivalued = structure.metadata.multivalued
+            self.check = None
+            self.rules, self.required_names = _compile(structure.content)
+        else:
+            self.name = structure.name
+            self.datatype = structure.datatype
+            self.required = structure.required
+            self.multivalued = structure.multivalued
+            self.check = CHECKS.get(structure.datatype)
+            self.rules = None
+            self.required_names = None
+
+
+def _compile(content):
+    """
+    Returns (rules, required_names) of the structures in 'content': a dict
+    of _Rule by name and the names of the required fields.
+    """
+    rules = {}
+    for structure in content:
+        rule = _Rule(structure)
+        rules[rule.name] = rule
+    required_names = tuple(name for name, rule in rules.items()
+                           if rule.required)
+    return rules, required_names
+
+
+class DocumentValidator(object):
+    """
+    Checks documents (dicts) against a Base before they are sent to LB:
+    datatypes of the fields, required fields, lists for multivalued fields
+    and groups, and fields unknown to the base. Keys starting with '_'
+    (e.g. '_metadata') are not checked.
+
+    The schema is compiled once; use @method for_base to share one
+    validator between every client of a Base.
+    """
+
+    def __init__(self, base):
+        """
+        @param base (Base): the base (libclient.lbtypes.base.Base).
+        """
+        self.rules, self.required_names = _compile(base.content)
+
+    @classmethod
+    def for_base(cls, base):
+        """
+        Returns the validator of 'base', compiled on first use and kept
+        until the schema changes (see Base.invalidate_index).
+        """
+        validator = base._validator
+        if validator is None:
+            validator = base._validator = cls(base)
+        return validator
+
+    def errors(self, document):
+        """
+        Returns every problem in 'document' as a list of (path, message)
+        tuples, empty if the document is valid.
+        """
+        errors = []
+        if not isinstance(document, dict):
+            errors.append(('', 'document must be a dict'))
+        else:
+            _check_object(document, self.rules, self.required_names, '',
+                          errors)
+        return errors
+
+    def validate(self, document):
+        """
+        Raises ValidationError with every problem in 'document'.
+        """
+        errors = self.errors(document)
+        if errors:
+            raise ValidationError(errors)
+
+    def validate_many(self, documents):
+        """
+        Returns a dict mapping the position of every invalid document in
+        'documents' to its errors.
+        """
+        invalid = {}
+        for position, document in enumerate(documents):
+            errors = self.errors(document)
+            if errors:
+                invalid[position] = errors
+        return invalid
+
+
+def _check_object(document, rules, required_names, prefix, errors):
+    """ Appends the errors of a document or group value to 'errors'.
+    """
+    for name in required_names:
+        if document.get(name) is None:
+            errors.append((prefix + name, 'required'))
+
+    for key, value in document.items():
+        rule = rules.get(key)
+        if rule is None:
+            if not key.startswith('_'):
+                errors.append((prefix + key, 'unknown field'))
+            continue
+        if value is None:
+            continue
+
+        path = prefix + key
+        if rule.multivalued:
+            if not isinstance(value, list):
+                errors.append((path, 'must be a list'))
+                continue
+            if rule.required and not value:
+                errors.append((path, 'required'))
+            for position, item in enumerate(value):
+                _check_value(rule, item, '%s/%d' % (path, position), errors)
+        else:
+            _check_value(rule, value, path, errors)
+
+
+def _check_value(rule, value, path, errors):
+    """ Appends the errors of a single value of 'rule' to 'errors'.
+    """
+    if rule.rules is not None:
+        if isinstance(value, dict):
+            _check_object(value, rule.rules, rule.required_names, path + '/',
+                          errors)
+        else:
+            errors.append((path, 'must be a dict'))
+    elif value is None:
+        errors.append((path, 'must not be null'))
+    elif rule.check is not None and not rule.check(value):
+        errors.append((path, 'must be %s, not %s' % (
+            rule.datatype, type(value).__name__)))
@@ -0,0 +1,66 @@
+""" Fakes shared by the tests.
+"""
+import io
+import time
+
+import requests
+
+from ..lbrest.session import LBSession
+from ..lbtypes.base import Base
+from ..lbtypes.base import Field
+from ..lbtypes.base import Group
+
+
+class FakeSession(LBSession):
+    """
+    Session answering requests without a server. Counts the requests in
+    'calls' and records the timeout of each one in 'timeouts'.
+    """
+
+    def __init__(self, outcomes=(), status=200, body=b'{}', delay=0):
+        """
+        @param outcomes (list, optional, default=()): status (int) or error
+            to raise of each request, in order; once they are used up every
+            request is answered with 'status'.
+        @param status (int, optional, default=200): status of the response.
+        @param body (bytes, optional, default=b'{}'): body of the response.
+        @param delay (float, optional, default=0): seconds each request takes.
+        """
+        super(FakeSession, self).__init__()
+        self.outcomes = list(outcomes)
+        self.status = status
+        self.body = body
+        self.delay = delay
+        self.calls = 0
+        self.timeouts = []
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        self.timeouts.append(kwargs.get('timeout'))
+        if self.delay:
+            time.sleep(self.delay)
+        outcome = self.outcomes.pop(0) if self.outcomes else self.status
+        if isinstance(outcome, BaseException):
+            raise outcome
+        response = requests.Response()
+        response.status_code = outcome
+        response.raw = io.BytesIO(self.body)
+        response.request = requests.Request(
+            method, url, data=kwargs.get('data')).prepare()
+        return response
+
+
+def make_base():
+    """ Returns the 'music' base the lbtypes and validator tests use.
+    """
+    base = Base(name='music', description='Music base')
+    base.add_field(Field('txt_title', 'Text', required=True))
+    gp_tracks = Group(name='gp_tracks', multivalued=True)
+    gp_tracks.add_field(Field('txt_track_title', 'Text', required=True))
+    gp_tracks.add_field(Field('snd_file', 'Sound'))
+    gp_tracks.add_field(Field('int_track_number', 'Integer'))
+    gp_tracks.add_field(Field('time_track_len', 'Time'))
+    base.add_field(gp_tracks)
+    base.add_field(Field('dt_release', 'Date'))
+    base.add_field(Field('txt_tags', 'Text', multivalued=True))
+    return base
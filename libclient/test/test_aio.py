@@ -0,0 +1,152 @@
+import time
+import asyncio
+import unittest
+import threading
+from http.server import HTTPServer
+from http.server import BaseHTTPRequestHandler
+
+from requests.exceptions import HTTPError
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+class TestAsyncDocumentREST(unittest.TestCase):
+
+    def setUp(self):
+        from ..lbrest.aio import AsyncDocumentREST
+        self.rest = AsyncDocumentREST('http://192.168.56.102',
+                                      'python_rest_test')
+
+    def tearDown(self):
+        asyncio.run(self.rest.close())
+
+    def test_base_error(self):
+        from ..lbrest.aio import AsyncDocumentREST
+        self.assertRaises(TypeError, AsyncDocumentREST,
+                          *['http://192.168.56.102', 1])
+
+    def test_argument_validation(self):
+        self.assertRaises(TypeError, asyncio.run, self.rest.create([]))
+        self.assertRaises(TypeError, asyncio.run, self.rest.get('1'))
+        self.assertRaises(TypeError, asyncio.run, self.rest.get_path(1, 2))
+        self.assertRaises(TypeError, asyncio.run, self.rest.search('*'))
+
+    def test_resource_path(self):
+        self.assertEqual(self.rest.resource_path('doc', 1, 'gp/0/txt'),
+                         ['python_rest_test', 'doc', '1', 'gp', '0', 'txt'])
+        self.assertEqual(self.rest.resource_path('doc', 1, ['gp', '0']),
+                         ['python_rest_test', 'doc', '1', 'gp', '0'])
+
+    def test_blocking_only_api(self):
+        # Hooks, warmup and the retry/cache counters need the blocking
+        # connection pool: the async clients do not offer them.
+        from ..lbrest.core import LBRest
+        self.assertNotIsInstance(self.rest, LBRest)
+        for name in ('register_hook', 'warmup', 'stats', 'send_stream'):
+            self.assertFalse(hasattr(self.rest, name), name)
+
+    def test_cookies(self):
+        self.rest.cookies = {'session': 'a'}
+        self.assertEqual(self.rest.cookies, {'session': 'a'})
+        self.assertEqual(self.rest.basename, 'python_rest_test')
+
+
+class FileHandler(BaseHTTPRequestHandler):
+    """ Serves the binary of file 1, 404 for any other file.
+    """
+    content = bytes(range(256)) * 64
+
+    def do_GET(self):
+        if self.path == '/python_rest_test/file/3/filename':
+            time.sleep(0.3)
+        if self.path == '/python_rest_test/file/1/download':
+            status, body = 200, self.content
+        else:
+            status, body = 404, b'file not found'
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+class TestAsyncRequests(unittest.TestCase):
+
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), FileHandler)
+        self.rest_url = 'http://127.0.0.1:%d' % self.server.server_address[1]
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def run_client(self, call, **kwargs):
+        from ..lbrest.aio import AsyncFileREST
+
+        async def run():
+            async with AsyncFileREST(self.rest_url, 'python_rest_test',
+                                     **kwargs) as rest:
+                return await call(rest)
+
+        return asyncio.run(run())
+
+    def test_get_content(self):
+        content = self.run_client(lambda rest: rest.get_content(1))
+        self.assertEqual(content, FileHandler.content)
+
+    def test_get_content_error(self):
+        self.assertRaises(HTTPError, self.run_client,
+                          lambda rest: rest.get_content(2))
+
+    def test_response_object(self):
+        async def call(rest):
+            async with await rest.send_request(
+                    'GET', ['python_rest_test', 'file', '1', 'download'],
+                    response_object=True) as response:
+                return response.status, await response.read()
+
+        self.assertEqual(self.run_client(call), (200, FileHandler.content))
+
+        async def missing(rest):
+            response = await rest.get_path(2, 'filename')
+            response.release()
+            return response.status
+
+        self.assertEqual(self.run_client(missing, response_object=True), 404)
+
+    def test_timeout(self):
+        self.assertRaises(asyncio.TimeoutError, self.run_client,
+                          lambda rest: rest.get_path(3, 'filename'),
+                          timeout=0.1)
+        self.assertRaises(asyncio.TimeoutError, self.run_client,
+                          lambda rest: rest.send_request(
+                              'GET', ['python_rest_test', 'file', '3',
+                                      'filename'], timeout=(1, 0.1)))
+
+    def test_client_timeout(self):
+        from ..lbrest.aio import AsyncBaseREST
+        from ..lbrest.core import DEFAULT_TIMEOUT
+        rest = AsyncBaseREST(self.rest_url)
+        self.assertEqual((rest.timeout.sock_connect, rest.timeout.sock_read),
+                         DEFAULT_TIMEOUT)
+        timeout = aiohttp.ClientTimeout(total=5)
+        self.assertIs(AsyncBaseREST(self.rest_url, timeout=timeout).timeout,
+                      timeout)
+        self.assertIsNone(AsyncBaseREST(self.rest_url,
+                                        timeout=None).timeout.sock_read)
+        self.assertRaises(ValueError, AsyncBaseREST, *[self.rest_url],
+                          **{'timeout': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import threading
+
+from ..lbrest.bulk import run_bulk
+from ..lbrest.bulk import chunks
+from ..lbrest.document import DocumentREST
+
+
+class TestBulk(unittest.TestCase):
+
+    def test_chunks(self):
+        self.assertEqual(list(chunks(iter(range(5)), 2)), [[0, 1], [2, 3], [4]])
+
+    def test_order_and_errors(self):
+        def func(item):
+            if item % 3 == 0:
+                raise ValueError(item)
+            return item * 2
+
+        result = run_bulk(func, (i for i in range(10)), concurrency=3,
+                          chunk_size=4)
+        self.assertEqual(result.results,
+                         [None, 2, 4, None, 8, 10, None, 14, 16, None])
+        self.assertEqual(sorted(result.errors.keys()), [0, 3, 6, 9])
+        self.assertIsInstance(result.errors[3], ValueError)
+        stats = result.stats()
+        self.assertEqual(stats['count'], 10)
+        self.assertEqual(stats['succeeded'], 6)
+        self.assertEqual(stats['failed'], 4)
+
+    def test_sliding_window(self):
+        # items after a slow one start as soon as a worker is free, without
+        # waiting for the rest of its chunk
+        started = threading.Event()
+
+        def func(item):
+            if item == 2:
+                return started.wait(2)
+            if item == 4:
+                started.set()
+            return item
+
+        result = run_bulk(func, range(8), concurrency=2, chunk_size=4)
+        self.assertEqual(result.results, [0, 1, True, 3, 4, 5, 6, 7])
+
+    def test_parameter_error(self):
+        self.assertRaises(ValueError, run_bulk, *[str, [], 0])
+        self.assertRaises(ValueError, run_bulk, *[str, [], 1, 0])
+
+    def test_get_many_repeated_ids(self):
+        rest = DocumentREST('http://192.168.56.102', 'music')
+        requested = []
+
+        def search(search_obj):
+            requested.append(search_obj.literal)
+            return {'results': [{'_metadata': {'id_doc': 1},
+                                 'gp_tracks': [{'txt_track_title': 'a'}]}]}
+
+        rest.search = search
+        docs = rest.get_many([1, 2, 1])
+        self.assertEqual(requested, ['id_doc in (1, 2)'])
+        self.assertIsNone(docs[1])
+        self.assertEqual(docs[0], docs[2])
+        docs[0]['gp_tracks'][0]['txt_track_title'] = 'b'
+        self.assertEqual(docs[2]['gp_tracks'][0]['txt_track_title'], 'a')
+
+
+if __name__ == '__main__':
+    unittest.main()
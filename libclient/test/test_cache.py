@@ -0,0 +1,130 @@
+import time
+import unittest
+import threading
+from http.server import HTTPServer
+from http.server import BaseHTTPRequestHandler
+
+from requests.exceptions import HTTPError
+
+from ..lbrest.cache import DocumentCache
+from ..lbrest.document import DocumentREST
+
+
+class TestDocumentCache(unittest.TestCase):
+
+    def setUp(self):
+        self.rest_url = 'http://192.168.56.102'
+        self.cache = DocumentCache(maxsize=2, ttl=60)
+
+    def key(self, id, path=None, identity=None):
+        return (self.rest_url, 'python_rest_test', id, path, identity)
+
+    def test_hit_and_miss(self):
+        self.assertIsNone(self.cache.get(self.key(1)))
+        self.cache.set(self.key(1), '{}')
+        self.assertEqual(self.cache.get(self.key(1)), '{}')
+        stats = self.cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+
+    def test_lru_eviction(self):
+        self.cache.set(self.key(1), '1')
+        self.cache.set(self.key(2), '2')
+        self.cache.get(self.key(1))
+        self.cache.set(self.key(3), '3')
+        self.assertIsNone(self.cache.get(self.key(2)))
+        self.assertEqual(self.cache.get(self.key(1)), '1')
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_ttl(self):
+        cache = DocumentCache(ttl=0.01)
+        cache.set(self.key(1), '1')
+        time.sleep(0.02)
+        self.assertIsNone(cache.get(self.key(1)))
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_invalidate(self):
+        self.cache.set(self.key(1), '1')
+        self.cache.set(self.key(1, ('txt_title',), 'abc'), '"a"')
+        self.cache.invalidate(self.rest_url, 'python_rest_test', 1)
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.stats()['invalidations'], 2)
+
+    def test_invalidate_base(self):
+        self.cache.set(self.key(1), '1')
+        self.cache.set(self.key(2), '2')
+        self.cache.invalidate(self.rest_url, 'python_rest_test')
+        self.assertEqual(len(self.cache), 0)
+
+    def test_stale_version(self):
+        version = self.cache.version
+        self.cache.invalidate(self.rest_url, 'python_rest_test', 1)
+        self.cache.set(self.key(1), '1', version)
+        self.assertIsNone(self.cache.get(self.key(1)))
+
+
+class DocumentHandler(BaseHTTPRequestHandler):
+    """
+    Serves a document holding the 'token' cookie it was requested with;
+    writes fail with 500 after being applied.
+    """
+    version = 0
+
+    def do_GET(self):
+        body = ('{"token": "%s", "version": %d}' % (
+            self.headers.get('Cookie'), type(self).version)).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PUT(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        type(self).version += 1
+        self.send_response(500)
+        self.send_header('Content-Length', '5')
+        self.end_headers()
+        self.wfile.write(b'error')
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDocumentRESTCache(unittest.TestCase):
+
+    def setUp(self):
+        DocumentHandler.version = 0
+        self.server = HTTPServer(('127.0.0.1', 0), DocumentHandler)
+        self.rest_url = 'http://127.0.0.1:%d' % self.server.server_address[1]
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.cache = DocumentCache()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_identities_isolated(self):
+        rest1 = DocumentREST(self.rest_url, 'music', cache=self.cache,
+                             cookies={'token': 'one'})
+        rest2 = DocumentREST(self.rest_url, 'music', cache=self.cache,
+                             cookies={'token': 'two'})
+        self.assertEqual(rest1.get(1)['token'], 'token=one')
+        self.assertEqual(rest2.get(1)['token'], 'token=two')
+        self.assertEqual(rest1.get(1)['token'], 'token=one')
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_failed_write_invalidates(self):
+        rest = DocumentREST(self.rest_url, 'music', cache=self.cache)
+        other = DocumentREST(self.rest_url, 'music', cache=self.cache,
+                             cookies={'token': 'other'})
+        self.assertEqual(rest.get(1)['version'], 0)
+        other.get(1)
+        self.assertRaises(HTTPError, rest.update, 1, {'txt_title': 'a'})
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(rest.get(1)['version'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import time
+import threading
+import unittest
+
+from requests.exceptions import ReadTimeout
+
+from ..lbrest.base import BaseREST
+from ..lbrest.document import DocumentREST
+from ..lbrest.core import DEFAULT_TIMEOUT
+from ..lbrest.bulk import run_bulk
+from ..lbrest.paging import prefetch
+from ..lbrest.policy import RetryPolicy
+from ..lbrest.deadline import Deadline
+from ..lbrest.deadline import DeadlineExceeded
+from ..lbrest.deadline import current_deadline
+from .helpers import FakeSession
+
+
+class TestTimeout(unittest.TestCase):
+
+    def setUp(self):
+        self.rest_url = 'http://192.168.56.102'
+        self.session = FakeSession()
+
+    def test_default_timeout(self):
+        rest = BaseREST(self.rest_url, session=self.session)
+        rest.send_request('GET', ['base'])
+        self.assertEqual(self.session.timeouts, [DEFAULT_TIMEOUT])
+
+    def test_client_and_call_timeout(self):
+        rest = BaseREST(self.rest_url, session=self.session, timeout=(1, 5))
+        rest.send_request('GET', ['base'])
+        rest.send_request('GET', ['base'], timeout=2)
+        rest.send_request('GET', ['base'], timeout=None)
+        self.assertEqual(self.session.timeouts, [(1, 5), 2, None])
+
+    def test_timeout_error(self):
+        for timeout in ('1', 0, (1, 2, 3)):
+            self.assertRaises((TypeError, ValueError), BaseREST,
+                              *[self.rest_url], **{'timeout': timeout})
+
+
+class TestDeadline(unittest.TestCase):
+
+    def setUp(self):
+        self.rest_url = 'http://192.168.56.102'
+        self.session = FakeSession()
+        self.rest = BaseREST(self.rest_url, session=self.session,
+                             timeout=(1, 30))
+
+    def test_limit(self):
+        deadline = Deadline(10)
+        connect, read = deadline.limit((1, 30))
+        self.assertEqual(connect, 1)
+        self.assertTrue(9 < read <= 10)
+        self.assertTrue(deadline.limit(None) <= 10)
+        self.assertRaises(DeadlineExceeded, Deadline(0).limit, 5)
+
+    def test_nested(self):
+        with Deadline(1) as outer:
+            with Deadline(60):
+                self.assertIs(current_deadline(), outer)
+        self.assertIsNone(current_deadline())
+
+    def test_request_timeout_capped(self):
+        with Deadline(5):
+            self.rest.send_request('GET', ['base'])
+        connect, read = self.session.timeouts[0]
+        self.assertEqual(connect, 1)
+        self.assertTrue(read <= 5)
+
+    def test_expired_request_not_sent(self):
+        with Deadline(0):
+            self.assertRaises(DeadlineExceeded, self.rest.send_request,
+                              'GET', ['base'])
+        self.assertEqual(self.session.timeouts, [])
+
+    def test_no_retry_past_deadline(self):
+        session = FakeSession([ReadTimeout('slow')])
+        rest = BaseREST(self.rest_url, session=session,
+                        retry=RetryPolicy(backoff_factor=10, jitter=False))
+        with Deadline(1):
+            self.assertRaises(DeadlineExceeded, rest.send_request,
+                              'GET', ['base'])
+        self.assertEqual(len(session.timeouts), 1)
+
+    def test_run_bulk(self):
+        threads = set()
+
+        def work(item):
+            threads.add(threading.current_thread())
+            self.assertIsNotNone(current_deadline())
+            time.sleep(0.05)
+            return item
+
+        with Deadline(0.02):
+            result = run_bulk(work, range(100), concurrency=1, chunk_size=10)
+
+        # the item in flight completes and no other item is started
+        self.assertTrue(result.expired)
+        self.assertEqual(result.results, [0])
+        self.assertNotIn(threading.current_thread(), threads)
+
+    def test_get_many_expired(self):
+        rest = DocumentREST('http://192.168.56.102', 'music')
+
+        def search(search_obj):
+            ids = search_obj.literal[len('id_doc in ('):-1].split(', ')
+            if '99' in ids:
+                # the last batch of the first chunk outlives the deadline
+                time.sleep(0.1)
+            return {'results': [{'_metadata': {'id_doc': int(id)}}
+                                for id in ids]}
+
+        rest.search = search
+        with Deadline(0.05):
+            self.assertRaises(DeadlineExceeded, rest.get_many, range(300),
+                              batch_size=1, concurrency=100)
+
+    def test_prefetch(self):
+        def pages():
+            while True:
+                current_deadline().check()
+                time.sleep(0.02)
+                yield [1]
+
+        with Deadline(0.1):
+            iterator = prefetch(pages())
+            self.assertRaises(DeadlineExceeded, list, iterator)
+
+    def test_iteration_started_later(self):
+        rest = DocumentREST('http://192.168.56.102', 'music')
+        seen = []
+
+        def search(search_obj):
+            seen.append(current_deadline())
+            return {'results': [{'_metadata': {'id_doc': 1}}],
+                    'result_count': 1}
+
+        rest.search = search
+        with Deadline(60) as deadline:
+            iterators = [rest.iter_search(), rest.scan()]
+        for iterator in iterators:
+            self.assertEqual(len(list(iterator)), 1)
+        self.assertEqual(seen, [deadline, deadline])
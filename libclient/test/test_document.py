@@ -60,6 +60,14 @@ class TestDocumentREST(unittest.TestCase):
                 doc.pop(key)
         self.assertEqual(doc, self.test_doc)
 
+    def test_2_get_many(self):
+        docs = self.rest.get_many([1, 999, 1], batch_size=2)
+        self.assertEqual(len(docs), 3)
+        self.assertIsNone(docs[1])
+        self.assertEqual(docs[0]['txt_title'], self.test_doc['txt_title'])
+        self.assertEqual(docs[0], docs[2])
+        self.assertIsNot(docs[0], docs[2])
+
     def test_2_get_path(self):
         path = self.rest.get_path(1, 'gp_tracks/2/txt_track_title')
         self.assertIsNotNone(path)
@@ -76,6 +84,28 @@ class TestDocumentREST(unittest.TestCase):
                     first.pop(key)
         self.assertEqual(first, self.test_doc)
 
+    def test_2_search_stream(self):
+        stream = self.rest.search(stream=True)
+        documents = list(stream)
+        self.assertEqual(len(documents), 1)
+        self.assertEqual(stream.result_count, 1)
+        self.assertEqual(documents[0]['txt_title'], self.test_doc['txt_title'])
+
+    def test_2_iter_search(self):
+        documents = list(self.rest.iter_search(page_size=1))
+        self.assertEqual(len(documents), 1)
+        first = documents[0]
+        for key in list(first.keys()):
+            if key.startswith('_'):
+                    first.pop(key)
+        self.assertEqual(first, self.test_doc)
+
+    def test_2_scan(self):
+        search = Search(literal='txt_title = \'Sehnsucht\'')
+        documents = list(self.rest.scan(search, page_size=1))
+        self.assertEqual(len(documents), 1)
+        self.assertEqual(documents[0]['txt_title'], self.test_doc['txt_title'])
+
     def test_3_update(self):
         doc = self.test_doc.copy()
         doc['gp_artists'][0]['txt_artist_name'] = 'Rammstein (updated)'
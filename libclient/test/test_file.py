@@ -1,4 +1,13 @@
+import os
+import shutil
+import tempfile
 import unittest
+import threading
+from http.server import HTTPServer
+from http.server import BaseHTTPRequestHandler
+
+from requests.exceptions import HTTPError
+from requests.exceptions import ChunkedEncodingError
 
 from ..lbrest.base import BaseREST
 from ..lbrest.document import DocumentREST
@@ -57,6 +66,19 @@ class TestFileREST(unittest.TestCase):
         cls.file_img_contents = file_contents
 
 
+    def test_1_upload_many(self):
+        paths = [self.filepath + 'file_for_testing.txt',
+                 self.filepath + 'not_a_file.txt',
+                 self.filepath + 'sehnsucht.png']
+        result = self.rest.upload_many(paths, concurrency=2)
+        self.assertEqual(len(result.results), 3)
+        self.assertIsInstance(result.results[0], int)
+        self.assertIsNone(result.results[1])
+        self.assertIsInstance(result.results[2], int)
+        self.assertEqual(list(result.errors.keys()), [1])
+        self.assertGreater(result.stats()['bytes'], 0)
+
+
     def test_2_associate_with_doc(self):
         response = self.doc_rest.update_path(1, 'img_cover', self.file_img)
         self.assertEqual(response, 'UPDATED')
@@ -90,6 +112,21 @@ class TestFileREST(unittest.TestCase):
         file.close()
 
 
+    def test_3_iter_content(self):
+        progress = []
+        chunks = list(self.rest.iter_content(self.file_img['id_file'],
+            chunk_size=1024, progress=lambda done, total: progress.append(done)))
+        self.assertEqual(b''.join(chunks), self.file_img_contents)
+        self.assertEqual(progress[-1], len(self.file_img_contents))
+
+    def test_3_download_to(self):
+        path = self.filepath + 'downloaded_img_file.png'
+        written = self.rest.download_to(self.file_img['id_file'], path)
+        self.assertEqual(written, len(self.file_img_contents))
+        with open(path, 'rb') as file:
+            self.assertEqual(file.read(), self.file_img_contents)
+
+
     @classmethod
     def _create_base(cls):
         # model = {
@@ -176,5 +213,74 @@ class TestFileREST(unittest.TestCase):
         cls.base_rest.delete(cls.basename)
 
 
+
+class DownloadHandler(BaseHTTPRequestHandler):
+    """
+    Serves the binary of file 1, half of the binary of file 2 (the
+    connection drops) and 404 for any other file.
+    """
+    content = bytes(range(256)) * 64
+
+    def do_GET(self):
+        if self.path == '/python_rest_test/file/1/download':
+            status, body = 200, self.content
+        elif self.path == '/python_rest_test/file/2/download':
+            status, body = 200, self.content[:len(self.content) // 2]
+        else:
+            status, body = 404, b'file not found'
+        self.send_response(status)
+        length = len(self.content) if status == 200 else len(body)
+        self.send_header('Content-Length', str(length))
+        self.end_headers()
+        self.wfile.write(body)
+        self.close_connection = True
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDownloadTo(unittest.TestCase):
+
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), DownloadHandler)
+        rest_url = 'http://127.0.0.1:%d' % self.server.server_address[1]
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.rest = FileREST(rest_url, 'python_rest_test')
+        self.dir = tempfile.mkdtemp()
+        self.dest = os.path.join(self.dir, 'file.bin')
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.dir)
+
+    def read_dest(self):
+        with open(self.dest, 'rb') as file:
+            return file.read()
+
+    def test_download(self):
+        with open(self.dest, 'wb') as file:
+            file.write(b'old')
+        written = self.rest.download_to(1, self.dest)
+        self.assertEqual(written, len(DownloadHandler.content))
+        self.assertEqual(self.read_dest(), DownloadHandler.content)
+        self.assertEqual(os.listdir(self.dir), ['file.bin'])
+
+    def test_error_keeps_dest(self):
+        with open(self.dest, 'wb') as file:
+            file.write(b'old')
+        self.assertRaises(HTTPError, self.rest.download_to, 3, self.dest)
+        self.assertRaises(ChunkedEncodingError, self.rest.download_to,
+                          2, self.dest)
+        self.assertEqual(self.read_dest(), b'old')
+        self.assertEqual(os.listdir(self.dir), ['file.bin'])
+
+    def test_error_creates_nothing(self):
+        self.assertRaises(HTTPError, self.rest.download_to, 3, self.dest)
+        self.assertEqual(os.listdir(self.dir), [])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,55 @@
+import os
+import sys
+import subprocess
+import unittest
+
+import libclient
+import libclient.lbrest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+def loaded_modules(statement, modules):
+    """ Returns which of 'modules' a fresh interpreter loads for 'statement'.
+    """
+    code = '%s\nimport sys\nprint(",".join(m for m in %r if m in sys.modules))'
+    output = subprocess.check_output(
+        [sys.executable, '-c', code % (statement, modules)], cwd=ROOT)
+    return [m for m in output.decode().strip().split(',') if m]
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_package_import_is_lazy(self):
+        self.assertEqual(loaded_modules(
+            'import libclient, libclient.lbrest\n'
+            'from libclient import Search, Base',
+            ('requests', 'urllib3', 'libclient.lbrest.core')), [])
+
+    def test_client_import(self):
+        self.assertEqual(loaded_modules(
+            'from libclient.lbrest import DocumentREST', ('requests',)),
+            ['requests'])
+
+    def test_optional_features_are_lazy(self):
+        self.assertEqual(loaded_modules(
+            'from libclient.lbrest import BaseREST, DocumentREST, FileREST',
+            ('libclient.lbrest.policy', 'libclient.lbrest.singleflight',
+             'libclient.lbrest.schema', 'libclient.lbrest.metrics',
+             'concurrent.futures')), [])
+
+    def test_public_names(self):
+        from ..lbrest.base import BaseREST
+        from ..lbrest.document import DocumentREST
+        from ..lbrest.file import FileREST
+        from ..lbsearch.search import Search
+        from ..lbtypes.base import Base
+        self.assertIs(libclient.BaseREST, BaseREST)
+        self.assertIs(libclient.DocumentREST, DocumentREST)
+        self.assertIs(libclient.FileREST, FileREST)
+        self.assertIs(libclient.Search, Search)
+        self.assertIs(libclient.Base, Base)
+        self.assertIs(libclient.lbrest.DocumentREST, DocumentREST)
+        self.assertIn('FileREST', dir(libclient.lbrest))
+        self.assertRaises(AttributeError, getattr, libclient, 'Nothing')
@@ -0,0 +1,283 @@
+import json
+import pickle
+import unittest
+
+from ..lbtypes.base import *
+from ..lbtypes.file import File
+from ..lbsearch.search import LBFile
+from .helpers import make_base
+
+
+class TestSlots(unittest.TestCase):
+
+    def test_no_instance_dict(self):
+        base = make_base()
+        for obj in (base, base.metadata, base.content[0], base.content[1],
+                    base.content[1].metadata, File(filename='a.txt'),
+                    LBFile(id_file='f')):
+            self.assertFalse(hasattr(obj, '__dict__'), type(obj).__name__)
+
+    def test_get_dict_key_order(self):
+        field = Field('txt_title', 'Text')
+        self.assertEqual(list(field.get_dict()['field']), [
+            'name', 'datatype', 'alias', 'description', 'required',
+            'multivalued', 'indices'])
+        self.assertEqual(list(make_base().get_dict()), ['metadata', 'content'])
+
+    def test_get_json(self):
+        base = make_base()
+        self.assertEqual(json.loads(base.get_json()), base.get_dict())
+        group = base.get_dict()['content'][1]['group']
+        self.assertEqual(group['metadata']['name'], 'gp_tracks')
+        self.assertEqual(group['content'][1]['field']['indices'], ['Textual'])
+
+    def test_file_get_dict(self):
+        file = File(id_file='f', filename='a.txt', content=b'abc', source='a.txt')
+        d = file.get_dict()
+        self.assertNotIn('source', d)
+        self.assertEqual(list(d)[-1], 'content')
+        self.assertEqual(d['content'], b'abc')
+
+    def test_unknown_attribute(self):
+        self.assertRaises(AttributeError, getattr, Field('a', 'Text'), 'nope')
+        self.assertRaises(AttributeError, setattr, Field('a', 'Text'), 'nope', 1)
+
+    def test_pickle(self):
+        base = Base.from_dict(make_base().get_dict())
+        self.assertEqual(pickle.loads(pickle.dumps(base)).get_json(),
+                         base.get_json())
+
+
+class TestFromDict(unittest.TestCase):
+
+    def test_round_trip(self):
+        d = make_base().get_dict()
+        base = Base.from_dict(d)
+        self.assertEqual(base.get_dict(), d)
+        self.assertIsInstance(base.content[0], Field)
+        self.assertIsInstance(base.content[1], Group)
+
+    def test_nested_group(self):
+        outer = Group(name='gp_outer')
+        inner = Group(name='gp_inner')
+        inner.add_field(Field('txt_name', 'Text'))
+        outer.add_field(inner)
+        base = Base(name='nested')
+        base.add_field(outer)
+        d = base.get_dict()
+        self.assertEqual(Base.from_dict(d).get_dict(), d)
+
+    def test_extra_keys(self):
+        d = make_base().get_dict()
+        d['metadata']['id_base'] = 7
+        d['content'][0]['field']['extra'] = 'x'
+        base = Base.from_dict(d)
+        self.assertEqual(base.metadata.id_base, 7)
+        self.assertEqual(base.content[0].extra, 'x')
+        self.assertEqual(base.get_dict(), d)
+        self.assertEqual(list(base.get_dict()['metadata'])[-1], 'id_base')
+
+    def test_top_level_extra_keys(self):
+        expected = make_base().get_dict()
+        expected['content'][1]['group']['extra'] = 'x'
+        d = json.loads(json.dumps(expected))
+        d['id_base'] = 7
+        d['dt_base'] = '01/01/2020'
+        # as before __slots__: keys of the base besides 'metadata' and
+        # 'content' are dropped, those of its groups are kept
+        base = Base.from_dict(d)
+        self.assertEqual(base.get_dict(), expected)
+        self.assertEqual(json.loads(base.get_json()), expected)
+        self.assertRaises(AttributeError, getattr, base, 'id_base')
+
+
+class TestPathIndex(unittest.TestCase):
+
+    def setUp(self):
+        outer = Group(name='gp_tracks', multivalued=True)
+        outer.add_field(Field('int_track_number', 'Integer'))
+        inner = Group(name='gp_credits')
+        inner.add_field(Field('txt_name', 'Text', multivalued=True))
+        outer.add_field(inner)
+        base = Base(name='music')
+        base.add_field(Field('txt_title', 'Text'))
+        base.add_field(outer)
+        self.base = Base.from_dict(base.get_dict())
+
+    def test_paths(self):
+        self.assertEqual(list(self.base.index), [
+            'txt_title', 'gp_tracks', 'gp_tracks/int_track_number',
+            'gp_tracks/gp_credits', 'gp_tracks/gp_credits/txt_name'])
+
+    def test_metadata(self):
+        number = self.base.get_path('gp_tracks/int_track_number')
+        self.assertEqual(number.datatype, 'Integer')
+        self.assertEqual(number.indices, ('Textual', 'Ordenado'))
+        self.assertEqual(number.multivalued_ancestors, ('gp_tracks',))
+        self.assertTrue(number.in_multivalued)
+        self.assertFalse(number.is_group)
+
+        group = self.base.get_path('gp_tracks')
+        self.assertTrue(group.is_group)
+        self.assertTrue(group.multivalued)
+        self.assertFalse(group.in_multivalued)
+        self.assertIs(group.structure, self.base.content[1])
+
+        name = self.base.get_path('gp_tracks/gp_credits/txt_name')
+        self.assertTrue(name.multivalued)
+        self.assertEqual(name.multivalued_ancestors, ('gp_tracks',))
+        self.assertFalse(self.base.get_path('txt_title').in_multivalued)
+
+    def test_document_paths(self):
+        self.assertEqual(self.base.get_path('gp_tracks/0/gp_credits/txt_name').path,
+                         'gp_tracks/gp_credits/txt_name')
+        self.assertEqual(self.base.get_path('gp_tracks/*/int_track_number').path,
+                         'gp_tracks/int_track_number')
+        self.assertIsNone(self.base.get_path('gp_tracks/nope'))
+
+    def test_invalidated_by_add_field(self):
+        index = self.base.index
+        self.assertIs(self.base.index, index)
+        self.base.add_field(Field('int_year', 'Integer'))
+        self.assertEqual(self.base.get_path('int_year').datatype, 'Integer')
+
+        credits = self.base.get_path('gp_tracks/gp_credits').structure
+        credits.add_field(Field('txt_role', 'Text'))
+        self.assertIsNotNone(self.base.get_path('gp_tracks/gp_credits/txt_role'))
+
+    def test_not_serialized(self):
+        self.base.index
+        self.assertEqual(list(self.base.get_dict()), ['metadata', 'content'])
+        self.assertNotIn('_parent', self.base.content[1].get_dict()['group'])
+
+
+class TestSerialization(unittest.TestCase):
+
+    def setUp(self):
+        self.base = make_base()
+        self.group = self.base.content[1]
+
+    def assertSerialized(self):
+        self.assertEqual(self.base.get_json(),
+                         json.dumps(self.base.get_dict()))
+
+    def test_get_dict_belongs_to_caller(self):
+        d = self.base.get_dict()
+        d['content'][1]['group']['content'].pop()
+        d['content'][0]['field']['indices'].append('Unico')
+        d['metadata']['name'] = 'changed'
+        self.assertEqual(self.base.get_dict(), make_base().get_dict())
+
+    def test_attribute_change(self):
+        self.base.get_json()
+        self.group.content[0].alias = 'Number'
+        self.assertIn('"Number"', self.base.get_json())
+        self.base.metadata.description = 'changed'
+        self.assertEqual(self.base.get_dict()['metadata']['description'],
+                         'changed')
+        self.assertSerialized()
+
+    def test_cached(self):
+        json_text = self.base.get_json()
+        self.assertIs(self.base.get_json(), json_text)
+        self.assertIs(self.group.get_json(), self.group._json)
+
+    def test_attribute_change_marks_holders_dirty(self):
+        self.base.get_json()
+        field = self.group.content[1]
+        field.alias = 'Audio'
+        self.assertFalse(self.base._json)
+        self.assertIn('"Audio"', self.base.get_json())
+        # encoded again from its parts, which are cached from now on
+        self.assertTrue(self.group._json)
+        self.assertTrue(self.base.content[0]._json)
+
+        field.alias = 'Sound'
+        self.assertFalse(field._json)
+        self.assertFalse(self.group._json)
+        self.assertFalse(self.base._json)
+        # the rest of the base keeps its cached JSON
+        self.assertTrue(self.base.content[0]._json)
+        self.assertIn('"Sound"', self.base.get_json())
+        self.assertTrue(self.group.content[0]._json)
+        self.assertSerialized()
+
+    def test_replaced_attribute(self):
+        self.base.get_json()
+        self.base.metadata = BaseMetadata('records')
+        self.assertIn('"records"', self.base.get_json())
+        self.base.get_json()
+        self.base.metadata.description = 'Records base'
+        self.assertIn('"Records base"', self.base.get_json())
+        self.assertSerialized()
+
+    def test_add_field(self):
+        self.base.get_json()
+        self.group.add_field(Field('txt_extra', 'Text'))
+        self.assertIn('"txt_extra"', self.base.get_json())
+        self.assertSerialized()
+
+    def test_in_place_changes(self):
+        self.base.get_json()
+        self.group.content[0].indices.append('Unico')
+        self.group.content[0].mark_dirty()
+        self.assertIn('"Unico"', self.base.get_json())
+        self.base.content.pop(0)
+        self.base.mark_dirty()
+        self.assertNotIn('"txt_title"', self.base.get_json())
+        self.assertSerialized()
+
+    def test_shared_structure(self):
+        field = self.group.content[0]
+        other = Group(name='gp_other')
+        other.content.append(field)
+        self.base.add_field(other)
+        self.base.get_json()
+        # the field marks its own group dirty, never 'other'
+        field.alias = 'Shared'
+        group = json.loads(self.base.get_json())['content'][-1]['group']
+        self.assertEqual(group['content'][0]['field']['alias'], 'Shared')
+
+    def test_nested_lbtypes(self):
+        field = Field('txt_nested', 'Text')
+        base = Base.from_dict(make_base().get_dict())
+        base.metadata._set('holder', {'field': field, 'list': [[field]]})
+        base.get_json()
+        field.alias = 'Nested'
+        holder = json.loads(base.get_json())['metadata']['holder']
+        self.assertEqual(holder['field']['field']['alias'], 'Nested')
+        self.assertEqual(holder['list'][0][0]['field']['alias'], 'Nested')
+
+    def test_extra_keys(self):
+        base = Base.from_dict(make_base().get_dict())
+        base.get_json()
+        base.metadata._set('id_base', 1)
+        self.assertIn('"id_base": 1', base.get_json())
+
+    def test_value_type_change(self):
+        field = self.group.content[0]
+        field.required = 0
+        self.assertIn('"required": 0', self.base.get_json())
+        field.required = False
+        self.assertIn('"required": false', self.base.get_json())
+        self.assertSerialized()
+
+    def test_non_string_keys(self):
+        base = Base.from_dict(make_base().get_dict())
+        base.metadata._set('counts', {1: 'a', 2.5: 'b', False: 'c', None: 'd'})
+        self.assertEqual(json.loads(base.get_json())['metadata']['counts'],
+                         {'1': 'a', '2.5': 'b', 'false': 'c', 'null': 'd'})
+        self.assertEqual(base.get_json(), json.dumps(base.get_dict()))
+
+    def test_overridden_get_dict(self):
+        class UpperField(Field):
+            def get_dict(self):
+                return {'field': {'name': self.name.upper()}}
+
+        self.base.add_field(UpperField('txt_lower', 'Text'))
+        self.assertIn('"TXT_LOWER"', self.base.get_json())
+        self.assertSerialized()
+
+
+if __name__ == '__main__':
+    unittest.main()
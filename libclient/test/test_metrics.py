@@ -0,0 +1,152 @@
+import socket
+import unittest
+
+import requests
+
+from ..lbrest.document import DocumentREST
+from ..lbrest.session import pop_connect_time
+from ..lbrest.session import _TimedHTTPConnection
+from ..lbrest.metrics import Histogram
+from ..lbrest.metrics import MetricsCollector
+from ..lbrest.metrics import RequestInfo
+from .helpers import FakeSession
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_dump(self):
+        histogram = Histogram()
+        for value in range(1, 101):
+            histogram.add(value)
+        dump = histogram.dump()
+        self.assertEqual(dump['count'], 100)
+        self.assertEqual(dump['mean'], 50.5)
+        self.assertEqual(dump['max'], 100)
+        self.assertEqual(dump['p50'], 51)
+        self.assertEqual(dump['p95'], 95)
+        self.assertEqual(dump['p99'], 99)
+
+    def test_window(self):
+        histogram = Histogram(maxlen=10)
+        for value in range(100):
+            histogram.add(value)
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.percentile(0), 90)
+
+    def test_empty(self):
+        self.assertIsNone(Histogram().dump()['p99'])
+
+
+class TestHooks(unittest.TestCase):
+
+    def setUp(self):
+        self.rest_url = 'http://192.168.56.102'
+        self.session = FakeSession(body=b'{"a": 1}')
+
+    def test_hooks(self):
+        pre, post = [], []
+        rest = DocumentREST(self.rest_url, 'python_rest_test',
+                            session=self.session,
+                            hooks={'pre_request': pre.append,
+                                   'post_request': [post.append]})
+        self.assertEqual(rest.get(1), {'a': 1})
+
+        self.assertEqual(len(pre), 1)
+        self.assertIs(pre[0], post[0])
+        info = post[0]
+        self.assertEqual(info.method, 'GET')
+        self.assertEqual(info.operation, 'DocumentREST.get')
+        self.assertEqual(info.basename, 'python_rest_test')
+        self.assertEqual(info.status, 200)
+        self.assertEqual(info.attempts, 1)
+        self.assertEqual(info.request_bytes, 0)
+        self.assertEqual(info.response_bytes, 8)
+        for name in ('connect', 'wait', 'download', 'decode', 'total'):
+            self.assertTrue(info.timings[name] >= 0, name)
+
+    def test_error(self):
+        post = []
+        rest = DocumentREST(self.rest_url, 'python_rest_test',
+                            session=FakeSession(status=404, body=b'not found'))
+        rest.register_hook('post_request', post.append)
+        self.assertRaises(requests.HTTPError, rest.get, 1)
+        self.assertEqual(post[0].status, 404)
+        self.assertIsInstance(post[0].error, requests.HTTPError)
+        self.assertIsNone(post[0].timings['decode'])
+
+    def test_register_error(self):
+        rest = DocumentREST(self.rest_url, 'python_rest_test',
+                            session=self.session)
+        self.assertRaises(ValueError, rest.register_hook, 'response', len)
+        self.assertRaises(TypeError, rest.register_hook, 'pre_request', 1)
+
+    def test_explicit_operation(self):
+        post = []
+        rest = DocumentREST(self.rest_url, 'python_rest_test',
+                            session=self.session,
+                            hooks={'post_request': post.append})
+        rest.send_request('GET', ['x'], operation='custom')
+        self.assertEqual(post[0].operation, 'custom')
+        rest.send_request('GET', ['x'])
+        self.assertEqual(post[1].operation, 'DocumentREST.send_request')
+
+    def test_operations(self):
+        post = []
+        rest = DocumentREST(self.rest_url, 'python_rest_test',
+                            session=FakeSession(body=b'{"results": []}'),
+                            hooks={'post_request': post.append})
+        rest.get_path(1, 'a/b')
+        rest.search()
+        list(rest.search(stream=True))
+        rest.get_many([1, 2])
+        rest.delete(1)
+        self.assertEqual([info.operation for info in post], [
+            'DocumentREST.get_path', 'DocumentREST.search',
+            'DocumentREST.search', 'DocumentREST.search',
+            'DocumentREST.delete'])
+
+    def test_collector(self):
+        metrics = MetricsCollector()
+        rest = DocumentREST(self.rest_url, 'python_rest_test',
+                            session=self.session,
+                            hooks={'post_request': metrics})
+        for id in range(1, 6):
+            rest.get(id)
+        rest.update(1, {'a': 1})
+
+        dump = metrics.dump()
+        self.assertEqual(set(dump), set(['DocumentREST.get',
+                                         'DocumentREST.update']))
+        get = dump['DocumentREST.get']
+        self.assertEqual(get['count'], 5)
+        self.assertEqual(get['errors'], 0)
+        self.assertEqual(get['status'], {200: 5})
+        self.assertEqual(get['timings']['total']['count'], 5)
+        self.assertEqual(get['response_bytes']['p50'], 8)
+        self.assertTrue(dump['DocumentREST.update']['request_bytes']['max']
+                        > 0)
+
+        metrics.reset()
+        self.assertEqual(metrics.dump(), {})
+
+    def test_request_info(self):
+        info = RequestInfo('GET', 'DocumentREST.get', 'base', 'http://x')
+        self.assertEqual(info.as_dict()['timings']['total'], None)
+
+
+class TestConnectTime(unittest.TestCase):
+
+    def test_connect_time(self):
+        server = socket.socket()
+        server.bind(('127.0.0.1', 0))
+        server.listen(1)
+        try:
+            pop_connect_time()
+            connection = _TimedHTTPConnection('127.0.0.1',
+                                              server.getsockname()[1])
+            connection.connect()
+            connection.close()
+            self.assertTrue(pop_connect_time() > 0)
+            self.assertEqual(pop_connect_time(), 0)
+        finally:
+            server.close()
@@ -0,0 +1,58 @@
+import io
+import unittest
+
+from requests.models import PreparedRequest
+
+from ..lbrest.multipart import MultipartStream
+from ..lbtypes.file import File
+
+
+class TestMultipartStream(unittest.TestCase):
+
+    def setUp(self):
+        self.filepath = 'libclient/test/files/file_for_testing.txt'
+        with open(self.filepath, 'rb') as f:
+            self.contents = f.read()
+
+    def test_body(self):
+        body = MultipartStream('file', 'a.txt', io.BytesIO(b'abc'), size=3)
+        data = b''.join(iter(lambda: body.read(2), b''))
+        self.assertEqual(data,
+            b'--' + body.boundary.encode() + b'\r\n' +
+            b'Content-Disposition: form-data; name="file"; filename="a.txt"' +
+            b'\r\n\r\nabc\r\n--' + body.boundary.encode() + b'--\r\n')
+        self.assertEqual(body.len, len(data))
+        self.assertEqual(body.bytes_read, len(data))
+
+    def test_content_length(self):
+        file = File.open(self.filepath)
+        with file.open_source() as fileobj:
+            body = MultipartStream('file', file.filename, fileobj,
+                                   size=file.filesize)
+            request = PreparedRequest()
+            request.prepare(method='POST', url='http://192.168.56.102/',
+                            data=body)
+            self.assertIs(request.body, body)
+            self.assertEqual(request.headers['Content-Length'], str(body.len))
+
+    def test_lazy_file(self):
+        file = File.open(self.filepath)
+        self.assertFalse(file.in_memory)
+        self.assertEqual(file.filesize, len(self.contents))
+        self.assertEqual(file.content, self.contents)
+        self.assertIsNone(file.get_dict()['content'])
+
+    def test_lazy_file_object(self):
+        fileobj = io.BytesIO(b'head:abc')
+        fileobj.seek(5)
+        file = File.open(fileobj)
+        self.assertEqual(file.filesize, 3)
+        self.assertEqual(file.content, b'abc')
+        self.assertEqual(file.content, b'abc')
+        with file.open_source() as source:
+            self.assertEqual(source.read(), b'abc')
+        self.assertFalse(fileobj.closed)
+
+
+if __name__ == '__main__':
+    unittest.main()
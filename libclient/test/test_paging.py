@@ -0,0 +1,102 @@
+import threading
+import unittest
+
+from ..lbrest.paging import prefetch
+from ..lbrest.document import DocumentREST
+from ..lbsearch.search import Search
+
+
+class TestPrefetch(unittest.TestCase):
+
+    def test_order(self):
+        pages = ([i, i + 1] for i in range(0, 20, 2))
+        self.assertEqual([p for page in prefetch(pages) for p in page],
+                         list(range(20)))
+
+    def test_bounded(self):
+        fetched = []
+        consumed = threading.Event()
+
+        def pages():
+            for i in range(10):
+                fetched.append(i)
+                yield [i]
+
+        iterator = prefetch(pages(), max_pages=2)
+        next(iterator)
+        consumed.wait(0.3)
+        # one page consumed, at most two waiting and one being fetched
+        self.assertLessEqual(len(fetched), 4)
+        iterator.close()
+
+    def test_error(self):
+        def pages():
+            yield [1]
+            raise ValueError('page failed')
+
+        iterator = prefetch(pages())
+        self.assertEqual(next(iterator), [1])
+        self.assertRaises(ValueError, next, iterator)
+
+    def test_max_pages_error(self):
+        # raised by the call, not by the first iteration
+        self.assertRaises(ValueError, prefetch, iter([]), max_pages=0)
+        rest = DocumentREST('http://192.168.56.102', 'music')
+        self.assertRaises(ValueError, rest.iter_search, max_pages=0)
+        self.assertRaises(ValueError, rest.scan, max_pages=0)
+
+
+
+class TestScan(unittest.TestCase):
+
+    def setUp(self):
+        self.rest = DocumentREST('http://192.168.56.102', 'music')
+        self.requests = []
+        documents = [{'id_doc': id, 'txt_title': 't%d' % id}
+                     for id in range(1, 8)]
+
+        def search(search_obj):
+            # the server: documents after the last seen id, in id order
+            self.requests.append((search_obj.literal,
+                                  list(search_obj.select),
+                                  search_obj.order_by.asc,
+                                  search_obj.limit))
+            last_id = 0
+            if ' > ' in search_obj.literal:
+                last_id = int(search_obj.literal.split(' > ')[-1])
+            results = [dict((key, value) for key, value in document.items()
+                            if key in search_obj.select)
+                       for document in documents
+                       if document['id_doc'] > last_id]
+            return {'results': results[:search_obj.limit]}
+
+        self.rest.search = search
+
+    def test_pages(self):
+        search_obj = Search(select=['txt_title'],
+                            literal="txt_title != 'x'")
+        documents = list(self.rest.scan(search_obj, page_size=3))
+
+        # id_doc is added to select for the keyset and stripped from results
+        self.assertEqual(documents, [{'txt_title': 't%d' % id}
+                                     for id in range(1, 8)])
+        # the short third page ends the scan without a fourth request
+        self.assertEqual(self.requests, [
+            ("(txt_title != 'x')", ['txt_title', 'id_doc'], ['id_doc'], 3),
+            ("(txt_title != 'x') and id_doc > 3",
+             ['txt_title', 'id_doc'], ['id_doc'], 3),
+            ("(txt_title != 'x') and id_doc > 6",
+             ['txt_title', 'id_doc'], ['id_doc'], 3)])
+
+    def test_selected_id(self):
+        documents = list(self.rest.scan(Search(select=['id_doc']),
+                                        page_size=7))
+        # id_doc was selected, so it is kept; a full last page needs one
+        # more request to find out it was the last
+        self.assertEqual(documents, [{'id_doc': id} for id in range(1, 8)])
+        self.assertEqual([literal for literal, _, _, _ in self.requests],
+                         ['', 'id_doc > 7'])
+
+
+if __name__ == '__main__':
+    unittest.main()
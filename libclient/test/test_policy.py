@@ -0,0 +1,156 @@
+import os
+import signal
+import unittest
+
+import requests
+from requests.exceptions import ConnectionError
+from requests.exceptions import ChunkedEncodingError
+
+from ..lbrest.base import BaseREST
+from ..lbrest.policy import RetryPolicy
+from ..lbrest.policy import CircuitBreaker
+from ..lbrest.policy import CircuitOpenError
+from ..lbrest.policy import get_circuit_breaker
+from .helpers import FakeSession
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.rest_url = 'http://192.168.56.102'
+        self.retry = RetryPolicy(max_retries=2, backoff_factor=0)
+
+    def test_backoff(self):
+        retry = RetryPolicy(backoff_factor=1, max_backoff=5, jitter=False)
+        self.assertEqual([retry.backoff(n) for n in range(4)], [1, 2, 4, 5])
+        retry.jitter = True
+        for n in range(4):
+            self.assertTrue(0 <= retry.backoff(n) <= 5)
+        self.assertEqual(retry.backoff(0, retry_after=3), 3)
+        self.assertEqual(retry.backoff(0, retry_after=60), 5)
+
+    def test_retry_idempotent(self):
+        session = FakeSession([503, ConnectionError('reset'), 200])
+        rest = BaseREST(self.rest_url, session=session, retry=self.retry)
+        self.assertEqual(rest.send_request('GET', ['base']), '{}')
+        self.assertEqual(session.calls, 3)
+        self.assertEqual(rest.stats()['retry'],
+                         {'retries': 2, 'exhausted': 0})
+
+    def test_no_retry_post(self):
+        session = FakeSession([503, 200])
+        rest = BaseREST(self.rest_url, session=session, retry=self.retry)
+        self.assertRaises(requests.HTTPError, rest.send_request,
+                          'POST', ['base'])
+        self.assertEqual(session.calls, 1)
+
+    def test_retry_exhausted(self):
+        session = FakeSession([ConnectionError('reset')] * 3)
+        rest = BaseREST(self.rest_url, session=session, retry=self.retry)
+        self.assertRaises(ConnectionError, rest.send_request, 'GET', ['base'])
+        self.assertEqual(session.calls, 3)
+        self.assertEqual(rest.retry.exhausted, 1)
+
+    def test_retry_error(self):
+        self.assertRaises(TypeError, BaseREST, *[self.rest_url],
+                          **{'retry': 3})
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.rest_url = 'http://192.168.56.102'
+
+    def test_open_and_recover(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0)
+        session = FakeSession([500, 500, 200])
+        rest = BaseREST(self.rest_url, session=session,
+                        circuit_breaker=breaker)
+        for _ in range(2):
+            self.assertRaises(requests.HTTPError, rest.send_request,
+                              'GET', ['base'])
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        # recovery_timeout elapsed: the trial request closes the breaker
+        rest.send_request('GET', ['base'])
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        stats = rest.stats()['circuit_breaker']
+        self.assertEqual(stats['opened'], 1)
+        self.assertEqual(stats['half_opened'], 1)
+        self.assertEqual(stats['closed'], 1)
+
+    def test_fail_fast(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+        session = FakeSession([ConnectionError('refused')])
+        rest = BaseREST(self.rest_url, session=session,
+                        circuit_breaker=breaker)
+        self.assertRaises(ConnectionError, rest.send_request, 'GET', ['base'])
+        self.assertRaises(CircuitOpenError, rest.send_request,
+                          'GET', ['base'])
+        self.assertEqual(session.calls, 1)
+        self.assertEqual(breaker.counters['rejected'], 1)
+
+    def test_half_open_failure(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+        breaker.before_request()
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertRaises(CircuitOpenError, breaker.before_request)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_half_open_other_error(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        session = FakeSession([500, ChunkedEncodingError('truncated'),
+                                   KeyboardInterrupt(), 200])
+        rest = BaseREST(self.rest_url, session=session,
+                        circuit_breaker=breaker)
+        self.assertRaises(requests.HTTPError, rest.send_request,
+                          'GET', ['base'])
+        self.assertRaises(ChunkedEncodingError, rest.send_request,
+                          'GET', ['base'])
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertRaises(KeyboardInterrupt, rest.send_request,
+                          'GET', ['base'])
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+
+        # neither error left the trial pending
+        rest.send_request('GET', ['base'])
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(session.calls, 4)
+
+    def test_client_errors_are_successes(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        rest = BaseREST(self.rest_url, session=FakeSession([404]),
+                        circuit_breaker=breaker)
+        self.assertRaises(requests.HTTPError, rest.send_request,
+                          'GET', ['base'])
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_shared_breaker(self):
+        rest1 = BaseREST(self.rest_url, circuit_breaker=True)
+        rest2 = BaseREST(self.rest_url, circuit_breaker=True)
+        self.assertIs(rest1.circuit_breaker, rest2.circuit_breaker)
+        self.assertIs(rest1.circuit_breaker,
+                      get_circuit_breaker(self.rest_url))
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'requires os.fork')
+    def test_fork(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+        breaker.before_request()
+        with breaker._lock:
+            # the parent's pending trial and held lock must not reach the
+            # child
+            pid = os.fork()
+            if pid == 0:
+                signal.alarm(5)
+                try:
+                    breaker.before_request()
+                    ok = breaker.state == CircuitBreaker.HALF_OPEN
+                except CircuitOpenError:
+                    ok = False
+                os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(status, 0)
+        self.assertRaises(CircuitOpenError, breaker.before_request)
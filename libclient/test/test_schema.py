@@ -0,0 +1,170 @@
+import time
+import unittest
+import threading
+from http.server import HTTPServer
+from http.server import BaseHTTPRequestHandler
+
+from ..lbrest.base import BaseREST
+from ..lbrest.document import DocumentREST
+from ..lbrest.schema import SchemaCache
+from ..lbrest.schema import get_schema_cache
+from ..lbtypes.base import Base
+from ..lbtypes.base import Field
+
+
+class SchemaHandler(BaseHTTPRequestHandler):
+    """ Serves one base schema with an ETag, counting GETs and 304s.
+    """
+    version = 1
+    gets = 0
+    not_modified = 0
+
+    def do_GET(self):
+        cls = type(self)
+        cls.gets += 1
+        etag = '"v%d"' % cls.version
+        if self.headers.get('If-None-Match') == etag:
+            cls.not_modified += 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        base = Base(name='music')
+        base.add_field(Field('txt_title', 'Text'))
+        for n in range(1, cls.version):
+            base.add_field(Field('txt_extra%d' % n, 'Text'))
+        body = base.get_json().encode('utf-8')
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PUT(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        type(self).version += 1
+        self.send_response(200)
+        self.send_header('Content-Length', '7')
+        self.end_headers()
+        self.wfile.write(b'UPDATED')
+
+    def do_DELETE(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '7')
+        self.end_headers()
+        self.wfile.write(b'DELETED')
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSchemaCache(unittest.TestCase):
+
+    def setUp(self):
+        SchemaHandler.version = 1
+        SchemaHandler.gets = 0
+        SchemaHandler.not_modified = 0
+        self.server = HTTPServer(('127.0.0.1', 0), SchemaHandler)
+        self.rest_url = 'http://127.0.0.1:%d' % self.server.server_address[1]
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.cache = SchemaCache(ttl=60)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_hit(self):
+        rest = BaseREST(self.rest_url, schema_cache=self.cache)
+        base = rest.get('music')
+        self.assertIs(rest.get('music'), base)
+        self.assertEqual(SchemaHandler.gets, 1)
+        self.assertEqual(rest.get('music', as_dict=True), base.get_dict())
+        self.assertEqual(rest.stats()['schema_cache']['hits'], 2)
+
+    def test_revalidation(self):
+        self.cache.ttl = 0
+        rest = BaseREST(self.rest_url, schema_cache=self.cache)
+        base = rest.get('music')
+        self.assertIs(rest.get('music'), base)
+        self.assertEqual(SchemaHandler.gets, 2)
+        self.assertEqual(SchemaHandler.not_modified, 1)
+        self.assertEqual(self.cache.revalidations, 1)
+
+        SchemaHandler.version = 2
+        changed = rest.get('music')
+        self.assertIsNot(changed, base)
+        self.assertIsNotNone(changed.get_path('txt_extra1'))
+
+    def test_update_invalidates(self):
+        rest = BaseREST(self.rest_url, schema_cache=self.cache)
+        base = rest.get('music')
+        rest.update(base)
+        self.assertEqual(len(self.cache), 0)
+        self.assertIsNotNone(rest.get('music').get_path('txt_extra1'))
+
+        rest.delete('music')
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.invalidations, 2)
+
+    def test_document_rest(self):
+        BaseREST(self.rest_url, schema_cache=self.cache).get('music')
+        docs = DocumentREST(self.rest_url, 'music', schema_cache=self.cache)
+        self.assertEqual(docs.get_base().metadata.name, 'music')
+        self.assertEqual(SchemaHandler.gets, 1)
+
+        base = Base(name='music')
+        self.assertIs(DocumentREST(self.rest_url, base).get_base(), base)
+
+    def test_without_cache(self):
+        docs = DocumentREST(self.rest_url, 'music')
+        self.assertIsNone(docs.schema_cache)
+        self.assertIsNot(docs.get_base(), docs.get_base())
+        self.assertEqual(SchemaHandler.gets, 2)
+
+    def test_identities(self):
+        anonymous = BaseREST(self.rest_url, schema_cache=self.cache)
+        alice = BaseREST(self.rest_url, schema_cache=self.cache,
+                         cookies={'auth_tkt': 'alice'})
+        bob = BaseREST(self.rest_url, schema_cache=self.cache,
+                       cookies={'auth_tkt': 'bob'})
+        bases = [client.get('music') for client in (anonymous, alice, bob)]
+        self.assertEqual(SchemaHandler.gets, 3)
+        self.assertEqual(len(set(map(id, bases))), 3)
+
+        alice_again = BaseREST(self.rest_url, schema_cache=self.cache,
+                               cookies={'auth_tkt': 'alice'})
+        self.assertIs(alice_again.get('music'), bases[1])
+        self.assertIs(BaseREST(self.rest_url, schema_cache=self.cache)
+                      .get('music'), bases[0])
+        self.assertEqual(SchemaHandler.gets, 3)
+
+        # a schema change drops the base for every identity
+        bob.update(bases[2])
+        self.assertEqual(len(self.cache), 0)
+
+    def test_version_race(self):
+        version = self.cache.version
+        self.cache.invalidate(self.rest_url, 'music')
+        self.cache.set(self.rest_url, 'music', Base(name='music'),
+                       version=version)
+        self.assertIsNone(self.cache.get(self.rest_url, 'music'))
+
+    def test_expiration(self):
+        self.cache.ttl = 0.01
+        self.cache.set(self.rest_url, 'music', Base(name='music'), '"v1"')
+        time.sleep(0.02)
+        self.assertIsNone(self.cache.get(self.rest_url, 'music'))
+        base, etag = self.cache.get_stale(self.rest_url, 'music')
+        self.assertEqual(etag, '"v1"')
+
+    def test_shared(self):
+        self.assertIs(get_schema_cache(), get_schema_cache())
+        rest = BaseREST(self.rest_url, schema_cache=True)
+        self.assertIs(rest.schema_cache, get_schema_cache())
+        self.assertRaises(TypeError, BaseREST, self.rest_url, schema_cache={})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,232 @@
+import os
+import signal
+import unittest
+import threading
+from http.server import HTTPServer
+from http.server import ThreadingHTTPServer
+from http.server import BaseHTTPRequestHandler
+
+from ..lbrest.base import BaseREST
+from ..lbrest.document import DocumentREST
+from ..lbrest.session import LBSession
+from ..lbrest.session import close_shared_sessions
+from ..lbrest.session import get_shared_session
+from ..lbrest.session import CookieState
+
+
+class TestLBSession(unittest.TestCase):
+
+    def setUp(self):
+        self.rest_url = 'http://192.168.56.102'
+
+    def tearDown(self):
+        close_shared_sessions()
+
+    def test_private_session(self):
+        rest1 = BaseREST(self.rest_url)
+        rest2 = BaseREST(self.rest_url)
+        self.assertIsInstance(rest1.session, LBSession)
+        self.assertIsNot(rest1.session, rest2.session)
+
+    def test_shared_session(self):
+        rest1 = BaseREST(self.rest_url, shared_session=True)
+        rest2 = DocumentREST(self.rest_url, 'python_rest_test',
+                             shared_session=True)
+        rest3 = BaseREST('http://192.168.56.103', shared_session=True)
+        self.assertIs(rest1.session, rest2.session)
+        self.assertIsNot(rest1.session, rest3.session)
+
+    def test_shared_session_settings(self):
+        rest = BaseREST(self.rest_url, shared_session=True, pool_maxsize=20)
+        self.assertIs(BaseREST(self.rest_url, shared_session=True,
+                               pool_maxsize=20).session, rest.session)
+        self.assertIs(get_shared_session(self.rest_url), rest.session)
+        # Pool parameters left to their defaults accept the shared pool
+        self.assertIs(BaseREST(self.rest_url, shared_session=True).session,
+                      rest.session)
+        self.assertIs(BaseREST(self.rest_url, shared_session=True,
+                               pool_block=False).session, rest.session)
+        self.assertRaises(ValueError, BaseREST, *[self.rest_url],
+                          **{'shared_session': True, 'pool_maxsize': 10})
+        self.assertRaises(ValueError, get_shared_session, self.rest_url,
+                          pool_maxsize=20, pool_block=True)
+
+    def test_explicit_session(self):
+        session = LBSession(pool_connections=2, pool_maxsize=20)
+        rest = DocumentREST(self.rest_url, 'python_rest_test', session=session)
+        self.assertIs(rest.session, session)
+        adapter = session.http.get_adapter(self.rest_url)
+        self.assertEqual(adapter._pool_maxsize, 20)
+
+    def test_session_error(self):
+        self.assertRaises(TypeError, BaseREST, *[self.rest_url],
+                          **{'session': object()})
+
+
+
+class CookieHandler(BaseHTTPRequestHandler):
+    """ Sets a 'token' cookie named in the path, echoes received cookies.
+    """
+
+    def do_GET(self):
+        body = (self.headers.get('Cookie') or '').encode('utf-8')
+        self.send_response(200)
+        if self.path.startswith('/login/'):
+            self.send_header('Set-Cookie',
+                             'token=%s; Path=/' % self.path.split('/')[-1])
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestCookieState(unittest.TestCase):
+
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), CookieHandler)
+        self.rest_url = 'http://127.0.0.1:%d' % self.server.server_address[1]
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        close_shared_sessions()
+
+    def test_clients_isolated(self):
+        rest1 = BaseREST(self.rest_url, shared_session=True)
+        rest2 = BaseREST(self.rest_url, shared_session=True)
+        rest1.send_request('GET', ['login', 'one'])
+        rest2.send_request('GET', ['login', 'two'])
+
+        self.assertEqual(rest1.cookies, {'token': 'one'})
+        self.assertEqual(rest2.cookies, {'token': 'two'})
+        self.assertEqual(rest1.send_request('GET', ['echo']), 'token=one')
+        self.assertEqual(len(rest1.session.http.cookies), 0)
+
+        rest3 = BaseREST(self.rest_url)
+        self.assertIsNone(rest3.cookies)
+
+    def test_shared_state(self):
+        state = CookieState({'token': 'abc'})
+        rest1 = BaseREST(self.rest_url, cookies=state)
+        rest2 = BaseREST(self.rest_url, cookies=state)
+        rest1.send_request('GET', ['login', 'new'])
+        self.assertEqual(rest2.send_request('GET', ['echo']), 'token=new')
+
+    def test_setter(self):
+        rest = BaseREST(self.rest_url, cookies={'a': '1'})
+        rest.cookies = {'b': '2'}
+        self.assertEqual(rest.cookies, {'b': '2'})
+        rest.cookies = None
+        self.assertIsNone(rest.cookies)
+        self.assertRaises(TypeError, CookieState, 'a=1')
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'requires os.fork')
+    def test_fork(self):
+        state = CookieState({'token': 'abc'})
+        with state._lock:
+            # a lock held while forking must not block the child
+            pid = os.fork()
+            if pid == 0:
+                signal.alarm(5)
+                os._exit(0 if state.get() == {'token': 'abc'} else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(status, 0)
+
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """ Answers 'ok' over keep-alive connections.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class CountingServer(ThreadingHTTPServer):
+    """ Counts accepted connections.
+    """
+    daemon_threads = True
+    accepted = 0
+
+    def get_request(self):
+        self.accepted += 1
+        return ThreadingHTTPServer.get_request(self)
+
+
+class TestPool(unittest.TestCase):
+
+    def setUp(self):
+        self.server = CountingServer(('127.0.0.1', 0), KeepAliveHandler)
+        self.rest_url = 'http://127.0.0.1:%d' % self.server.server_address[1]
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_warmup(self):
+        rest = BaseREST(self.rest_url, pool_maxsize=4)
+        self.assertEqual(rest.warmup(3), 3)
+        self.assertEqual(rest.warmup(), 1)
+        self.assertEqual(rest.warmup(), 0)
+
+        def get():
+            rest.send_request('GET', ['x'])
+
+        threads = [threading.Thread(target=get) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # every request used a warm connection
+        self.assertEqual(self.server.accepted, 4)
+
+    def test_warmup_error(self):
+        rest = BaseREST(self.rest_url)
+        self.assertRaises(ValueError, rest.warmup, -1)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'requires os.fork')
+    def test_fork(self):
+        rest = BaseREST(self.rest_url)
+        rest.send_request('GET', ['x'])
+        parent_http = rest.session.http
+
+        pid = os.fork()
+        if pid == 0:
+            signal.alarm(5)
+            try:
+                ok = rest.session.http is not parent_http and \
+                    rest.send_request('GET', ['x']) == 'ok'
+            except Exception:
+                ok = False
+            os._exit(0 if ok else 1)
+
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(status, 0)
+        # the parent keeps its pool and its connection
+        self.assertIs(rest.session.http, parent_http)
+        self.assertEqual(rest.send_request('GET', ['x']), 'ok')
+        self.assertEqual(self.server.accepted, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
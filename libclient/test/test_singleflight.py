@@ -0,0 +1,143 @@
+import os
+import time
+import signal
+import threading
+import unittest
+
+from ..lbrest.document import DocumentREST
+from ..lbrest.metrics import MetricsCollector
+from ..lbrest.singleflight import SingleFlight
+from ..lbrest.deadline import Deadline
+from ..lbrest.deadline import DeadlineExceeded
+from .helpers import FakeSession
+
+
+def run_threads(func, count):
+    results = [None] * count
+
+    def target(index):
+        try:
+            results[index] = func()
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=target, args=(i,))
+               for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def setUp(self):
+        self.rest_url = 'http://192.168.56.102'
+
+    def test_do(self):
+        flight = SingleFlight()
+        calls = []
+
+        def func():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'value'
+
+        results = run_threads(lambda: flight.do('key', func), 5)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(shared for _, shared in results),
+                         [False, True, True, True, True])
+        self.assertEqual(flight.stats(),
+                         {'calls': 1, 'coalesced': 4, 'in_flight': 0})
+
+    def test_error_shared(self):
+        flight = SingleFlight()
+
+        def func():
+            time.sleep(0.1)
+            raise ValueError('boom')
+
+        results = run_threads(lambda: flight.do('key', func), 3)
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+        self.assertEqual(flight.stats()['in_flight'], 0)
+
+    def test_coalesced_gets(self):
+        session = FakeSession(body=b'{"a": [1]}', delay=0.1)
+        metrics = MetricsCollector()
+        rest = DocumentREST(self.rest_url, 'python_rest_test',
+                            session=session, coalesce=True,
+                            hooks={'post_request': metrics})
+
+        results = run_threads(lambda: rest.get(1), 5)
+        self.assertEqual(session.calls, 1)
+        self.assertEqual(results, [{'a': [1]}] * 5)
+        # every caller decodes its own copy
+        results[0]['a'].append(2)
+        self.assertEqual(results[1], {'a': [1]})
+
+        self.assertEqual(rest.stats()['coalescing']['coalesced'], 4)
+        self.assertEqual(metrics.dump()['DocumentREST.get']['coalesced'], 4)
+
+        # different urls and sequential calls are not shared
+        run_threads(lambda: rest.get(2), 1)
+        rest.get(1)
+        self.assertEqual(session.calls, 3)
+
+    def test_writes_not_coalesced(self):
+        session = FakeSession(body=b'{"a": [1]}', delay=0.1)
+        rest = DocumentREST(self.rest_url, 'python_rest_test',
+                            session=session, coalesce=True)
+        run_threads(lambda: rest.delete(1), 3)
+        self.assertEqual(session.calls, 3)
+
+    def test_disabled(self):
+        session = FakeSession(body=b'{"a": [1]}', delay=0.1)
+        rest = DocumentREST(self.rest_url, 'python_rest_test',
+                            session=session)
+        run_threads(lambda: rest.get(1), 3)
+        self.assertEqual(session.calls, 3)
+        self.assertNotIn('coalescing', rest.stats())
+
+    def test_coalesce_error(self):
+        self.assertRaises(TypeError, DocumentREST,
+                          *[self.rest_url, 'python_rest_test'],
+                          **{'coalesce': 1})
+
+    def test_deadline(self):
+        session = FakeSession(body=b'{"a": [1]}', delay=0.3)
+        rest = DocumentREST(self.rest_url, 'python_rest_test',
+                            session=session, coalesce=True)
+        leader = threading.Thread(target=rest.get, args=(1,))
+        leader.start()
+        time.sleep(0.05)
+        with Deadline(0.05):
+            self.assertRaises(DeadlineExceeded, rest.get, 1)
+        leader.join()
+        self.assertEqual(session.calls, 1)
+
+    @unittest.skipUnless(hasattr(os, 'fork'), 'requires os.fork')
+    def test_fork(self):
+        flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+
+        def func():
+            started.set()
+            release.wait()
+            return 'parent'
+
+        leader = threading.Thread(target=flight.do, args=('key', func))
+        leader.start()
+        started.wait()
+        # the leader's thread does not exist in the child: its call must
+        # not be waited for there
+        pid = os.fork()
+        if pid == 0:
+            signal.alarm(5)
+            ok = flight.do('key', lambda: 'child') == ('child', False)
+            os._exit(0 if ok else 1)
+
+        release.set()
+        leader.join()
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(status, 0)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+import datetime
+import unittest
+
+from .. import utils
+from ..utils import json2object
+from ..utils import object2json
+from ..utils import JSONStreamParser
+
+
+class TestJSON(unittest.TestCase):
+
+    def setUp(self):
+        self.doc = {
+            'txt_title': u'Sehnsucht ação',
+            'int_track_number': 1,
+            'gp_tracks': [{'bool_is_band': False, 'dec_len': 4.5}]
+        }
+
+    def test_json2object_text(self):
+        self.assertEqual(json2object(object2json(self.doc)), self.doc)
+
+    def test_json2object_bytes(self):
+        raw = object2json(self.doc).encode('utf-8')
+        self.assertEqual(json2object(raw), self.doc)
+
+    def test_json2object_error(self):
+        self.assertRaises(ValueError, json2object, *[b'{"a": '])
+
+    def test_object2json_dates(self):
+        value = {
+            'dt': datetime.datetime(2015, 3, 2, 10, 20, 30),
+            'date': datetime.date(2015, 3, 2),
+            'time': datetime.time(10, 20, 30)
+        }
+        self.assertEqual(json2object(object2json(value)), {
+            'dt': '02/03/2015 10:20:30',
+            'date': '02/03/2015',
+            'time': '10:20:30'
+        })
+
+
+class Encoded(object):
+    def _encoded(self):
+        return {'date': datetime.date(2015, 3, 2)}
+
+
+class TestJSONBackends(unittest.TestCase):
+
+    def tearDown(self):
+        utils.set_json_backend(utils.JSON_BACKENDS[0])
+
+    def test_backends_agree(self):
+        value = {
+            'txt': u'ação',
+            'dt': datetime.datetime(2015, 3, 2, 10, 20, 30),
+            'obj': Encoded(),
+            'list': [1, 2.5, None, True]
+        }
+        encoded = {}
+        for backend in utils.JSON_BACKENDS:
+            utils.set_json_backend(backend)
+            self.assertEqual(utils.get_json_backend(), backend)
+            encoded[backend] = json2object(object2json(value))
+        self.assertEqual(encoded['json']['obj'], {'date': '02/03/2015'})
+        for backend in utils.JSON_BACKENDS:
+            self.assertEqual(encoded[backend], encoded['json'])
+
+    def test_big_integer_encoding(self):
+        for backend in utils.JSON_BACKENDS:
+            utils.set_json_backend(backend)
+            self.assertIn('1180591620717411303424', object2json([2 ** 70]))
+
+    def test_big_integer_decoding(self):
+        for backend in utils.JSON_BACKENDS:
+            utils.set_json_backend(backend)
+            for number in (123456789012345678901234567890,
+                           -9999999999999999999, 2 ** 64):
+                text = '{"a": [%d], "b": 1.5}' % number
+                self.assertEqual(json2object(text), {'a': [number], 'b': 1.5})
+                self.assertIs(type(json2object(text.encode('utf-8'))['a'][0]),
+                              int)
+
+    def test_non_finite_floats(self):
+        for backend in utils.JSON_BACKENDS:
+            utils.set_json_backend(backend)
+            self.assertEqual(object2json({'a': float('nan'), 'b': None}),
+                             '{"a": NaN, "b": null}')
+            self.assertEqual(object2json([[float('-inf')]]), '[[-Infinity]]')
+            self.assertEqual(json2object(object2json({'a': None})), {'a': None})
+            self.assertEqual(json2object('[Infinity]'), [float('inf')])
+
+    def test_trailing_data(self):
+        for backend in utils.JSON_BACKENDS:
+            utils.set_json_backend(backend)
+            self.assertEqual(json2object(b'{"a": 1} '), {'a': 1})
+
+    def test_unknown_backend(self):
+        self.assertRaises(ValueError, utils.set_json_backend, *['yaml'])
+
+
+class TestJSONStreamParser(unittest.TestCase):
+
+    def setUp(self):
+        self.response = {
+            'results': [{'txt_title': u'ação %d' % i, 'int_n': i * 1000}
+                        for i in range(20)],
+            'result_count': 20,
+            'limit': 20,
+            'offset': 0
+        }
+        self.raw = object2json(self.response).encode('utf-8')
+
+    def parse(self, chunk_size):
+        chunks = [self.raw[i:i + chunk_size]
+                  for i in range(0, len(self.raw), chunk_size)]
+        results = []
+        members = {}
+        for key, value in JSONStreamParser(chunks, ('results',)):
+            if key == 'results':
+                results.append(value)
+            else:
+                members[key] = value
+        return results, members
+
+    def test_chunk_sizes(self):
+        for chunk_size in (1, 3, 64, len(self.raw)):
+            results, members = self.parse(chunk_size)
+            self.assertEqual(results, self.response['results'])
+            self.assertEqual(members, {'result_count': 20, 'limit': 20,
+                                       'offset': 0})
+
+    def test_empty(self):
+        self.assertEqual(list(JSONStreamParser([b'{}'])), [])
+        self.assertEqual(list(JSONStreamParser([b'{"results": []}'],
+                                               ('results',))), [])
+
+    def test_truncated(self):
+        parser = JSONStreamParser([self.raw[:-10]], ('results',))
+        self.assertRaises(ValueError, list, parser)
+
+
+if __name__ == '__main__':
+    unittest.main()
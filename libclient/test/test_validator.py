@@ -0,0 +1,105 @@
+import datetime
+import unittest
+
+from ..lbrest.document import DocumentREST
+from ..lbtypes.base import Field
+from ..lbtypes.validator import DocumentValidator
+from ..lbtypes.validator import ValidationError
+from .helpers import make_base
+
+
+class TestDocumentValidator(unittest.TestCase):
+
+    def setUp(self):
+        self.base = make_base()
+        self.validator = DocumentValidator.for_base(self.base)
+
+    def test_valid(self):
+        self.validator.validate({
+            'txt_title': 'Sehnsucht',
+            'dt_release': datetime.date(1997, 8, 22),
+            'txt_tags': ['metal'],
+            'gp_tracks': [{
+                'txt_track_title': 'Engel',
+                'int_track_number': 2,
+                'time_track_len': '00:04:24',
+                'snd_file': None
+            }],
+            '_metadata': {'id_doc': 1}
+        })
+        self.validator.validate({'txt_title': 'x', 'dt_release': '22/08/1997'})
+
+    def test_collects_all_errors(self):
+        errors = self.validator.errors({
+            'dt_release': datetime.datetime(1997, 8, 22),
+            'txt_tags': 'metal',
+            'gp_tracks': [{'int_track_number': True}, 'x'],
+            'txt_unknown': 1
+        })
+        self.assertEqual(sorted(errors), sorted([
+            ('txt_title', 'required'),
+            ('dt_release', 'must be Date, not datetime'),
+            ('txt_tags', 'must be a list'),
+            ('gp_tracks/0/txt_track_title', 'required'),
+            ('gp_tracks/0/int_track_number', 'must be Integer, not bool'),
+            ('gp_tracks/1', 'must be a dict'),
+            ('txt_unknown', 'unknown field'),
+        ]))
+
+    def test_validation_error(self):
+        with self.assertRaises(ValidationError) as context:
+            self.validator.validate({'dt_release': '1997-08-22'})
+        self.assertIsInstance(context.exception, ValueError)
+        self.assertEqual(len(context.exception.errors), 2)
+        self.assertIn('txt_title: required', str(context.exception))
+
+    def test_validate_many(self):
+        invalid = self.validator.validate_many(
+            [{'txt_title': 'a'}, {}, {'txt_title': 1}])
+        self.assertEqual(sorted(invalid), [1, 2])
+
+    def test_compiled_once_per_base(self):
+        self.assertIs(DocumentValidator.for_base(self.base), self.validator)
+        self.base.add_field(Field('int_year', 'Integer'))
+        validator = DocumentValidator.for_base(self.base)
+        self.assertIsNot(validator, self.validator)
+        self.assertEqual(validator.errors({'txt_title': 'a', 'int_year': 1}), [])
+
+
+class TestDocumentRESTValidation(unittest.TestCase):
+
+    def setUp(self):
+        # nothing listens there: a request would fail with ConnectionError
+        self.rest_url = 'http://127.0.0.1:9'
+
+    def test_opt_in(self):
+        rest = DocumentREST(self.rest_url, make_base(), timeout=1)
+        self.assertFalse(rest.validate)
+        self.assertNotIsInstance(
+            _error(rest.create, {'txt_title': 1}), ValidationError)
+
+    def test_create_and_update(self):
+        rest = DocumentREST(self.rest_url, make_base(), validate=True,
+                            timeout=1)
+        self.assertIsInstance(_error(rest.create, {}), ValidationError)
+        self.assertIsInstance(_error(rest.update, 1, {'txt_title': 1}),
+                              ValidationError)
+
+    def test_create_many(self):
+        rest = DocumentREST(self.rest_url, make_base(), validate=True,
+                            timeout=1)
+        result = rest.create_many([{'txt_title': 1}, {}])
+        self.assertEqual(len(result.errors), 2)
+        for error in result.errors.values():
+            self.assertIsInstance(error, ValidationError)
+
+
+def _error(func, *args):
+    try:
+        func(*args)
+    except Exception as e:
+        return e
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,8 +2,15 @@
 # -*- coding: utf-8 -*-
 
 import json
+import math
+import codecs
 import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 JSON_TYPES = (
     dict,        # object
     list,        # array
@@ -13,6 +20,34 @@ JSON_TYPES = (
     type(None)   # null
 )
 
+# @property JSON_BACKENDS: available JSON backends, fastest first
+JSON_BACKENDS = ('orjson', 'json') if orjson is not None else ('json',)
+
+_json_backend = JSON_BACKENDS[0]
+
+
+# ****************
+# * JSON backend *
+# ****************
+
+def get_json_backend():
+    """ Returns the name of the JSON backend used by object2json and
+        json2object.
+    """
+    return _json_backend
+
+def set_json_backend(name):
+    """ @param name: 'orjson' (C-accelerated, used by default when installed)
+        or 'json' (Python's standard library). Both give the same results:
+        JSON holding integers orjson would turn into floats, or Python
+        values holding NaN or Infinity, are handled by the standard library.
+    """
+    global _json_backend
+    if name not in ('orjson', 'json'):
+        raise ValueError('Unknown JSON backend: %s' % name)
+    if name not in JSON_BACKENDS:
+        raise ImportError('JSON backend %s is not installed' % name)
+    _json_backend = name
 
 # ********************************** 
 # * Document default encode/decode *
@@ -41,6 +76,46 @@ class DocumentJSONEncoder(json.JSONEncoder):
 
         return obj
 
+def _orjson_default(obj):
+    """ DocumentJSONEncoder.default for orjson, which requires unsupported
+        objects to raise TypeError.
+    """
+    value = _encoder.default(obj)
+    if value is obj:
+        raise TypeError('Object of type %s is not JSON serializable' %
+                        type(obj).__name__)
+    return value
+
+_ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | \
+    orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_NON_STR_KEYS \
+    if orjson is not None else 0
+
+def _has_nonfinite(value):
+    """ Returns True if 'value' holds a NaN or infinite float, which orjson
+        encodes as null and the standard library as NaN/Infinity.
+    """
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+# @property _DIGITS_TO_ZERO, _LONG_NUMBER: a text where digits are turned
+# into '0' holds _LONG_NUMBER if it has a run of 19 digits, possibly an
+# integer out of orjson's 64-bit range, which it would decode as a float
+# (a bytes translate and search are much cheaper than a regex here)
+_DIGITS_TO_ZERO = bytes.maketrans(b'123456789', b'000000000')
+_LONG_NUMBER = b'0' * 19
+
+_encoder = DocumentJSONEncoder(ensure_ascii=False)
+_decoder = json.JSONDecoder()
+
 # ************************
 # * Generic JSON encoder *
 # ************************
@@ -53,8 +128,22 @@ def object2json(value, ensure_ascii=False, **kwargs):
         standard library
 
         This method receives a Python object JSON oject and tries to convert it
-        to JSON oject. 
+        to JSON oject. Uses the fast JSON backend when no standard library
+        option is requested.
     """
+    if not ensure_ascii and not kwargs:
+        if _json_backend == 'orjson':
+            try:
+                encoded = orjson.dumps(value, default=_orjson_default,
+                                       option=_ORJSON_OPTIONS)
+            except TypeError:
+                # e.g. integers over 64 bits, retry with the standard library
+                pass
+            else:
+                if b'null' not in encoded or not _has_nonfinite(value):
+                    return encoded.decode('utf-8')
+        return _encoder.encode(value)
+
     return json.dumps(value,
                      ensure_ascii=ensure_ascii,
                      cls=DocumentJSONEncoder,
@@ -65,7 +154,8 @@ def object2json(value, ensure_ascii=False, **kwargs):
 # ************************ 
 
 def json2object(value, **kwargs):
-    """ @param value: JSON to convert into Python object
+    """ @param value: JSON to convert into Python object; str or UTF-8 
+        encoded bytes (as returned by send_request with raw=True)
         @param kwargs: key word arguments that will be used with Python's JSON 
         standard library
 
@@ -76,12 +166,148 @@ def json2object(value, **kwargs):
         # No need to parse, if it's already a JSON type
         return value
     else:
+        if _json_backend == 'orjson' and not kwargs and \
+                isinstance(value, (str, bytes, bytearray)):
+            text = value.encode('utf-8', 'surrogatepass') \
+                if isinstance(value, str) else value
+            if _LONG_NUMBER not in text.translate(_DIGITS_TO_ZERO):
+                try:
+                    return orjson.loads(text)
+                except orjson.JSONDecodeError:
+                    # e.g. trailing data or NaN, let the standard library
+                    # handle it below
+                    pass
+
+        if isinstance(value, (bytes, bytearray)):
+            # JSON text is UTF-8 (RFC 8259), no charset detection needed
+            value = value.decode('utf-8')
+
         # We do have a JSON that must have to transform it on a Python object
         try:
             # Loads JSON and return object
             # raw_decode method is used because of compatibility problems.
-            return json.JSONDecoder(**kwargs).raw_decode(value)[0]
+            decoder = json.JSONDecoder(**kwargs) if kwargs else _decoder
+            return decoder.raw_decode(value)[0]
+
+        except ValueError as e:
+            # JSON loading was not possible (JSONDecodeError needs extra
+            # constructor arguments, so raise a plain ValueError)
+            raise ValueError('Could not parse JSON data: %s' % e)
 
         except Exception as e:
             # JSON loading was not possible
             raise e.__class__('Could not parse JSON data: %s' % e)
+
+# ***************************
+# * Incremental JSON parser *
+# ***************************
+
+_WHITESPACE = ' \t\n\r'
+
+class JSONStreamParser(object):
+    """ Parses a JSON object read from an iterable of byte chunks without
+        holding the whole text in memory.
+
+        Iterating over the parser yields (key, value) for each member of the
+        object; the members named in 'array_keys' must be arrays and yield
+        (key, element) once per element as soon as the element is complete.
+        Only the text of the value being parsed is kept in memory.
+    """
+
+    def __init__(self, chunks, array_keys=()):
+        """ @param chunks: iterable of UTF-8 encoded bytes (e.g.
+            response.iter_content())
+            @param array_keys: names of the members to stream element by
+            element
+        """
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._array_keys = array_keys
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, min_size=1):
+        """ Reads chunks until at least 'min_size' unparsed characters are
+            buffered or the input is exhausted; returns False if nothing
+            could be read.
+        """
+        self._buf = self._buf[self._pos:]
+        self._pos = 0
+        size = len(self._buf)
+        while len(self._buf) < min_size and not self._eof:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                self._eof = True
+                self._buf += self._utf8.decode(b'', final=True)
+            else:
+                self._buf += self._utf8.decode(chunk)
+        return len(self._buf) > size
+
+    def _peek(self):
+        """ Skips whitespace and returns the next character.
+        """
+        while True:
+            while self._pos < len(self._buf) and \
+                    self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError('Could not parse JSON data: '
+                                 'unexpected end of data')
+
+    def _expect(self, chars):
+        char = self._peek()
+        if char not in chars:
+            raise ValueError('Could not parse JSON data: expected %s, got %r'
+                             % (' or '.join(chars), char))
+        self._pos += 1
+        return char
+
+    def _value(self):
+        """ Decodes the next complete JSON value, reading more chunks while
+            it is truncated.
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buf, self._pos)
+            except ValueError:
+                end = None
+            # a value ending at the buffer's end may go on (e.g. a number)
+            if end is not None and (end < len(self._buf) or self._eof):
+                self._pos = end
+                return value
+            size = len(self._buf) - self._pos
+            if not self._fill(size * 2):
+                if end is not None:
+                    self._pos = end
+                    return value
+                raise ValueError('Could not parse JSON data: '
+                                 'truncated value')
+
+    def __iter__(self):
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+
+        while True:
+            key = self._value()
+            self._expect(':')
+            if key in self._array_keys:
+                self._expect('[')
+                if self._peek() == ']':
+                    self._pos += 1
+                else:
+                    while True:
+                        yield key, self._value()
+                        if self._expect(',]') == ']':
+                            break
+            else:
+                yield key, self._value()
+
+            if self._expect(',}') == '}':
+                return
@@ -7,8 +7,12 @@ setup(name='libclient',
       version=version,
       description="Python Client Library for Lightbase",
       long_description="""\
+Requires Python 3.7 or later; Python 2 is no longer supported.
 """,
-      classifiers=[], # Get strings from http://pypi.python.org/pypi?%3Aaction=list_classifiers
+      classifiers=[
+          'Programming Language :: Python :: 3',
+          'Programming Language :: Python :: 3 :: Only',
+      ], # Get strings from http://pypi.python.org/pypi?%3Aaction=list_classifiers
       keywords='',
       author='Danilo Carvalho',
       author_email='danilo.carvalho@lightbase.com.br',
@@ -17,11 +21,16 @@ setup(name='libclient',
       packages=find_packages(exclude=['ez_setup', 'examples', 'tests']),
       include_package_data=True,
       zip_safe=True,
+      python_requires='>=3.7',
       install_requires=[
           # -*- Extra requirements: -*-
           'six',
           'requests==2.24.0'
       ],
+      extras_require={
+          'async': ['aiohttp'],
+          'fast': ['orjson'],
+      },
       entry_points="""
       # -*- Entry points: -*-
       """,